@@ -0,0 +1,141 @@
+import json
+import pathlib
+import random
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from vidar import models
+from vidar.services import benchmark_services
+
+
+FIXTURES_DIR = pathlib.Path(__file__).parent.parent / "fixtures"
+
+User = get_user_model()
+
+
+def load_video_payload():
+    with open(FIXTURES_DIR / "dlp_response.json") as fo:
+        payload = json.load(fo)
+    with open(FIXTURES_DIR / "dlp_formats.json") as fo:
+        payload.update(json.load(fo))
+    return payload
+
+
+def build_playlist_payload(playlist, videos, payload):
+    """Mimics interactor.playlist_details output with entries for the supplied videos."""
+    return {
+        "id": playlist.provider_object_id,
+        "title": playlist.title,
+        "description": "",
+        "channel_id": playlist.channel.provider_object_id if playlist.channel else "",
+        "entries": [
+            dict(payload, id=video.provider_object_id, title=video.title, channel_id=video.channel_provider_object_id)
+            for video in videos
+        ],
+    }
+
+
+def build_library(
+    channels=5,
+    videos_per_channel=50,
+    playlists_per_channel=2,
+    videos_per_playlist=20,
+    users=2,
+    history_per_user=50,
+    comments_per_video=3,
+    seed=0,
+):
+    rand = random.Random(seed)
+    payload = load_video_payload()
+
+    channel_objs = benchmark_services.generate_library(
+        channels=channels,
+        videos_per_channel=videos_per_channel,
+        seed=seed,
+        payload=payload,
+    )
+
+    # bulk_create skips Channel.save, give every other channel a crontab and full archiving to the rest.
+    for index, channel in enumerate(channel_objs):
+        if index % 2:
+            channel.full_archive = True
+        else:
+            channel.scanner_crontab = "*/10 * * * *"
+        channel.delete_videos_after_days = 365 if index % 3 == 0 else 0
+        channel.delete_videos_after_watching = index % 4 == 0
+    models.Channel.objects.bulk_update(
+        channel_objs, ["full_archive", "scanner_crontab", "delete_videos_after_days", "delete_videos_after_watching"]
+    )
+
+    videos = list(models.Video.objects.filter(channel__in=channel_objs).order_by("pk"))
+    videos_by_channel = {}
+    for video in videos:
+        videos_by_channel.setdefault(video.channel_id, []).append(video)
+
+    playlist_objs = []
+    for channel in channel_objs:
+        for index in range(playlists_per_channel):
+            playlist_objs.append(
+                models.Playlist(
+                    provider_object_id=f"synthetic-playlist-{channel.pk}-{index}",
+                    title=f"Synthetic Playlist {channel.pk}-{index}",
+                    channel=channel,
+                    crontab="*/10 * * * *",
+                )
+            )
+    playlist_objs = models.Playlist.objects.bulk_create(playlist_objs)
+
+    playlist_items = []
+    for playlist in playlist_objs:
+        channel_videos = videos_by_channel.get(playlist.channel_id, [])
+        for position, video in enumerate(rand.sample(channel_videos, min(videos_per_playlist, len(channel_videos)))):
+            playlist_items.append(
+                models.PlaylistItem(
+                    playlist=playlist,
+                    video=video,
+                    provider_object_id=video.provider_object_id,
+                    display_order=position,
+                )
+            )
+    models.PlaylistItem.objects.bulk_create(playlist_items)
+
+    user_objs = [
+        User.objects.create_user(username=f"synthetic-user-{index}", password="password") for index in range(users)
+    ]
+
+    history = []
+    for user in user_objs:
+        for video in rand.sample(videos, min(history_per_user, len(videos))):
+            history.append(
+                models.UserPlaybackHistory(user=user, video=video, seconds=rand.randint(0, max(video.duration, 1)))
+            )
+    models.UserPlaybackHistory.objects.bulk_create(history)
+
+    # Comments are root nodes only, bulk_create bypasses mptt so the tree fields are assigned directly.
+    comments = []
+    now = timezone.now()
+    for video in videos:
+        for index in range(comments_per_video):
+            comments.append(
+                models.Comment(
+                    id=f"{video.provider_object_id}-comment-{index}",
+                    video=video,
+                    author=f"Synthetic Author {index}",
+                    text="Synthetic comment",
+                    timestamp=now,
+                    lft=1,
+                    rght=2,
+                    tree_id=len(comments) + 1,
+                    level=0,
+                )
+            )
+    models.Comment.objects.bulk_create(comments, batch_size=1000)
+
+    return {
+        "channels": channel_objs,
+        "videos": videos,
+        "playlists": playlist_objs,
+        "users": user_objs,
+        "payload": payload,
+    }
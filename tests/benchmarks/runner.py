@@ -0,0 +1,81 @@
+import contextlib
+import json
+import os
+import pathlib
+import time
+import warnings
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+BASELINE_FILE = pathlib.Path(__file__).parent / "baseline.json"
+
+# Query counts are deterministic for a given library, wall time is only reported as it depends on the machine.
+QUERY_COUNT_TOLERANCE = 0.10
+WALL_TIME_TOLERANCE = 3.0
+
+ENABLED = bool(os.environ.get("VIDAR_BENCHMARKS"))
+UPDATE_BASELINE = bool(os.environ.get("VIDAR_BENCHMARKS_UPDATE_BASELINE"))
+
+
+class Measurement:
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.wall_time = 0.0
+
+    def as_dict(self):
+        return {"queries": self.queries, "wall_time": round(self.wall_time, 4)}
+
+
+@contextlib.contextmanager
+def measure(name):
+    measurement = Measurement(name)
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        yield measurement
+        measurement.wall_time = time.perf_counter() - start
+    measurement.queries = len(ctx.captured_queries)
+
+
+def load_baseline():
+    if not BASELINE_FILE.exists():
+        return {}
+    with BASELINE_FILE.open() as fo:
+        return json.load(fo)
+
+
+def save_to_baseline(measurement):
+    baseline = load_baseline()
+    baseline[measurement.name] = measurement.as_dict()
+    with BASELINE_FILE.open("w") as fo:
+        json.dump(baseline, fo, indent=4, sort_keys=True)
+        fo.write("\n")
+
+
+def compare_to_baseline(measurement):
+    """Returns a list of regressions found against the baseline, updating the baseline instead if requested."""
+
+    if UPDATE_BASELINE:
+        save_to_baseline(measurement)
+        return []
+
+    expected = load_baseline().get(measurement.name)
+    if not expected:
+        return [f"{measurement.name}: no baseline recorded, run with VIDAR_BENCHMARKS_UPDATE_BASELINE=1"]
+
+    regressions = []
+
+    max_queries = expected["queries"] * (1 + QUERY_COUNT_TOLERANCE)
+    if measurement.queries > max_queries:
+        regressions.append(f"{measurement.name}: {measurement.queries} queries, baseline {expected['queries']}")
+
+    max_wall_time = expected["wall_time"] * WALL_TIME_TOLERANCE
+    if measurement.wall_time > max_wall_time:
+        warnings.warn(
+            f"benchmark {measurement.name}: {measurement.wall_time:.3f}s, baseline {expected['wall_time']:.3f}s",
+            RuntimeWarning,
+        )
+
+    return regressions
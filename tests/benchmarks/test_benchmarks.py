@@ -0,0 +1,92 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from vidar import tasks
+
+from . import library, runner
+
+User = get_user_model()
+
+
+@skipUnless(runner.ENABLED, "Set VIDAR_BENCHMARKS=1 to run the benchmark suite.")
+@override_settings(
+    VIDAR_AUTOMATED_DOWNLOADS_PER_TASK_LIMIT=100000,
+    VIDAR_AUTOMATED_DOWNLOADS_DAILY_LIMIT=0,
+)
+class LibraryBenchmarks(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.library = library.build_library()
+
+    def assertWithinBaseline(self, measurement):
+        regressions = runner.compare_to_baseline(measurement)
+        self.assertFalse(regressions, "\n".join(regressions))
+
+    @patch("vidar.tasks.fully_index_channel")
+    @patch("vidar.tasks.download_provider_video")
+    def test_automated_archiver(self, mock_dl, mock_index):
+        with runner.measure("task:automated_archiver") as measurement:
+            tasks.automated_archiver.delay().get()
+
+        mock_dl.delay.assert_called()
+        self.assertWithinBaseline(measurement)
+
+    @patch("vidar.tasks.sync_playlist_data")
+    @patch("vidar.tasks.trigger_channel_scanner_tasks")
+    def test_trigger_crontab_scans(self, mock_scanner, mock_sync):
+        now = timezone.localtime().replace(minute=0, second=0, microsecond=0)
+
+        with runner.measure("task:trigger_crontab_scans") as measurement:
+            tasks.trigger_crontab_scans.delay(now=now, check_if_crontab_was_missed=False).get()
+
+        mock_scanner.assert_called()
+        self.assertWithinBaseline(measurement)
+
+    @patch("vidar.tasks.download_provider_video_comments")
+    @patch("vidar.interactor.playlist_details")
+    def test_sync_playlist_data(self, mock_details, mock_comments):
+        playlist = self.library["playlists"][0]
+        videos = list(playlist.videos.all())[1:] + self.library["videos"][-5:]
+        mock_details.return_value = library.build_playlist_payload(playlist, videos, self.library["payload"])
+
+        with runner.measure("task:sync_playlist_data") as measurement:
+            tasks.sync_playlist_data.delay(pk=playlist.pk).get()
+
+        self.assertWithinBaseline(measurement)
+
+    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.tasks.convert_video_to_audio")
+    @patch("vidar.interactor.video_details")
+    def test_daily_maintenances(self, mock_details, mock_convert, mock_delete):
+        mock_details.return_value = {}
+
+        with runner.measure("task:daily_maintenances") as measurement:
+            tasks.daily_maintenances.delay().get()
+
+        self.assertWithinBaseline(measurement)
+
+    def test_channel_list_view(self):
+        user = User.objects.create_superuser(username="benchmark-admin", password="password")
+        self.client.force_login(user)
+
+        with runner.measure("view:channel-index") as measurement:
+            resp = self.client.get(reverse("vidar:channel-index"))
+
+        self.assertEqual(200, resp.status_code)
+        self.assertWithinBaseline(measurement)
+
+    def test_video_list_view(self):
+        user = User.objects.create_superuser(username="benchmark-admin", password="password")
+        self.client.force_login(user)
+
+        with runner.measure("view:index") as measurement:
+            resp = self.client.get(reverse("vidar:index"))
+
+        self.assertEqual(200, resp.status_code)
+        self.assertWithinBaseline(measurement)
@@ -1,14 +1,19 @@
+import pathlib
+import tempfile
+
 import yt_dlp
 
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 
 from celery.exceptions import MaxRetriesExceededError
 
 from vidar import models, tasks, app_settings, exceptions
 from vidar.helpers import celery_helpers
+from vidar.services import bandwidth_services
 
 User = get_user_model()
 
@@ -281,3 +286,149 @@ class Download_provider_video_tests(TestCase):
 
         mock_signal_started.send.assert_called_once()
         mock_signal_finished.send.assert_called_once()
+
+
+class Download_provider_video_proxy_tests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @patch("vidar.services.ytdlp_services.get_video_downloader_args")
+    @patch("vidar.services.video_services.download_exception")
+    @patch("vidar.interactor.video_download")
+    def test_ytdlp_proxy_failures_do_not_count_as_retries(self, mock_dl, mock_dl_exc, mock_args):
+        mock_dl.side_effect = yt_dlp.DownloadError("Unable to connect to proxy")
+        mock_dl_exc.return_value = False
+        mock_args.return_value = {"proxy": "proxy1"}
+
+        video = models.Video.objects.create()
+
+        with self.assertRaises(MaxRetriesExceededError):
+            tasks.download_provider_video.delay(pk=video.pk).get()
+
+        self.assertEqual(7, mock_dl.call_count)
+        self.assertEqual([0, 0, 0, 0, 1, 2, 3], [x.kwargs["retries"] for x in mock_dl_exc.call_args_list])
+        self.assertEqual([0, 0, 0, 0, 1, 2, 3], [x.kwargs["retries"] for x in mock_args.call_args_list])
+
+    @override_settings(VIDAR_PROXY_FAILOVER_RETRIES=0)
+    @patch("vidar.services.ytdlp_services.get_video_downloader_args")
+    @patch("vidar.services.video_services.download_exception")
+    @patch("vidar.interactor.video_download")
+    def test_ytdlp_proxy_failures_count_as_retries_without_failover(self, mock_dl, mock_dl_exc, mock_args):
+        mock_dl.side_effect = yt_dlp.DownloadError("Unable to connect to proxy")
+        mock_dl_exc.return_value = False
+        mock_args.return_value = {"proxy": "proxy1"}
+
+        video = models.Video.objects.create()
+
+        with self.assertRaises(MaxRetriesExceededError):
+            tasks.download_provider_video.delay(pk=video.pk).get()
+
+        self.assertEqual(4, mock_dl.call_count)
+
+
+class Download_provider_video_budget_tests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(VIDAR_BANDWIDTH_LIMIT=100)
+    @patch("vidar.services.video_services.download_exception")
+    @patch("vidar.interactor.video_download")
+    def test_download_holds_bandwidth_lease(self, mock_dl, mock_dl_exc):
+        leases = []
+
+        def video_download(bandwidth_lease, **kwargs):
+            leases.append(bandwidth_lease.budget.leases())
+            self.assertEqual(102400, kwargs["ratelimit"])
+            raise yt_dlp.DownloadError("error")
+
+        mock_dl.side_effect = video_download
+        mock_dl_exc.return_value = True
+
+        video = models.Video.objects.create()
+
+        tasks.download_provider_video.delay(pk=video.pk).get()
+
+        self.assertEqual(1, len(leases[0]))
+        self.assertEqual({}, bandwidth_services.BandwidthBudget().leases())
+
+    @patch("vidar.services.video_services.download_exception")
+    @patch("vidar.interactor.video_download")
+    def test_download_without_bandwidth_budget(self, mock_dl, mock_dl_exc):
+        mock_dl.side_effect = yt_dlp.DownloadError("error")
+        mock_dl_exc.return_value = True
+
+        video = models.Video.objects.create()
+
+        tasks.download_provider_video.delay(pk=video.pk).get()
+
+        self.assertIsNone(mock_dl.call_args.kwargs["bandwidth_lease"])
+
+    @patch("vidar.services.admission_services.DailyUsage.record")
+    @patch("vidar.tasks.post_download_processing")
+    @patch("vidar.services.video_services.save_infojson_file")
+    @patch("vidar.services.ytdlp_services.is_video_at_highest_quality_from_dlp_response")
+    @patch("vidar.services.ytdlp_services.get_video_downloaded_quality_from_dlp_response")
+    @patch("vidar.interactor.video_download")
+    def test_download_recorded_in_daily_usage(self, mock_dl, mock_quality_dld, mock_is_amq, mock_save_json, mock_proc, mock_record):
+        filepath = app_settings.MEDIA_CACHE / "test-not-existing.mp4"
+        mock_quality_dld.return_value = 720
+        mock_is_amq.return_value = True
+        mock_dl.return_value = {"format_id": "22", "requested_downloads": [{"filepath": filepath, "filesize": 1000}]}, {}
+
+        video = models.Video.objects.create()
+
+        tasks.download_provider_video.delay(pk=video.pk).get()
+
+        mock_record.assert_called_once()
+        self.assertEqual(video, mock_record.call_args.kwargs["video"])
+        self.assertEqual(1000, mock_record.call_args.kwargs["downloaded_bytes"])
+        self.assertEqual(1, mock_record.call_args.kwargs["downloads"])
+
+        video.refresh_from_db()
+        stats = video.get_latest_download_stats()
+        self.assertEqual("default", stats["download_profile"])
+        self.assertEqual(1000, stats["downloaded_bytes"])
+        self.assertIn("throughput", stats)
+
+        mock_record.reset_mock()
+        video = models.Video.objects.create()
+        tasks.download_provider_video.delay(pk=video.pk, automated_quality_upgrade=True).get()
+        self.assertEqual(0, mock_record.call_args.kwargs["downloads"])
+
+    @patch("vidar.services.video_services.download_exception")
+    @patch("vidar.interactor.video_download")
+    def test_download_tracked_in_media_cache(self, mock_dl, mock_dl_exc):
+        mock_dl.side_effect = yt_dlp.DownloadError("error")
+        mock_dl_exc.return_value = True
+
+        video = models.Video.objects.create(provider_object_id="abc")
+
+        with tempfile.TemporaryDirectory() as directory:
+            (pathlib.Path(directory) / "abc_720.f22.mp4.part").write_bytes(b"x" * 10)
+            with override_settings(VIDAR_MEDIA_CACHE=directory), self.assertLogs("vidar.tasks", "INFO") as logs:
+                tasks.download_provider_video.delay(pk=video.pk, quality=720).get()
+
+        entry = models.CachedFile.objects.get()
+        self.assertEqual(f"{directory}/abc_720", entry.path)
+        self.assertEqual(models.CachedFile.Stages.DOWNLOAD, entry.stage)
+        self.assertEqual(video, entry.video)
+        self.assertTrue(any("from 10 bytes already downloaded" in x for x in logs.output))
+
+    @override_settings(
+        VIDAR_BANDWIDTH_LIMIT=100,
+        VIDAR_DOWNLOAD_PROFILE="parallel",
+    )
+    @patch("vidar.services.video_services.download_exception")
+    @patch("vidar.interactor.video_download")
+    def test_download_splits_bandwidth_between_fragment_connections(self, mock_dl, mock_dl_exc):
+        mock_dl.side_effect = yt_dlp.DownloadError("error")
+        mock_dl_exc.return_value = True
+
+        video = models.Video.objects.create()
+
+        tasks.download_provider_video.delay(pk=video.pk).get()
+
+        self.assertEqual(4, mock_dl.call_args.kwargs["concurrent_fragment_downloads"])
+        self.assertEqual(25600, mock_dl.call_args.kwargs["ratelimit"])
@@ -6,6 +6,7 @@ import yt_dlp
 
 from unittest.mock import call, patch, MagicMock
 
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -13,9 +14,9 @@ from django.contrib.auth import get_user_model
 
 from django_celery_results.models import TaskResult
 
-from vidar import models, tasks, app_settings, exceptions
+from vidar import models, tasks, app_settings, exceptions, interactor
 from vidar.helpers import channel_helpers, celery_helpers
-from vidar.services import crontab_services
+from vidar.services import crontab_services, image_services
 
 from ..test_functions import date_to_aware_date
 
@@ -48,10 +49,12 @@ class Update_channel_banners_tests(TestCase):
 
     @patch("vidar.interactor.channel_details")
     @patch("vidar.services.channel_services.set_channel_details_from_ytdlp")
+    @patch("vidar.services.image_services.fetch_many")
     @patch("vidar.services.channel_services.set_thumbnail")
     @patch("vidar.services.channel_services.set_banner")
     @patch("vidar.services.channel_services.set_tvart")
-    def test_setters_called(self, mock_tvart, mock_banner, mock_thumb, mock_serv, mock_details):
+    def test_setters_called(self, mock_tvart, mock_banner, mock_thumb, mock_fetch, mock_serv, mock_details):
+        mock_fetch.return_value = {}
         mock_details.return_value = {
             "thumbnails": [
                 {"id": "avatar_uncropped", "url": "thumbnail url"},  # thumbnail
@@ -63,9 +66,10 @@ class Update_channel_banners_tests(TestCase):
         self.assertEqual(0, retries)
 
         mock_details.assert_called_once()
-        mock_thumb.assert_called_with(channel=self.channel, url="thumbnail url")
-        mock_banner.assert_called_with(channel=self.channel, url="banner url")
-        mock_tvart.assert_called_with(channel=self.channel, url="tvart url")
+        mock_fetch.assert_called_once_with(["thumbnail url", "banner url", "tvart url"], conditional=True)
+        mock_thumb.assert_called_with(channel=self.channel, url="thumbnail url", image=None)
+        mock_banner.assert_called_with(channel=self.channel, url="banner url", image=None)
+        mock_tvart.assert_called_with(channel=self.channel, url="tvart url", image=None)
 
     @patch("vidar.interactor.channel_details")
     @patch("vidar.services.channel_services.set_channel_details_from_ytdlp")
@@ -204,6 +208,27 @@ class Trigger_channel_scanner_tasks_tests(TestCase):
         mock_videos.apply_async.assert_not_called()
 
 
+    @override_settings(VIDAR_CHANNEL_SCAN_SINGLE_PASS=True)
+    @patch("vidar.tasks.scan_channel_tabs")
+    @patch("vidar.tasks.scan_channel_for_new_videos")
+    @patch("vidar.tasks.scan_channel_for_new_shorts")
+    @patch("vidar.tasks.scan_channel_for_new_livestreams")
+    def test_single_pass(self, mock_live, mock_shorts, mock_videos, mock_tabs):
+        channel = models.Channel.objects.create(
+            index_videos=True,
+            index_shorts=True,
+            index_livestreams=True
+        )
+
+        output = tasks.trigger_channel_scanner_tasks(channel=channel, limit=10, wait_period=5, countdown=3)
+
+        self.assertEqual(8, output)
+        mock_tabs.apply_async.assert_called_once_with(kwargs=dict(pk=channel.pk, limit=10), countdown=3)
+        mock_live.apply_async.assert_not_called()
+        mock_shorts.apply_async.assert_not_called()
+        mock_videos.apply_async.assert_not_called()
+
+
 class Check_missed_channel_scans_since_last_ran_tests(TestCase):
     def setUp(self) -> None:
         self.channel = models.Channel.objects.create(
@@ -1132,6 +1157,201 @@ class Scan_channel_for_new_videos_tests(TestCase):
         mock_comments.delay.assert_not_called()
 
 
+    @override_settings(VIDAR_CHANNEL_SCAN_INCREMENTAL=True, VIDAR_CHANNEL_SCAN_INCREMENTAL_KNOWN_RUN=2)
+    @patch("vidar.tasks.download_provider_video")
+    @patch("vidar.interactor.video_details")
+    @patch("vidar.interactor.func_with_retry")
+    def test_incremental_scan_extracts_only_new_videos(self, mock_inter, mock_details, mock_download):
+        models.Video.objects.create(provider_object_id="known-1", channel=self.channel, title="known 1")
+        models.Video.objects.create(provider_object_id="known-2", channel=self.channel, title="known 2")
+
+        mock_inter.return_value = {"entries": [
+            {"id": "new-id"},
+            {"id": "known-1"},
+            {"id": "known-2"},
+            {"id": "older-id"},
+        ]}
+        mock_details.side_effect = [
+            {
+                "uploader_id": self.channel.uploader_id,
+                "channel_id": self.channel.provider_object_id,
+                "id": "new-id",
+                "title": "new title",
+                "upload_date": "20250405",
+            },
+        ]
+
+        output = tasks.scan_channel_for_new_videos.delay(pk=self.channel.pk).get()
+
+        self.assertTrue(output)
+        self.assertEqual(interactor.channel_listing, mock_inter.call_args.kwargs["func"])
+        self.assertEqual(self.channel.scanner_limit, mock_inter.call_args.kwargs["playlistend"])
+        mock_details.assert_called_once()
+        self.assertEqual("https://www.youtube.com/watch?v=new-id", mock_details.call_args.kwargs["url"])
+        mock_download.delay.assert_called_once()
+
+        self.assertEqual(3, self.channel.videos.count())
+        self.assertEqual("new title", self.channel.videos.get(provider_object_id="new-id").title)
+        self.assertFalse(models.Video.objects.filter(provider_object_id="older-id").exists())
+
+        self.channel.refresh_from_db()
+        self.assertIsNotNone(self.channel.last_scanned)
+
+    @override_settings(VIDAR_CHANNEL_SCAN_INCREMENTAL=True)
+    @patch("vidar.interactor.video_details")
+    @patch("vidar.interactor.func_with_retry")
+    def test_incremental_scan_nothing_new(self, mock_inter, mock_details):
+        models.Video.objects.create(provider_object_id="known-1", channel=self.channel)
+
+        mock_inter.return_value = {"entries": [{"id": "known-1"}]}
+
+        output = tasks.scan_channel_for_new_videos.delay(pk=self.channel.pk).get()
+
+        self.assertTrue(output)
+        mock_details.assert_not_called()
+        self.channel.refresh_from_db()
+        self.assertIsNotNone(self.channel.last_scanned)
+
+
+class Scan_channel_tabs_tests(TestCase):
+
+    def setUp(self) -> None:
+        self.channel = models.Channel.objects.create(
+            provider_object_id="channel-id",
+            name="test channel",
+            status=channel_helpers.ChannelStatuses.ACTIVE,
+            uploader_id="channel-uploader-id",
+            index_videos=True,
+            download_videos=True,
+            index_shorts=True,
+            download_shorts=False,
+            index_livestreams=True,
+            download_livestreams=True,
+        )
+
+    def entry(self, video_id):
+        return {
+            "uploader_id": self.channel.uploader_id,
+            "channel_id": self.channel.provider_object_id,
+            "id": video_id,
+            "title": video_id,
+            "upload_date": "20250405",
+        }
+
+    @patch("vidar.tasks.download_provider_video")
+    @patch("vidar.interactor.channel_scan_tab")
+    @patch("vidar.interactor.channel_scan_session")
+    def test_tabs_scanned_through_one_session(self, mock_session, mock_tab, mock_download):
+        tabs = {
+            self.channel.url: {"entries": [self.entry("video-id")]},
+            self.channel.shorts_url: {"entries": [self.entry("short-id")]},
+            self.channel.livestreams_url: None,
+        }
+        mock_tab.side_effect = lambda ydl, url, limit: tabs[url]
+
+        output = tasks.scan_channel_tabs.delay(pk=self.channel.pk).get()
+
+        self.assertEqual(["Videos", "Shorts"], output)
+        mock_session.assert_called_once()
+        self.assertEqual(3, mock_tab.call_count)
+        ydl = mock_session.return_value.__enter__.return_value
+        for tab_call in mock_tab.call_args_list:
+            self.assertIs(ydl, tab_call.args[0])
+
+        self.assertTrue(models.Video.objects.get(provider_object_id="video-id").is_video)
+        self.assertTrue(models.Video.objects.get(provider_object_id="short-id").is_short)
+        mock_download.delay.assert_called_once()
+
+        self.channel.refresh_from_db()
+        self.assertIsNotNone(self.channel.last_scanned)
+        self.assertIsNotNone(self.channel.last_scanned_shorts)
+        self.assertIsNone(self.channel.last_scanned_livestreams)
+
+    @patch("vidar.interactor.channel_scan_tab")
+    @patch("vidar.interactor.channel_scan_session")
+    def test_missing_tab_disables_indexing_and_raises(self, mock_session, mock_tab):
+        def scan_tab(ydl, url, limit):
+            if url == self.channel.shorts_url:
+                raise yt_dlp.DownloadError("This channel does not have a shorts tab")
+            return {"entries": [self.entry(url)]}
+
+        mock_tab.side_effect = scan_tab
+
+        with self.assertRaises(yt_dlp.DownloadError):
+            tasks.scan_channel_tabs.delay(pk=self.channel.pk).get()
+
+        self.channel.refresh_from_db()
+        self.assertFalse(self.channel.index_shorts)
+        self.assertFalse(self.channel.download_shorts)
+        self.assertIsNotNone(self.channel.last_scanned)
+        self.assertIsNotNone(self.channel.last_scanned_livestreams)
+        self.assertIsNone(self.channel.last_scanned_shorts)
+
+    @patch("vidar.interactor.channel_scan_tab")
+    @patch("vidar.interactor.channel_scan_session")
+    def test_account_terminated(self, mock_session, mock_tab):
+        mock_tab.side_effect = yt_dlp.DownloadError("account terminated")
+        tasks.scan_channel_tabs.delay(pk=self.channel.pk).get()
+        mock_tab.assert_called_once()
+        self.channel.refresh_from_db()
+        self.assertEqual(channel_helpers.ChannelStatuses.TERMINATED, self.channel.status)
+
+    @override_settings(VIDAR_CHANNEL_SCAN_INCREMENTAL=True)
+    @patch("vidar.interactor.channel_scan_tab")
+    @patch("vidar.interactor.channel_scan_session")
+    def test_incremental_extracts_new_videos_through_session(self, mock_session, mock_tab):
+        self.channel.index_shorts = False
+        self.channel.index_livestreams = False
+        self.channel.save()
+        models.Video.objects.create(provider_object_id="known-id", channel=self.channel)
+
+        mock_tab.return_value = {"entries": [{"id": "new-id"}, {"id": "known-id"}]}
+        ydl = mock_session.return_value.__enter__.return_value
+        ydl.extract_info.return_value = self.entry("new-id")
+
+        tasks.scan_channel_tabs.delay(pk=self.channel.pk).get()
+
+        self.assertTrue(mock_session.call_args.kwargs["incremental"])
+        ydl.extract_info.assert_called_once_with("https://www.youtube.com/watch?v=new-id", download=False)
+        self.assertTrue(models.Video.objects.filter(provider_object_id="new-id").exists())
+
+    def test_no_tabs_indexed(self):
+        self.channel.index_videos = False
+        self.channel.index_shorts = False
+        self.channel.index_livestreams = False
+        self.channel.save()
+
+        self.assertIsNone(tasks.scan_channel_tabs.delay(pk=self.channel.pk).get())
+
+    @patch("vidar.interactor.channel_scan_tab")
+    @patch("vidar.interactor.channel_scan_session")
+    def test_tabs_scanned_by_their_own_task_are_skipped(self, mock_session, mock_tab):
+        mock_tab.return_value = None
+        lock_key = f"channel-scan-shorts-{self.channel.pk}"
+        cache.set(lock_key, True)
+        self.addCleanup(cache.delete, lock_key)
+
+        tasks.scan_channel_tabs.delay(pk=self.channel.pk).get()
+
+        urls = [x.kwargs["url"] for x in mock_tab.call_args_list]
+        self.assertEqual([self.channel.url, self.channel.livestreams_url], urls)
+        self.assertTrue(cache.get(lock_key))
+        self.assertIsNone(cache.get(f"channel-scan-videos-{self.channel.pk}"))
+        self.assertIsNone(cache.get(f"channel-scan-livestreams-{self.channel.pk}"))
+
+    @patch("vidar.tasks.scan_channel_for_new_content")
+    @patch("vidar.interactor.channel_scan_session")
+    def test_tab_tasks_locked_out_during_scan(self, mock_session, mock_scan):
+        def scan_tab(ydl, url, limit):
+            self.assertTrue(cache.get(f"channel-scan-videos-{self.channel.pk}"))
+            tasks.scan_channel_for_new_videos.delay(pk=self.channel.pk)
+
+        with patch("vidar.interactor.channel_scan_tab", side_effect=scan_tab):
+            tasks.scan_channel_tabs.delay(pk=self.channel.pk).get()
+
+        mock_scan.assert_not_called()
+
+
 class Scan_channel_for_new_shorts_tests(TestCase):
 
     def setUp(self) -> None:
@@ -2371,6 +2591,25 @@ class Daily_maintenances_tests(TestCase):
         mock_details.assert_called_once()
         mock_setter.assert_called_once()
 
+    @patch("vidar.services.image_services.fetch_many")
+    @patch("vidar.services.video_services.set_thumbnail")
+    @patch("vidar.interactor.video_details")
+    def test_archived_videos_without_thumbnail_are_fetched_together(self, mock_details, mock_setter, mock_fetch):
+        video1 = models.Video.objects.create(file="test1.mp4", provider_object_id="1")
+        video2 = models.Video.objects.create(file="test2.mp4", provider_object_id="2")
+        mock_details.side_effect = [{"thumbnail": "url 1"}, {"thumbnail": "url 2"}]
+        image = image_services.FetchedImage("url 1", b"data", "jpg", False)
+        mock_fetch.return_value = {"url 1": image}
+
+        tasks.daily_maintenances.delay().get()
+
+        mock_fetch.assert_called_once()
+        self.assertEqual(["url 1", "url 2"], list(mock_fetch.call_args.args[0]))
+        mock_setter.assert_has_calls([
+            call(video=video1, url="url 1", image=image),
+            call(video=video2, url="url 2", image=None),
+        ])
+
     @patch("vidar.services.video_services.set_thumbnail")
     @patch("vidar.interactor.video_details")
     def test_archived_video_without_thumbnail_fails(self, mock_details, mock_setter):
@@ -2439,7 +2678,7 @@ class Daily_maintenances_tests(TestCase):
 
         mock_task.delay.assert_called_once()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_videos_after_watching(self, mock_deleter):
 
         user = User.objects.create(username='test', password="password")
@@ -2457,9 +2696,9 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        mock_deleter.assert_called_with(video=video, keep_record=True)
+        mock_deleter.assert_called_with([video])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_videos_after_watching_keep_starred(self, mock_deleter):
 
         user = User.objects.create(username='test', password="password")
@@ -2480,10 +2719,10 @@ class Daily_maintenances_tests(TestCase):
 
         mock_deleter.assert_not_called()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.storages.vidar_storage.delete")
     def test_delete_videos_after_watching_fails(self, mock_deleter):
 
-        mock_deleter.side_effect = ValueError("test failure to delete")
+        mock_deleter.side_effect = OSError("test failure to delete")
 
         user = User.objects.create(username='test', password="password")
 
@@ -2498,11 +2737,11 @@ class Daily_maintenances_tests(TestCase):
 
         models.UserPlaybackHistory.objects.create(user=user, video=video, seconds=90)
 
-        with self.assertLogs("vidar.tasks") as logger:
+        with self.assertLogs("vidar.services.retention_services") as logger:
             tasks.daily_maintenances.delay().get()
-        self.assertIn("Failed to delete video", logger.output[-1])
+        self.assertIn("Failed to delete video files", logger.output[0])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_shorts_after_watching(self, mock_deleter):
 
         user = User.objects.create(username='test', password="password")
@@ -2520,9 +2759,9 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        mock_deleter.assert_called_with(video=video, keep_record=True)
+        mock_deleter.assert_called_with([video])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_shorts_after_watching_keep_starred(self, mock_deleter):
 
         user = User.objects.create(username='test', password="password")
@@ -2543,10 +2782,10 @@ class Daily_maintenances_tests(TestCase):
 
         mock_deleter.assert_not_called()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.storages.vidar_storage.delete")
     def test_delete_shorts_after_watching_fails(self, mock_deleter):
 
-        mock_deleter.side_effect = ValueError("test failure to delete")
+        mock_deleter.side_effect = OSError("test failure to delete")
 
         user = User.objects.create(username='test', password="password")
 
@@ -2561,11 +2800,11 @@ class Daily_maintenances_tests(TestCase):
 
         models.UserPlaybackHistory.objects.create(user=user, video=video, seconds=90)
 
-        with self.assertLogs("vidar.tasks") as logger:
+        with self.assertLogs("vidar.services.retention_services") as logger:
             tasks.daily_maintenances.delay().get()
-        self.assertIn("Failed to delete video", logger.output[-1])
+        self.assertIn("Failed to delete video files", logger.output[0])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_livestreams_after_watching(self, mock_deleter):
 
         user = User.objects.create(username='test', password="password")
@@ -2583,9 +2822,9 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        mock_deleter.assert_called_with(video=video, keep_record=True)
+        mock_deleter.assert_called_with([video])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_livestreams_after_watching_keep_starred(self, mock_deleter):
 
         user = User.objects.create(username='test', password="password")
@@ -2606,9 +2845,9 @@ class Daily_maintenances_tests(TestCase):
 
         mock_deleter.assert_not_called()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.storages.vidar_storage.delete")
     def test_delete_livestreams_after_watching_fails(self, mock_deleter):
-        mock_deleter.side_effect = ValueError("test failure to delete")
+        mock_deleter.side_effect = OSError("test failure to delete")
 
         user = User.objects.create(username='test', password="password")
 
@@ -2623,11 +2862,11 @@ class Daily_maintenances_tests(TestCase):
 
         models.UserPlaybackHistory.objects.create(user=user, video=video, seconds=90)
 
-        with self.assertLogs("vidar.tasks") as logger:
+        with self.assertLogs("vidar.services.retention_services") as logger:
             tasks.daily_maintenances.delay().get()
-        self.assertIn("Failed to delete video", logger.output[-1])
+        self.assertIn("Failed to delete video files", logger.output[0])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_videos_after_days(self, mock_deleter):
 
         channel = models.Channel.objects.create(delete_videos_after_days=2)
@@ -2648,9 +2887,9 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        mock_deleter.assert_called_with(video=video, keep_record=True)
+        mock_deleter.assert_called_with([video])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_videos_after_days_keep_starred(self, mock_deleter):
 
         channel = models.Channel.objects.create(delete_videos_after_days=2)
@@ -2674,9 +2913,9 @@ class Daily_maintenances_tests(TestCase):
 
         mock_deleter.assert_not_called()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.storages.vidar_storage.delete")
     def test_delete_videos_after_days_fails(self, mock_deleter):
-        mock_deleter.side_effect = ValueError("test failure to delete")
+        mock_deleter.side_effect = OSError("test failure to delete")
 
         channel = models.Channel.objects.create(delete_videos_after_days=2)
 
@@ -2689,11 +2928,11 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        with self.assertLogs("vidar.tasks") as logger:
+        with self.assertLogs("vidar.services.retention_services") as logger:
             tasks.daily_maintenances.delay().get()
-        self.assertIn("Failed to delete video", logger.output[-1])
+        self.assertIn("Failed to delete video files", logger.output[0])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_shorts_after_days(self, mock_deleter):
 
         channel = models.Channel.objects.create(delete_shorts_after_days=2)
@@ -2714,9 +2953,9 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        mock_deleter.assert_called_with(video=video, keep_record=True)
+        mock_deleter.assert_called_with([video])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_shorts_after_days_keep_starred(self, mock_deleter):
 
         channel = models.Channel.objects.create(delete_shorts_after_days=2)
@@ -2740,9 +2979,9 @@ class Daily_maintenances_tests(TestCase):
 
         mock_deleter.assert_not_called()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.storages.vidar_storage.delete")
     def test_delete_shorts_after_days_fails(self, mock_deleter):
-        mock_deleter.side_effect = ValueError("test failure to delete")
+        mock_deleter.side_effect = OSError("test failure to delete")
 
         channel = models.Channel.objects.create(delete_shorts_after_days=2)
 
@@ -2755,11 +2994,11 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        with self.assertLogs("vidar.tasks") as logger:
+        with self.assertLogs("vidar.services.retention_services") as logger:
             tasks.daily_maintenances.delay().get()
-        self.assertIn("Failed to delete video", logger.output[-1])
+        self.assertIn("Failed to delete video files", logger.output[0])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_livestreams_after_days(self, mock_deleter):
 
         channel = models.Channel.objects.create(delete_livestreams_after_days=2)
@@ -2780,9 +3019,9 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        mock_deleter.assert_called_with(video=video, keep_record=True)
+        mock_deleter.assert_called_with([video])
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
     def test_delete_livestreams_after_days_keep_starred(self, mock_deleter):
 
         channel = models.Channel.objects.create(delete_livestreams_after_days=2)
@@ -2806,9 +3045,9 @@ class Daily_maintenances_tests(TestCase):
 
         mock_deleter.assert_not_called()
 
-    @patch("vidar.services.video_services.delete_video")
+    @patch("vidar.storages.vidar_storage.delete")
     def test_delete_livestreams_after_days_fails(self, mock_deleter):
-        mock_deleter.side_effect = ValueError("test failure to delete")
+        mock_deleter.side_effect = OSError("test failure to delete")
 
         channel = models.Channel.objects.create(delete_livestreams_after_days=2)
 
@@ -2821,9 +3060,103 @@ class Daily_maintenances_tests(TestCase):
 
         tasks.daily_maintenances.delay().get()
 
-        with self.assertLogs("vidar.tasks") as logger:
+        with self.assertLogs("vidar.services.retention_services") as logger:
             tasks.daily_maintenances.delay().get()
-        self.assertIn("Failed to delete video", logger.output[-1])
+        self.assertIn("Failed to delete video files", logger.output[0])
+
+    @patch("vidar.tasks.daily_maintenance_section")
+    @patch("vidar.tasks.chord")
+    def test_sections_dispatched_as_chord(self, mock_chord, mock_section):
+        tasks.daily_maintenances.delay().get()
+
+        mock_chord.assert_called_once()
+        self.assertEqual(len(tasks.DAILY_MAINTENANCE_SECTIONS), len(mock_chord.call_args.args[0]))
+        mock_section.si.assert_any_call(section="thumbnails")
+        mock_section.si.assert_any_call(section="retention")
+
+    @patch("vidar.tasks.convert_video_to_audio")
+    def test_section_processed_in_chunks(self, mock_task):
+        videos = [models.Video.objects.create(convert_to_audio=True, file="test.mp4") for _ in range(3)]
+
+        with patch.object(celery_helpers, "set_task_cursor") as mock_set:
+            output = tasks.daily_maintenance_section.delay(section="video_audio", chunk_size=2).get()
+
+        self.assertEqual(3, output)
+        self.assertEqual(3, mock_task.delay.call_count)
+        mock_set.assert_has_calls([
+            call("daily-maintenance-cursor-video_audio", videos[1].pk),
+            call("daily-maintenance-cursor-video_audio", videos[2].pk),
+        ])
+        self.assertIsNone(celery_helpers.get_task_cursor("daily-maintenance-cursor-video_audio"))
+
+    @patch("vidar.tasks.convert_video_to_audio")
+    def test_section_resumes_from_persisted_cursor(self, mock_task):
+        video1 = models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+        video2 = models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+
+        celery_helpers.set_task_cursor("daily-maintenance-cursor-video_audio", video1.pk)
+
+        output = tasks.daily_maintenance_section.delay(section="video_audio").get()
+
+        self.assertEqual(1, output)
+        mock_task.delay.assert_called_once_with(video2.pk)
+        self.assertIsNone(celery_helpers.get_task_cursor("daily-maintenance-cursor-video_audio"))
+
+    @patch("vidar.tasks.convert_video_to_audio")
+    def test_section_interrupted_keeps_cursor(self, mock_task):
+        video1 = models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+        models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+
+        set_task_cursor = celery_helpers.set_task_cursor
+
+        def set_cursor_until_worker_lost(key, value):
+            if value != video1.pk:
+                raise ValueError("worker lost")
+            set_task_cursor(key, value)
+
+        with patch.object(celery_helpers, "set_task_cursor", side_effect=set_cursor_until_worker_lost):
+            with self.assertRaises(ValueError):
+                tasks.daily_maintenance_section.delay(section="video_audio", chunk_size=1).get()
+
+        self.assertEqual(video1.pk, celery_helpers.get_task_cursor("daily-maintenance-cursor-video_audio"))
+        celery_helpers.clear_task_cursor("daily-maintenance-cursor-video_audio")
+
+    @patch("vidar.tasks.convert_video_to_audio")
+    def test_section_failing_chunk_skipped(self, mock_task):
+        video1 = models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+        video2 = models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+
+        mock_task.delay.side_effect = [ValueError("provider failure"), None]
+
+        with self.assertLogs("vidar.tasks", level="ERROR"):
+            output = tasks.daily_maintenance_section.delay(section="video_audio", chunk_size=1).get()
+
+        self.assertEqual(2, output)
+        mock_task.delay.assert_has_calls([call(video1.pk), call(video2.pk)])
+        self.assertIsNone(celery_helpers.get_task_cursor("daily-maintenance-cursor-video_audio"))
+
+    @patch("vidar.tasks.convert_video_to_audio")
+    def test_section_already_running_succeeds(self, mock_task):
+        models.Video.objects.create(convert_to_audio=True, file="test.mp4")
+
+        cache.add("daily-maintenance-video_audio", True)
+        try:
+            result = tasks.daily_maintenance_section.delay(section="video_audio")
+        finally:
+            cache.delete("daily-maintenance-video_audio")
+
+        self.assertEqual("SUCCESS", result.state)
+        mock_task.delay.assert_not_called()
+
+    @patch("vidar.interactor.video_details")
+    def test_thumbnails_extraction_failure_logged(self, mock_details):
+        models.Video.objects.create(file="test.mp4", provider_object_id="abc")
+        mock_details.side_effect = yt_dlp.DownloadError("unavailable")
+
+        with self.assertLogs("vidar.services.extraction_services", level="ERROR"):
+            output = tasks.daily_maintenance_section.delay(section="thumbnails").get()
+
+        self.assertEqual(1, output)
 
 
 class Channel_rename_files_tests(TestCase):
@@ -2845,6 +3178,49 @@ class Channel_rename_files_tests(TestCase):
             tasks.channel_rename_files.delay(channel_id=self.channel.pk).get()
 
 
+class Trigger_file_hashing_tests(TestCase):
+
+    @override_settings(VIDAR_DEDUPE_HASH_BATCH_SIZE=2)
+    @patch("vidar.services.dedupe_services.hash_videos")
+    def test_hashes_unhashed_videos_in_batches(self, mock_hash):
+        video1 = models.Video.objects.create(file="one.mp4")
+        video2 = models.Video.objects.create(file="two.mp4")
+        video3 = models.Video.objects.create(file="three.mp4", file_hash="hashed")
+        video3.extra_files.create(file="three.en.srt")
+        models.Video.objects.create(file="four.mp4", file_hash="hashed")
+        models.Video.objects.create()
+
+        output = tasks.trigger_file_hashing.delay().get()
+
+        self.assertEqual(3, output)
+        mock_hash.assert_has_calls([call(pks=[video1.pk, video2.pk]), call(pks=[video3.pk])])
+        self.assertEqual(2, mock_hash.call_count)
+
+    @override_settings(VIDAR_DEDUPE_HASH_MAX_PER_RUN=2)
+    @patch("vidar.services.dedupe_services.hash_videos")
+    def test_capped_per_run(self, mock_hash):
+        video1 = models.Video.objects.create(file="one.mp4")
+        video2 = models.Video.objects.create(file="two.mp4")
+        models.Video.objects.create(file="three.mp4")
+
+        output = tasks.trigger_file_hashing.delay().get()
+
+        self.assertEqual(2, output)
+        mock_hash.assert_called_once_with(pks=[video1.pk, video2.pk])
+
+
+class Reconcile_media_files_tests(TestCase):
+
+    @patch("vidar.services.reconciliation_services.reconcile")
+    def test_commits_by_default(self, mock_reconcile):
+        mock_reconcile.return_value = {"orphaned_files": ["orphan.mp4"], "missing_videos": []}
+
+        output = tasks.reconcile_media_files.delay().get()
+
+        mock_reconcile.assert_called_once_with(commit=True)
+        self.assertEqual({"orphaned_files": 1, "missing_videos": 0}, output)
+
+
 class Rename_all_archived_video_files_tests(TestCase):
 
     def test_resets_file_not_found_flag(self):
@@ -2862,7 +3238,7 @@ class Rename_all_archived_video_files_tests(TestCase):
         with self.assertRaises(exceptions.FileStorageBackendHasNoMoveError):
             tasks.rename_all_archived_video_files.delay().get()
 
-    @patch("vidar.tasks.rename_video_files")
+    @patch("vidar.renamers.rename_videos")
     def test_video_has_file_no_need_to_rename(self, mock_renamer):
         video = models.Video.objects.create(
             title="Test Video",
@@ -2873,9 +3249,9 @@ class Rename_all_archived_video_files_tests(TestCase):
 
         tasks.rename_all_archived_video_files.delay().get()
 
-        mock_renamer.delay.assert_not_called()
+        mock_renamer.assert_not_called()
 
-    @patch("vidar.tasks.rename_video_files")
+    @patch("vidar.renamers.rename_videos")
     def test_videos_one_has_file_no_need_to_rename_other_needs_fixing(self, mock_renamer):
         video = models.Video.objects.create(
             title="Test Video",
@@ -2892,7 +3268,16 @@ class Rename_all_archived_video_files_tests(TestCase):
 
         tasks.rename_all_archived_video_files.delay().get()
 
-        mock_renamer.delay.assert_called_once_with(pk=video.pk, remove_empty=True)
+        mock_renamer.assert_called_once_with(videos=[video], remove_empty=True)
+
+    @patch("vidar.helpers.celery_helpers.refresh_task_lock")
+    @patch("vidar.renamers.rename_videos")
+    def test_lock_refreshed_per_chunk(self, mock_renamer, mock_refresh):
+        models.Video.objects.create(file="test.mp4")
+
+        tasks.rename_all_archived_video_files.delay().get()
+
+        mock_refresh.assert_called_once_with("rename-archived-files", 60 * 60)
 
 
 class Rename_video_files_tests(TestCase):
@@ -3119,26 +3504,23 @@ class Monthly_maintenances_tests(TestCase):
         VIDAR_MONTHLY_CHANNEL_CRONTAB_BALANCING=False,
         VIDAR_MONTHLY_VIDEO_CONFIRM_FILENAMES_ARE_CORRECT=True,
     )
-    @patch("vidar.tasks.rename_video_files")
-    def test_rename_all_files_calls_task(self, mock_task):
+    @patch("vidar.renamers.rename_videos")
+    def test_rename_all_files_calls_task(self, mock_renamer):
         video = models.Video.objects.create(file="test.mp4")
         tasks.monthly_maintenances.delay().get()
-        mock_task.delay.assert_called_once_with(pk=video.pk, remove_empty=True)
+        mock_renamer.assert_called_once_with(videos=[video], remove_empty=True)
 
     @override_settings(
         VIDAR_MONTHLY_CHANNEL_UPDATE_BANNERS=False,
         VIDAR_MONTHLY_CHANNEL_CRONTAB_BALANCING=False,
         VIDAR_MONTHLY_VIDEO_CONFIRM_FILENAMES_ARE_CORRECT=True,
     )
-    @patch("vidar.tasks.rename_video_files")
-    def test_rename_all_files_calls_task_for_each_video(self, mock_task):
+    @patch("vidar.renamers.rename_videos")
+    def test_rename_all_files_calls_task_for_each_video(self, mock_renamer):
         video1 = models.Video.objects.create(file="test.mp4")
         video2 = models.Video.objects.create(file="test.mp4")
         tasks.monthly_maintenances.delay().get()
-        mock_task.delay.assert_has_calls([
-            call(pk=video1.pk, remove_empty=True),
-            call(pk=video2.pk, remove_empty=True)
-        ], any_order=True)
+        mock_renamer.assert_called_once_with(videos=[video1, video2], remove_empty=True)
 
     @override_settings(
         VIDAR_MONTHLY_CHANNEL_UPDATE_BANNERS=False,
@@ -11,11 +11,12 @@ from unittest.mock import call, patch, MagicMock
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from vidar import models, tasks, app_settings, exceptions
 from vidar.helpers import channel_helpers, celery_helpers
-from vidar.services import crontab_services
+from vidar.services import crontab_services, extraction_services, pacing_services
 from vidar.storages import vidar_storage
 
 from ..test_functions import date_to_aware_date
@@ -25,6 +26,9 @@ User = get_user_model()
 
 class Automated_archiver_tests(TestCase):
 
+    def setUp(self):
+        cache.clear()
+
     @patch("vidar.tasks.fully_index_channel")
     @patch("vidar.tasks.download_provider_video")
     @patch("vidar.services.notification_services.full_archiving_started")
@@ -172,6 +176,56 @@ class Automated_archiver_tests(TestCase):
             requested_by=f"Full Archive: {channel!r}",
         )
 
+    @override_settings(
+        VIDAR_AUTOMATED_DOWNLOADS_DAILY_LIMIT=10,
+        VIDAR_AUTOMATED_DOWNLOADS_PER_TASK_LIMIT=10,
+        VIDAR_BANDWIDTH_LIMIT=100,
+        VIDAR_BANDWIDTH_ADMISSION_WINDOW=10,
+    )
+    @patch("vidar.tasks.fully_index_channel")
+    @patch("vidar.tasks.download_provider_video")
+    def test_channel_downloads_limited_by_bandwidth_budget(self, mock_dl, mock_indexer):
+        channel = models.Channel.objects.create(fully_indexed=True, full_archive=True)
+
+        def create_video(upload_date, size):
+            return channel.videos.create(
+                upload_date=date_to_aware_date(upload_date),
+                dlp_formats=[{"height": 720, "vcodec": "avc1", "filesize": size}],
+            )
+
+        video1 = create_video("2025-01-01", 600000)
+        create_video("2025-01-02", 500000)
+        video3 = create_video("2025-01-03", 300000)
+
+        tasks.automated_archiver.delay().get()
+
+        self.assertEqual([video1.pk, video3.pk], [x.kwargs["pk"] for x in mock_dl.delay.call_args_list])
+
+    @override_settings(
+        VIDAR_AUTOMATED_DOWNLOADS_DAILY_LIMIT=10,
+        VIDAR_AUTOMATED_DOWNLOADS_PER_TASK_LIMIT=10,
+        VIDAR_AUTOMATED_DOWNLOADS_DAILY_BYTES=1000,
+    )
+    @patch("vidar.tasks.fully_index_channel")
+    @patch("vidar.tasks.download_provider_video")
+    def test_channel_downloads_limited_by_daily_bytes(self, mock_dl, mock_indexer):
+        channel = models.Channel.objects.create(fully_indexed=True, full_archive=True)
+        channel.videos.create(date_downloaded=timezone.now(), file="test.mp4", file_size=700)
+
+        def create_video(upload_date, size):
+            return channel.videos.create(
+                upload_date=date_to_aware_date(upload_date),
+                dlp_formats=[{"height": 720, "vcodec": "avc1", "filesize": size}],
+            )
+
+        video1 = create_video("2025-01-01", 200)
+        create_video("2025-01-02", 200)
+        video3 = create_video("2025-01-03", 50)
+
+        tasks.automated_archiver.delay().get()
+
+        self.assertEqual([video1.pk, video3.pk], [x.kwargs["pk"] for x in mock_dl.delay.call_args_list])
+
     @patch("vidar.tasks.fully_index_channel")
     @patch("vidar.tasks.download_provider_video")
     def test_channel_downloads_videos_after_full_archive_cutoff(self, mock_dl, mock_indexer):
@@ -823,6 +877,9 @@ class Automated_archiver_tests(TestCase):
 
 class Update_video_statuses_and_details(TestCase):
 
+    def setUp(self):
+        cache.clear()
+
     @patch("vidar.tasks.update_video_details")
     def test_video_less_than_check_age_not_checked_again(self, mock_task):
         models.Video.objects.create(file="test.mp4")
@@ -868,6 +925,161 @@ class Update_video_statuses_and_details(TestCase):
 
         self.assertEqual(2, mock_task.apply_async.call_count)
 
+    @override_settings(
+        VIDAR_PRIVACY_STATUS_CHECK_USE_CHANNEL_LISTINGS=True,
+        VIDAR_PRIVACY_STATUS_CHECK_FORCE_CHECK_PER_CALL=3,
+    )
+    @patch("vidar.tasks.update_channel_video_statuses")
+    @patch("vidar.tasks.update_video_details")
+    def test_channel_videos_grouped_into_listing_task(self, mock_task, mock_channel_task):
+        channel = models.Channel.objects.create(provider_object_id="UC-channel")
+
+        ts = timezone.now() - timezone.timedelta(days=33)
+        with patch.object(timezone, "now", return_value=ts):
+            video1 = models.Video.objects.create(file="test.mp4", channel=channel)
+            video2 = models.Video.objects.create(file="test.mp4", channel=channel)
+            video3 = models.Video.objects.create(file="test.mp4")
+
+        tasks.update_video_statuses_and_details()
+
+        mock_task.apply_async.assert_called_once_with(kwargs=dict(pk=video3.pk, mode="auto"), countdown=0)
+        mock_channel_task.apply_async.assert_called_once()
+        kwargs = mock_channel_task.apply_async.call_args.kwargs["kwargs"]
+        self.assertEqual(channel.pk, kwargs["pk"])
+        self.assertCountEqual([video1.pk, video2.pk], kwargs["video_pks"])
+
+    @patch("vidar.tasks.update_video_details")
+    def test_daily_budget_consumed_stops_checking(self, mock_task):
+        ts = timezone.now() - timezone.timedelta(days=33)
+        with patch.object(timezone, "now", return_value=ts):
+            models.Video.objects.create(file="test.mp4")
+
+        tasks.update_video_statuses_and_details()
+        self.assertEqual(1, mock_task.apply_async.call_count)
+        self.assertEqual(0, pacing_services.video_details_pacer().consumed_today())
+
+        # As update_video_details does when it runs.
+        pacing_services.video_details_pacer().consume()
+
+        tasks.update_video_statuses_and_details()
+        self.assertEqual(1, mock_task.apply_async.call_count)
+
+    @patch("vidar.tasks.update_video_details")
+    def test_daily_budget_not_recounted(self, mock_task):
+        tasks.update_video_statuses_and_details()
+
+        ts = timezone.now() - timezone.timedelta(days=33)
+        with patch.object(timezone, "now", return_value=ts):
+            models.Video.objects.create(file="test.mp4")
+
+        tasks.update_video_statuses_and_details()
+        mock_task.apply_async.assert_not_called()
+
+    @override_settings(VIDAR_PRIVACY_STATUS_CHECK_FORCE_CHECK_PER_CALL=3)
+    @patch("vidar.tasks.update_video_details")
+    def test_countdowns_stretched_by_provider_failures(self, mock_task):
+        ts = timezone.now() - timezone.timedelta(days=33)
+        with patch.object(timezone, "now", return_value=ts):
+            for _ in range(3):
+                models.Video.objects.create(file="test.mp4")
+
+        pacing_services.video_details_pacer().record_failure(throttled=True)
+
+        tasks.update_video_statuses_and_details()
+
+        countdowns = [c.kwargs["countdown"] for c in mock_task.apply_async.call_args_list]
+        self.assertEqual(0, countdowns[0])
+        self.assertGreaterEqual(countdowns[1], 46 * 2)
+        self.assertGreaterEqual(countdowns[2] - countdowns[1], 46 * 2)
+
+
+class Update_channel_video_statuses_tests(TestCase):
+
+    def setUp(self):
+        self.channel = models.Channel.objects.create(provider_object_id="UC-channel")
+        self.video1 = models.Video.objects.create(
+            provider_object_id="video-1", title="old title", channel=self.channel, file="test.mp4"
+        )
+        self.video2 = models.Video.objects.create(
+            provider_object_id="video-2", title="video 2", channel=self.channel, file="test.mp4"
+        )
+        self.video3 = models.Video.objects.create(
+            provider_object_id="video-3", title="video 3", channel=self.channel, file="test.mp4"
+        )
+
+    @patch("vidar.tasks.update_video_details")
+    @patch("vidar.interactor.channel_listing")
+    def test_listed_videos_bulk_updated_missing_checked_individually(self, mock_listing, mock_task):
+        mock_listing.return_value = {
+            "entries": [
+                {"id": "video-1", "title": "new title", "view_count": 100},
+                {"id": "video-2", "title": "[Private video]"},
+                None,
+            ]
+        }
+
+        tasks.update_channel_video_statuses.delay(
+            pk=self.channel.pk, video_pks=[self.video1.pk, self.video3.pk]
+        ).get()
+
+        mock_listing.assert_called_once()
+        self.assertEqual("https://www.youtube.com/playlist?list=UU-channel", mock_listing.call_args.args[0])
+
+        self.video1.refresh_from_db()
+        self.video2.refresh_from_db()
+        self.video3.refresh_from_db()
+
+        self.assertEqual("new title", self.video1.title)
+        self.assertEqual(100, self.video1.view_count)
+        self.assertIsNotNone(self.video1.last_privacy_status_check)
+        self.assertEqual(1, self.video1.privacy_status_checks)
+        self.assertTrue(self.video1.change_history.filter(old_title="old title", new_title="new title").exists())
+
+        self.assertEqual(models.Video.VideoPrivacyStatuses.PRIVATE, self.video2.privacy_status)
+        self.assertEqual("video 2", self.video2.title)
+        # Listed without being due, refreshed but not recorded as checked.
+        self.assertIsNone(self.video2.last_privacy_status_check)
+        self.assertEqual(0, self.video2.privacy_status_checks)
+        self.assertNotIn("update_video_details_automated", self.video2.system_notes)
+
+        self.assertIsNone(self.video3.last_privacy_status_check)
+        mock_task.apply_async.assert_called_once_with(kwargs=dict(pk=self.video3.pk, mode="auto"), countdown=0)
+
+    @patch("vidar.tasks.update_video_details")
+    @patch("vidar.interactor.channel_listing")
+    def test_listed_videos_consume_daily_budget(self, mock_listing, mock_task):
+        cache.clear()
+        mock_listing.return_value = {"entries": [{"id": "video-1", "title": "new title"}, {"id": "video-2"}]}
+
+        tasks.update_channel_video_statuses.delay(
+            pk=self.channel.pk, video_pks=[self.video1.pk, self.video2.pk, self.video3.pk]
+        ).get()
+
+        self.assertEqual(2, pacing_services.video_details_pacer().consumed_today())
+
+    @patch("vidar.tasks.update_video_details")
+    @patch("vidar.interactor.channel_listing")
+    def test_listing_failure_checks_videos_individually(self, mock_listing, mock_task):
+        mock_listing.side_effect = yt_dlp.DownloadError("failed")
+
+        tasks.update_channel_video_statuses.delay(pk=self.channel.pk, video_pks=[self.video1.pk]).get()
+
+        mock_task.apply_async.assert_called_once_with(kwargs=dict(pk=self.video1.pk, mode="auto"), countdown=0)
+
+    @patch("vidar.tasks.update_video_details")
+    @patch("vidar.interactor.channel_listing")
+    def test_title_locked_not_changed(self, mock_listing, mock_task):
+        self.video1.title_locked = True
+        self.video1.save()
+        mock_listing.return_value = {"entries": [{"id": "video-1", "title": "new title", "availability": "unlisted"}]}
+
+        tasks.update_channel_video_statuses.delay(pk=self.channel.pk).get()
+
+        self.video1.refresh_from_db()
+        self.assertEqual("old title", self.video1.title)
+        self.assertEqual(models.Video.VideoPrivacyStatuses.UNLISTED, self.video1.privacy_status)
+        mock_task.apply_async.assert_not_called()
+
 
 class Load_sponsorblock_data_tests(TestCase):
 
@@ -1667,6 +1879,25 @@ class Delete_cached_file_tests(TestCase):
         self.assertTrue(output)
         mock_unlink.assert_called_once_with("test.mp4")
 
+    @override_settings(VIDAR_DELETE_DOWNLOAD_CACHE=True)
+    @patch("os.unlink")
+    def test_deleted_file_is_no_longer_tracked(self, mock_unlink):
+        models.CachedFile.objects.create(path="test.mp4", stage=models.CachedFile.Stages.CONVERSION)
+        models.CachedFile.objects.create(path="other.mp4", stage=models.CachedFile.Stages.CONVERSION)
+
+        tasks.delete_cached_file("test.mp4")
+
+        self.assertEqual(["other.mp4"], list(models.CachedFile.objects.values_list("path", flat=True)))
+
+
+class Clean_media_cache_tests(TestCase):
+
+    @patch("vidar.services.cache_services.collect_garbage")
+    def test_basics(self, mock_collect):
+        mock_collect.return_value = {"deleted": [], "freed": 0, "usage": 0}
+        self.assertEqual(mock_collect.return_value, tasks.clean_media_cache.delay().get())
+        mock_collect.assert_called_once_with()
+
 
 class Load_video_thumbnail_tests(TestCase):
 
@@ -1697,6 +1928,17 @@ class Load_video_thumbnail_tests(TestCase):
 
 class Update_video_details_tests(TestCase):
 
+    @patch("vidar.interactor.video_details")
+    def test_consumes_daily_budget_when_run(self, mock_details):
+        cache.clear()
+        mock_details.return_value = {}
+        video = models.Video.objects.create(file="test.mp4")
+
+        with self.assertRaises(ValueError, msg="No output from yt-dlp"):
+            tasks.update_video_details.delay(pk=video.pk).get()
+
+        self.assertEqual(1, pacing_services.video_details_pacer().consumed_today())
+
     @override_settings(VIDAR_SAVE_INFO_JSON_FILE=True)
     @patch("vidar.interactor.video_details")
     def test_video_with_file_missing_info_json_ytdlp_kwargs_adds_write_info_json(self, mock_details):
@@ -1743,6 +1985,36 @@ class Update_video_details_tests(TestCase):
             instance=video,
         )
 
+    @override_settings(VIDAR_SAVE_INFO_JSON_FILE=True)
+    @patch("vidar.tasks.rename_video_files")
+    @patch("vidar.services.video_services.save_infojson_file")
+    @patch("vidar.interactor.video_details")
+    def test_automatic_update_reuses_cached_extraction(self, mock_details, mock_save_json, mock_rename):
+        cache.clear()
+        info = {
+            "id": "abc",
+            "title": "video",
+            "upload_date": "20240101",
+            "formats": [{"format_id": "22", "height": 720}],
+        }
+        extraction_services.store(info)
+
+        video = models.Video.objects.create(provider_object_id="abc", file="test.mp4", thumbnail="test.jpg")
+        with patch.object(video.file.storage, "exists", return_value=True):
+            tasks.update_video_details.delay(pk=video.pk, mode="auto").get()
+
+        mock_details.assert_not_called()
+        mock_save_json.assert_called_once_with(
+            video=video,
+            downloaded_file_data=None,
+            overwrite_formats=False,
+            infojson_data=info,
+        )
+
+        mock_details.return_value = {**info, "title": "new title"}
+        tasks.update_video_details.delay(pk=video.pk, mode="manual").get()
+        mock_details.assert_called_once()
+
     @override_settings(VIDAR_SAVE_INFO_JSON_FILE=True)
     @patch("vidar.services.video_services.log_update_video_details_called")
     @patch("vidar.interactor.video_details")
@@ -1789,6 +2061,19 @@ class Update_video_details_tests(TestCase):
 
         mock_log.assert_called_once_with(video=video, mode="auto", commit=True, result="4th attempt retry in 1 hour")
 
+    @patch("vidar.interactor.video_details")
+    def test_ytdlp_dl_error_throttled_slows_pacing(self, mock_detail):
+        cache.clear()
+        mock_detail.side_effect = yt_dlp.DownloadError("HTTP Error 429: Too Many Requests")
+
+        video = models.Video.objects.create()
+
+        with self.assertRaises(yt_dlp.DownloadError):
+            tasks.update_video_details.delay(pk=video.pk, mode="auto").get()
+
+        self.assertEqual(pacing_services.PacingScheduler.MAX_PENALTY, pacing_services.video_details_pacer().penalty)
+        cache.clear()
+
     @override_settings(VIDAR_SAVE_INFO_JSON_FILE=True)
     @patch("vidar.services.video_services.log_update_video_details_called")
     @patch("vidar.interactor.video_details")
@@ -2,6 +2,8 @@
     Not for actually testing functionality, it's for overridden
     functions and functions only used to support tests.
 """
+from unittest.mock import MagicMock
+
 from django.utils import timezone
 
 
@@ -32,5 +34,11 @@ def ytdlp_initializer_test(action, instance=None, **kwargs):
     return f'inside tests.test_functions.ytdlp_initializer_test {action=} {instance=} {kwargs=}'
 
 
+def ytdlp_initializer_pooled(action, instance=None, **kwargs):
+    ydl = MagicMock(params=dict(kwargs))
+    ydl.initializer_kwargs = dict(action=action, instance=instance, **kwargs)
+    return ydl
+
+
 def proxies_user_defined(**kwargs):
     return kwargs
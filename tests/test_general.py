@@ -1,8 +1,10 @@
 # flake8: noqa
+import io
 import json
 import pathlib
+import yt_dlp
 
-from unittest.mock import patch, call
+from unittest.mock import ANY, patch, call, MagicMock
 from django_celery_beat.models import PeriodicTask
 
 from django.test import SimpleTestCase, TestCase, override_settings
@@ -10,7 +12,7 @@ from django.shortcuts import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission, Group
 from django.utils import timezone
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 
 from example import settings
 from vidar import models, forms, renamers, json_encoders, exceptions, app_settings, interactor
@@ -83,6 +85,21 @@ class FormTests(TestCase):
         output = forms.convert_timeformat_to_seconds('10:06')
         self.assertEqual(606, output)
 
+    @override_settings(VIDAR_DOWNLOAD_PROFILES={"default": {}, "parallel": {}})
+    def test_download_profile_choices(self):
+        channel = models.Channel.objects.create(download_profile="removed")
+        form = forms.ChannelAdministrativeOptionsForm(instance=channel)
+        self.assertEqual(
+            ["", "default", "parallel", "removed"],
+            [x for x, _ in form.fields["download_profile"].widget.choices],
+        )
+
+        form = forms.PlaylistEditForm()
+        self.assertEqual(
+            ["", "default", "parallel"],
+            [x for x, _ in form.fields["download_profile"].widget.choices],
+        )
+
     def test_highlight_form_accepts_both_point_formats(self):
         form = forms.HighlightForm(data={
             'point': '60',
@@ -263,9 +280,9 @@ class RenamerTests(TestCase):
             call(pathlib.PurePosixPath('thumbnail.jpg'), pathlib.PurePosixPath('thumbnail 2.jpg')),
         ))
         mock_generator.assert_has_calls((
-            call(video=video, ext='mp4'),
-            call(video=video, ext='info.json', upload_to=video_helpers.upload_to_infojson),
-            call(video=video, ext='jpg', upload_to=video_helpers.upload_to_thumbnail),
+            call(video=video, ext='mp4', resolution=ANY),
+            call(video=video, ext='info.json', upload_to=video_helpers.upload_to_infojson, resolution=ANY),
+            call(video=video, ext='jpg', upload_to=video_helpers.upload_to_thumbnail, resolution=ANY),
         ))
         mock_delete.assert_not_called()
 
@@ -370,10 +387,10 @@ class RenamerTests(TestCase):
 
         mock_move.assert_not_called()
         mock_generator.assert_has_calls((
-            call(video=video, ext='mp4'),
-            call(video=video, ext='mp3', upload_to=video_helpers.upload_to_audio),
-            call(video=video, ext='info.json', upload_to=video_helpers.upload_to_infojson),
-            call(video=video, ext='jpg', upload_to=video_helpers.upload_to_thumbnail),
+            call(video=video, ext='mp4', resolution=ANY),
+            call(video=video, ext='mp3', upload_to=video_helpers.upload_to_audio, resolution=ANY),
+            call(video=video, ext='info.json', upload_to=video_helpers.upload_to_infojson, resolution=ANY),
+            call(video=video, ext='jpg', upload_to=video_helpers.upload_to_thumbnail, resolution=ANY),
         ))
         mock_delete.assert_not_called()
 
@@ -405,7 +422,7 @@ class RenamerTests(TestCase):
         output = renamers.video_rename_all_files(video=video, commit=True)
         self.assertTrue(output)
         mock_move.assert_called_once_with(pathlib.PurePosixPath('dir/video.mp4'), pathlib.PurePosixPath('dir 2/video.mp4'))
-        mock_generator.assert_called_once_with(video=video, ext='mp4')
+        mock_generator.assert_called_once_with(video=video, ext='mp4', resolution=ANY)
         mock_delete.assert_called_once_with('dir')
 
         self.assertEqual('dir 2/video.mp4', video.file.name)
@@ -594,18 +611,20 @@ class RenamerTests(TestCase):
         mock_move.assert_not_called()
         mock_generator.assert_not_called()
 
-    @patch('vidar.renamers.video_rename_all_files')
+    @patch('vidar.renamers.execute_video_renames')
     @patch('vidar.storages.vidar_storage.delete')
     @patch('vidar.storages.vidar_storage.move')
-    def test_channel_rename_all_videos_with_files(self, mock_move, mock_delete, mock_video_renamer):
-        mock_video_renamer.return_value = ['file']
+    def test_channel_rename_all_videos_with_files(self, mock_move, mock_delete, mock_executor):
         channel = models.Channel.objects.create(name='Test Channel')
-        models.Video.objects.create(title='test video 1', channel=channel, file='test 1.mp4')
+        video = models.Video.objects.create(title='test video 1', channel=channel, file='test 1.mp4')
+        mock_executor.return_value = {video.pk}
 
         output = renamers.channel_rename_all_files(channel=channel, rename_videos=True)
         self.assertEqual(['1 videos'], output)
 
-        mock_video_renamer.assert_called_once()
+        mock_executor.assert_called_once()
+        moves = mock_executor.call_args.kwargs['moves']
+        self.assertEqual([(video, video, 'file')], [move[:3] for move in moves])
         mock_delete.assert_not_called()
         mock_move.assert_not_called()
 
@@ -624,6 +643,94 @@ class RenamerTests(TestCase):
         mock_delete.assert_not_called()
         mock_move.assert_not_called()
 
+    @patch('vidar.services.video_services.generate_filepaths_for_storage')
+    def test_plan_video_renames_detects_collisions(self, mock_generator):
+        def generator(video, ext, upload_to=None, **kwargs):
+            return '', pathlib.PurePosixPath(f'renamed/{video.title}.{ext}')
+
+        mock_generator.side_effect = generator
+
+        video1 = models.Video.objects.create(title='same', file='one.mp4')
+        video2 = models.Video.objects.create(title='same', file='two.mp4')
+        video3 = models.Video.objects.create(title='unique', file='three.mp4', thumbnail='three.jpg')
+        video4 = models.Video.objects.create(title='staying', file='renamed/staying.mp4')
+        video5 = models.Video.objects.create(title='blocked', file='five.mp4')
+        video6 = models.Video.objects.create(title='other', file='renamed/blocked.mp4')
+
+        moves, collisions = renamers.plan_video_renames(videos=[video1, video2, video3, video4, video5, video6])
+
+        self.assertCountEqual([video1, video2, video5], collisions)
+        self.assertCountEqual(
+            [
+                (video3, 'file', pathlib.PurePosixPath('three.mp4'), pathlib.PurePosixPath('renamed/unique.mp4')),
+                (video3, 'thumbnail', pathlib.PurePosixPath('three.jpg'), pathlib.PurePosixPath('renamed/unique.jpg')),
+                (video6, 'file', pathlib.PurePosixPath('renamed/blocked.mp4'), pathlib.PurePosixPath('renamed/other.mp4')),
+            ],
+            [(move[1], move[2], move[3], move[4]) for move in moves],
+        )
+
+    @patch('vidar.storages.vidar_storage.delete')
+    @patch('vidar.storages.vidar_storage.move')
+    @patch('vidar.services.video_services.generate_filepaths_for_storage')
+    def test_rename_videos_bulk_updates_and_removes_directories_once(self, mock_generator, mock_move, mock_delete):
+        def generator(video, ext, upload_to=None, **kwargs):
+            return '', pathlib.PurePosixPath(f'new/{video.title}.{ext}')
+
+        mock_generator.side_effect = generator
+
+        video1 = models.Video.objects.create(title='one', file='old/one.mp4')
+        video2 = models.Video.objects.create(title='two', file='old/two.mp4')
+        extra_file = video2.extra_files.create(file='old/two.en.srt')
+
+        output = renamers.rename_videos(videos=models.Video.objects.prefetch_related('extra_files'))
+
+        self.assertEqual({video1.pk, video2.pk}, output)
+        self.assertEqual(3, mock_move.call_count)
+        mock_delete.assert_called_once_with('old')
+
+        video1.refresh_from_db()
+        video2.refresh_from_db()
+        extra_file.refresh_from_db()
+        self.assertEqual('new/one.mp4', video1.file.name)
+        self.assertEqual('new/two.mp4', video2.file.name)
+        self.assertEqual(f'public/{timezone.now().year}/two.en.srt', extra_file.file.name)
+
+    @patch('vidar.services.image_services.move_variants')
+    @patch('vidar.storages.vidar_storage.delete')
+    @patch('vidar.storages.vidar_storage.move')
+    @patch('vidar.services.video_services.generate_filepaths_for_storage')
+    def test_rename_videos_moves_thumbnail_variants(self, mock_generator, mock_move, mock_delete, mock_variants):
+        def generator(video, ext, upload_to=None, **kwargs):
+            return '', pathlib.PurePosixPath(f'new/{video.title}.{ext}')
+
+        mock_generator.side_effect = generator
+
+        video = models.Video.objects.create(title='one', file='old/one.mp4', thumbnail='old/one.jpg')
+
+        renamers.rename_videos(videos=[video])
+
+        mock_variants.assert_called_once_with(
+            video.thumbnail.storage, pathlib.PurePosixPath('old/one.jpg'), pathlib.PurePosixPath('new/one.jpg')
+        )
+
+    @patch('vidar.storages.vidar_storage.delete')
+    @patch('vidar.storages.vidar_storage.move')
+    @patch('vidar.services.video_services.generate_filepaths_for_storage')
+    def test_rename_videos_failed_move_flags_video(self, mock_generator, mock_move, mock_delete):
+        mock_generator.return_value = '', pathlib.PurePosixPath('new/one.mp4')
+        mock_move.side_effect = FileNotFoundError('missing')
+
+        video = models.Video.objects.create(title='one', file='old/one.mp4')
+
+        output = renamers.rename_videos(videos=[video])
+
+        self.assertEqual(set(), output)
+        mock_delete.assert_not_called()
+
+        video.refresh_from_db()
+        self.assertEqual('old/one.mp4', video.file.name)
+        self.assertTrue(video.file_not_found)
+
 
 @override_settings(IS_TESTING=False)
 class InteractorTests(SimpleTestCase):
@@ -755,6 +862,42 @@ class InteractorTests(SimpleTestCase):
         self.assertIn("action", first_call_args)
         self.assertEqual("video_download", first_call_args["action"])
 
+    @patch('vidar.services.proxy_services.DownloadMonitor')
+    @patch('yt_dlp.YoutubeDL')
+    @patch('vidar.interactor._clean_kwargs')
+    @override_settings(VIDAR_YTDLP_INITIALIZER=None)
+    def test_interactor_video_download_monitors_proxy(self, mock_cleaner, mock_ytdlp, mock_monitor):
+        extract_info = mock_ytdlp.return_value.__enter__.return_value.extract_info
+
+        _, used_kwargs = interactor.video_download(url="url", proxy="proxy1")
+        mock_monitor.assert_called_once_with("proxy1")
+        self.assertIn(mock_monitor.return_value, used_kwargs["progress_hooks"])
+        mock_monitor.return_value.succeeded.assert_called_once()
+
+        exc = yt_dlp.DownloadError("Unable to connect to proxy")
+        extract_info.side_effect = exc
+        with self.assertRaises(yt_dlp.DownloadError):
+            interactor.video_download(url="url", proxy="proxy1")
+        mock_monitor.return_value.failed.assert_called_once_with(exc)
+
+        mock_monitor.reset_mock()
+        extract_info.side_effect = None
+        interactor.video_download(url="url")
+        mock_monitor.assert_not_called()
+
+    @patch('yt_dlp.YoutubeDL')
+    @patch('vidar.interactor._clean_kwargs')
+    @override_settings(VIDAR_YTDLP_INITIALIZER=None)
+    def test_interactor_video_download_attaches_bandwidth_lease(self, mock_cleaner, mock_ytdlp):
+        ydl = mock_ytdlp.return_value.__enter__.return_value
+        ydl.params = {}
+        lease = MagicMock()
+
+        _, used_kwargs = interactor.video_download(url="url", bandwidth_lease=lease)
+        self.assertIn(lease, used_kwargs["progress_hooks"])
+        self.assertNotIn("bandwidth_lease", used_kwargs)
+        lease.attach.assert_called_once_with(ydl.params)
+
     @patch('yt_dlp.YoutubeDL')
     @patch('vidar.interactor._clean_kwargs')
     @override_settings(VIDAR_YTDLP_INITIALIZER=None)
@@ -838,6 +981,186 @@ class InteractorTests(SimpleTestCase):
         self.assertIn("action", first_call_args)
         self.assertEqual("channel_playlists", first_call_args["action"])
 
+    @patch('yt_dlp.YoutubeDL')
+    @patch('vidar.interactor._clean_kwargs')
+    @override_settings(VIDAR_YTDLP_INITIALIZER=None)
+    def test_interactor_channel_listing_passes_action(self, mock_cleaner, mock_ytdlp):
+        mock_ytdlp.return_value.__enter__.return_value.extract_info.return_value = "extract_info test"
+
+        output = interactor.channel_listing("url")
+        self.assertEqual("extract_info test", output)
+        mock_ytdlp.assert_called_once()
+        first_call_args = mock_ytdlp.mock_calls[0].args[0]
+        self.assertEqual("channel_listing", first_call_args["action"])
+        self.assertEqual("in_playlist", first_call_args["extract_flat"])
+
+    @patch('yt_dlp.YoutubeDL')
+    @patch('vidar.interactor._clean_kwargs')
+    @override_settings(VIDAR_YTDLP_INITIALIZER=None)
+    def test_interactor_channel_scan_session(self, mock_cleaner, mock_ytdlp):
+        with interactor.channel_scan_session(incremental=True, proxy="proxy address") as ydl:
+            self.assertEqual(mock_ytdlp.return_value.__enter__.return_value, ydl)
+        first_call_args = mock_ytdlp.mock_calls[0].args[0]
+        self.assertEqual("channel_scan_session", first_call_args["action"])
+        self.assertEqual("in_playlist", first_call_args["extract_flat"])
+
+    @patch('time.sleep')
+    def test_interactor_channel_scan_tab_sets_limit_and_retries(self, mock_sleep):
+        ydl = MagicMock(params={"playlistend": 50})
+        expected = {"entries": ["entry1"]}
+        ydl.extract_info.side_effect = [{"entries": []}, expected]
+
+        self.assertEqual(expected, interactor.channel_scan_tab(ydl, url="url", limit=5))
+        self.assertEqual(5, ydl.params["playlistend"])
+        self.assertEqual(2, ydl.extract_info.call_count)
+        mock_sleep.assert_called_once()
+
+        ydl.extract_info.side_effect = None
+        ydl.extract_info.return_value = None
+        self.assertIsNone(interactor.channel_scan_tab(ydl, url="url", sleep=0))
+        self.assertNotIn("playlistend", ydl.params)
+
+
+@override_settings(IS_TESTING=False, VIDAR_YTDLP_INITIALIZER=None, VIDAR_YTDLP_POOL_SIZE=2)
+class InteractorPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        interactor.ytdlp_pool.clear()
+        self.addCleanup(interactor.ytdlp_pool.clear)
+        self.built = []
+
+    def build(self, params):
+        ydl = MagicMock(params={"default": "value", **params})
+        self.built.append(ydl)
+        return ydl
+
+    @patch('vidar.utils.get_proxy')
+    @patch('yt_dlp.YoutubeDL')
+    def test_instance_reused_with_call_params_restored(self, mock_ytdlp, mock_proxy):
+        mock_ytdlp.side_effect = self.build
+        mock_proxy.return_value = "proxy address"
+
+        interactor.video_details("url1")
+        interactor.channel_listing("url2")
+
+        mock_ytdlp.assert_called_once_with({"proxy": "proxy address"})
+        self.assertEqual(1, len(interactor.ytdlp_pool))
+
+        pooled = interactor.ytdlp_pool.acquire(interactor._pool_key({"proxy": "proxy address"}, initializer=None))
+        self.assertEqual({"default": "value", "proxy": "proxy address"}, pooled.params)
+        self.assertEqual(2, pooled.extract_info.call_count)
+        pooled.close.assert_not_called()
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_call_params_applied_during_call(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        with interactor.ytdlp_session({"proxy": "proxy", "extract_flat": True, "action": "testing"}) as ydl:
+            self.assertTrue(ydl.params["extract_flat"])
+            self.assertNotIn("action", ydl.params)
+
+        with interactor.ytdlp_session({"proxy": "proxy"}) as second:
+            self.assertIs(ydl, second)
+            self.assertNotIn("extract_flat", second.params)
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_separate_instances_per_proxy_and_cookies(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        for kwargs in [{"proxy": "a"}, {"proxy": "b"}, {"proxy": "a", "cookiefile": "cookies.txt"}, {"proxy": "a"}]:
+            with interactor.ytdlp_session(kwargs):
+                pass
+
+        self.assertEqual(3, mock_ytdlp.call_count)
+        self.assertEqual(3, len(interactor.ytdlp_pool))
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_cookiefile_objects_keyed_by_contents(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        for contents in ["cookies a", "cookies a", "cookies b"]:
+            with interactor.ytdlp_session({"proxy": "a", "cookiefile": io.StringIO(contents)}):
+                pass
+
+        self.assertEqual(2, mock_ytdlp.call_count)
+        self.assertEqual(2, len(interactor.ytdlp_pool))
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_unreadable_cookiefile_objects_bypass_pool(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        for x in range(2):
+            with interactor.ytdlp_session({"proxy": "a", "cookiefile": MagicMock(spec=["read"])}):
+                pass
+
+        self.assertEqual(2, mock_ytdlp.call_count)
+        self.assertEqual(0, len(interactor.ytdlp_pool))
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_init_only_params_bypass_pool(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        for x in range(2):
+            with interactor.ytdlp_session({"proxy": "a", "progress_hooks": []}):
+                pass
+
+        self.assertEqual(2, mock_ytdlp.call_count)
+        self.assertEqual(0, len(interactor.ytdlp_pool))
+        for instance in self.built:
+            instance.__exit__.assert_called_once()
+
+    @override_settings(VIDAR_YTDLP_POOL_SIZE=1)
+    @patch('yt_dlp.YoutubeDL')
+    def test_pool_size_limits_idle_instances(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        with interactor.ytdlp_session({"proxy": "a"}) as first:
+            with interactor.ytdlp_session({"proxy": "a"}) as second:
+                self.assertIsNot(first, second)
+
+        self.assertEqual(1, len(interactor.ytdlp_pool))
+        first.close.assert_called_once()
+        second.close.assert_not_called()
+
+    @patch('time.monotonic')
+    @patch('yt_dlp.YoutubeDL')
+    def test_idle_instances_evicted(self, mock_ytdlp, mock_time):
+        mock_ytdlp.side_effect = self.build
+        mock_time.return_value = 1000
+
+        with interactor.ytdlp_session({"proxy": "a"}) as first:
+            pass
+
+        mock_time.return_value = 1000 + app_settings.YTDLP_POOL_IDLE_SECONDS
+        with interactor.ytdlp_session({"proxy": "a"}) as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_instance_discarded_after_failure(self, mock_ytdlp):
+        mock_ytdlp.side_effect = self.build
+
+        with self.assertRaises(ValueError):
+            with interactor.ytdlp_session({"proxy": "a"}) as ydl:
+                raise ValueError()
+
+        ydl.close.assert_called_once()
+        self.assertEqual(0, len(interactor.ytdlp_pool))
+
+    @override_settings(VIDAR_YTDLP_INITIALIZER='tests.test_functions.ytdlp_initializer_pooled')
+    def test_initializer_builds_pooled_instances(self):
+        with interactor.ytdlp_session({"action": "video_details", "instance": "video", "quiet": True}) as ydl:
+            self.assertEqual({"action": "video_details", "instance": "video"}, ydl.initializer_kwargs)
+            self.assertTrue(ydl.params["quiet"])
+
+        with interactor.ytdlp_session({"action": "video_details", "instance": "video"}) as second:
+            self.assertIs(ydl, second)
+
+        with interactor.ytdlp_session({"action": "channel_details", "instance": "video"}) as third:
+            self.assertIsNot(ydl, third)
+
 
 class CommandTests(TestCase):
     def test_init_command(self):
@@ -880,3 +1203,47 @@ class CommandTests(TestCase):
             values.remove(pt.name)
 
         self.assertFalse(values)
+
+    def test_explain_queries_command_rolls_back_synthetic_library(self):
+        out = io.StringIO()
+        call_command('vidar_explain_queries', '--channels', '2', '--videos-per-channel', '5', stdout=out)
+
+        self.assertIn("video by provider_object_id", out.getvalue())
+        self.assertFalse(models.Channel.objects.exists())
+        self.assertFalse(models.Video.objects.exists())
+
+    @patch("vidar.services.retention_services.delete_videos_keeping_records")
+    def test_retention_report_command_is_dry_run(self, mock_delete):
+        channel = models.Channel.objects.create(delete_videos_after_days=2)
+        video = channel.videos.create(
+            file="test.mp4",
+            is_video=True,
+            date_downloaded=timezone.now() - timezone.timedelta(days=4),
+        )
+        mock_delete.return_value = [{"video": video, "reason": "age", "files": ["test.mp4"]}]
+
+        out = io.StringIO()
+        call_command('vidar_retention_report', stdout=out)
+
+        self.assertTrue(mock_delete.call_args.kwargs["dry_run"])
+        self.assertIn("[age]", out.getvalue())
+        self.assertIn("Would delete the files of 1 videos.", out.getvalue())
+
+    @patch("vidar.services.dedupe_services.hardlink_duplicates")
+    def test_dedupe_report_command_is_dry_run(self, mock_hardlink):
+        video1 = models.Video.objects.create(file="channel/video.mp4", file_hash="same")
+        models.Video.objects.create(file="public/video.mp4", file_hash="same")
+        mock_hardlink.return_value = [{"kept": "channel/video.mp4", "linked": "public/video.mp4", "size": 5}]
+
+        out = io.StringIO()
+        call_command('vidar_dedupe_report', stdout=out)
+
+        self.assertFalse(mock_hardlink.call_args.kwargs["commit"])
+        self.assertEqual([video1.file, "public/video.mp4"], mock_hardlink.call_args.kwargs["groups"]["same"])
+        self.assertIn("    public/video.mp4", out.getvalue())
+        self.assertIn("Would reclaim 5 bytes by hardlinking 1 duplicates.", out.getvalue())
+
+    @override_settings(VIDAR_MEDIA_HARDLINK=False)
+    def test_dedupe_report_command_hardlink_requires_media_hardlink(self):
+        with self.assertRaises(CommandError):
+            call_command('vidar_dedupe_report', '--hardlink', stdout=io.StringIO())
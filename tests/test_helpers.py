@@ -1,18 +1,20 @@
 import datetime
 import io
+import json
 import pathlib
 
 from unittest.mock import patch, MagicMock
 from celery import states
 from celery.exceptions import Ignore
+from django_celery_results.models import TaskResult
 
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.utils import timezone
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.contrib.sessions.middleware import SessionMiddleware
 
-from vidar import models, app_settings, helpers
+from vidar import models, app_settings, helpers, tasks
 from vidar.helpers import (
     channel_helpers,
     json_safe_kwargs,
@@ -21,6 +23,7 @@ from vidar.helpers import (
     video_helpers,
     statistics_helpers,
     file_helpers,
+    instrumentation_helpers,
 )
 
 from tests.test_functions import date_to_aware_date
@@ -620,3 +623,65 @@ class ChannelHelpersTests(TestCase):
 
         output = channel_helpers.upload_to_tvart(instance=channel, filename="tvart.jpg")
         self.assertEqual("Test Channel/tvart.jpg", str(output))
+
+
+class InstrumentationHelpersTests(TestCase):
+
+    @override_settings(
+        VIDAR_TASK_INSTRUMENTATION=True,
+        VIDAR_TASK_INSTRUMENTATION_BUDGETS={"vidar.tasks.trigger_crontab_scans": {"queries": 0}},
+    )
+    def test_task_exceeding_budget_logs_warning(self):
+        models.Channel.objects.create(provider_object_id="test", name="test")
+
+        with self.assertLogs("vidar.helpers.instrumentation_helpers", level="INFO") as logger:
+            tasks.trigger_crontab_scans.delay(check_if_crontab_was_missed=False).get()
+
+        self.assertIn("vidar.tasks.trigger_crontab_scans", logger.output[0])
+        self.assertIn("exceeded its queries budget", logger.output[1])
+        self.assertFalse(instrumentation_helpers._ACTIVE_TASKS)
+
+    @override_settings(VIDAR_TASK_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        with patch.object(instrumentation_helpers, "TaskMetrics") as mock_metrics:
+            tasks.trigger_crontab_scans.delay(check_if_crontab_was_missed=False).get()
+        mock_metrics.assert_not_called()
+
+    def test_metrics_count_queries(self):
+        metrics = instrumentation_helpers.TaskMetrics(task_name="test")
+        metrics.start()
+        try:
+            list(models.Video.objects.all())
+            models.Channel.objects.count()
+        finally:
+            metrics.finish()
+
+        self.assertEqual(2, metrics.queries)
+
+    def test_increment_applies_to_active_tasks(self):
+        metrics = instrumentation_helpers.TaskMetrics(task_name="test")
+        with patch.dict(instrumentation_helpers._ACTIVE_TASKS, {"task-id": metrics}):
+            celery_helpers.is_object_locked(obj=models.Video.objects.create())
+            instrumentation_helpers.increment("redis_calls", amount=2)
+
+        self.assertEqual(1, metrics.cache_calls)
+        self.assertEqual(2, metrics.redis_calls)
+
+    @override_settings(VIDAR_TASK_INSTRUMENTATION_BUDGETS={"test": {"queries": 5, "wall_time": 10}})
+    def test_get_budget_violations(self):
+        metrics = instrumentation_helpers.TaskMetrics(task_name="test")
+        metrics.queries = 6
+        metrics.wall_time = 1
+
+        self.assertEqual({"queries": (6, 5)}, instrumentation_helpers.get_budget_violations(metrics))
+
+    def test_store_metrics_in_task_result_meta(self):
+        TaskResult.objects.create(task_id="task-id", meta='{"children": []}')
+        metrics = instrumentation_helpers.TaskMetrics(task_name="test")
+        metrics.queries = 3
+
+        instrumentation_helpers.store_metrics(task_id="task-id", metrics=metrics)
+
+        meta = json.loads(TaskResult.objects.get(task_id="task-id").meta)
+        self.assertEqual([], meta["children"])
+        self.assertEqual(3, meta[instrumentation_helpers.TASK_RESULT_META_KEY]["queries"])
@@ -1,4 +1,5 @@
 import datetime
+import importlib
 import json
 
 from unittest.mock import patch
@@ -10,6 +11,7 @@ from django.shortcuts import reverse
 
 from vidar import models, app_settings, exceptions
 from vidar.helpers import channel_helpers
+from vidar.services import ytdlp_services
 
 
 UserModel = get_user_model()
@@ -563,7 +565,8 @@ class VideoTests(TestCase):
         self.assertIsNotNone(video.upload_date)
         self.assertEqual(models.Video.VideoPrivacyStatuses.PUBLIC, video.privacy_status)
         self.assertIsNotNone(video.last_privacy_status_check)
-        self.assertCountEqual(dlp_formats, video.dlp_formats)
+        self.assertCountEqual(ytdlp_services.summarize_formats(dlp_formats), video.dlp_formats)
+        self.assertTrue(all("url" not in x for x in video.dlp_formats))
 
     def test_set_details_from_yt_dlp_response_locked_title(self):
         video = models.Video.objects.create(
@@ -1067,6 +1070,34 @@ class VideoObjectsManagerTests(TestCase):
         self.assertEqual(1, qs.count())
         self.assertIn(v1, qs)
 
+    def test_summarize_dlp_formats_migration(self):
+        from django.apps import apps
+
+        migration = importlib.import_module("vidar.migrations.0011_summarize_dlp_formats")
+
+        with open('tests/fixtures/dlp_formats.json') as fo:
+            dlp_formats = json.load(fo)['formats']
+        video = models.Video.objects.create(dlp_formats=dlp_formats)
+        without = models.Video.objects.create()
+
+        migration.summarize_dlp_formats(apps, None)
+
+        video.refresh_from_db()
+        without.refresh_from_db()
+        self.assertEqual(ytdlp_services.summarize_formats(dlp_formats), video.dlp_formats)
+        self.assertIsNone(without.dlp_formats)
+
+    def test_listing_defers_dlp_formats(self):
+        channel = models.Channel.objects.create()
+        models.Video.objects.create(channel=channel, dlp_formats=[{"format_id": "22", "height": 720}])
+
+        video = models.Video.objects.listing().get()
+        self.assertEqual({"dlp_formats"}, video.get_deferred_fields())
+
+        video = channel.videos.listing().get()
+        self.assertEqual({"dlp_formats"}, video.get_deferred_fields())
+        self.assertEqual([{"format_id": "22", "height": 720}], video.dlp_formats)
+
 
 class VideoBlockedTests(TestCase):
     def test_is_local(self):
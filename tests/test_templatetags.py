@@ -1,6 +1,8 @@
 # flake8: noqa
 import datetime
 
+from unittest.mock import patch
+
 from django.core.paginator import Paginator
 from django.core.exceptions import FieldDoesNotExist
 from django.contrib.auth import get_user_model
@@ -1671,6 +1673,12 @@ class VidarUtilsTests(SimpleTestCase):
     def test_filename(self):
         self.assertEqual("test.mp4", vidar_utils.filename("/path/to/test.mp4"))
 
+    @patch("vidar.services.image_services.get_variant_url")
+    def test_image_variant(self, mock_get):
+        mock_get.return_value = "/media/variants/small/image.jpg.webp"
+        self.assertEqual("/media/variants/small/image.jpg.webp", vidar_utils.image_variant("file", "small"))
+        mock_get.assert_called_once_with("file", "small")
+
 
 class CrontabLinksTests(SimpleTestCase):
     def test_basics(self):
@@ -2,11 +2,13 @@ from unittest.mock import patch
 import warnings
 
 import requests
+from django.core.cache import cache
 from django.db.models import Case
 from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from vidar import utils, models, app_settings
+from vidar.services import proxy_services
 
 from . import test_functions
 
@@ -278,6 +280,30 @@ class UtilTest(TestCase):
         self.assertEqual("proxy3", utils.get_proxy(previous_proxies=['proxy1', 'proxy2', 'proxy4']))
         self.assertEqual("default proxy", utils.get_proxy(previous_proxies=['proxy1', 'proxy2', 'proxy3', 'proxy4']))
 
+    @override_settings(
+        VIDAR_PROXIES_DEFAULT="default proxy",
+        VIDAR_PROXIES=['proxy1', 'proxy2', 'proxy3']
+    )
+    def test_get_proxy_skips_proxies_cooling_down(self):
+        self.addCleanup(cache.clear)
+        for proxy in ['proxy1', 'proxy3']:
+            proxy_services.ProxyHealth(proxy).record_failure("Unable to connect to proxy")
+
+        for _ in range(10):
+            self.assertEqual("proxy2", utils.get_proxy(attempt=0))
+        self.assertEqual("default proxy", utils.get_proxy(previous_proxies=['proxy2'], attempt=1))
+
+    @override_settings(
+        VIDAR_PROXY_HEALTH_ENABLED=False,
+        VIDAR_PROXIES_DEFAULT="default proxy",
+        VIDAR_PROXIES=['proxy1', 'proxy2']
+    )
+    def test_get_proxy_without_proxy_health_ignores_cool_down(self):
+        self.addCleanup(cache.clear)
+        proxy_services.ProxyHealth('proxy1').record_failure("Unable to connect to proxy")
+
+        self.assertEqual("proxy1", utils.get_proxy(previous_proxies=['proxy2']))
+
     @override_settings(VIDAR_PROXIES='')
     def test_get_proxy_proxies_is_blank_string_returns_list(self):
         try:
@@ -376,3 +402,13 @@ class UtilTest(TestCase):
         oc.debug("debug")
         oc.error("error")
         self.assertEqual(4, self.print_counter)
+
+    def test_system_safe_name(self):
+        self.assertEqual("Myth Busting and Associates - Ltd", utils.system_safe_name("Myth  Busting & Associates – Ltd!"))
+
+    def test_system_safe_title(self):
+        self.assertEqual("The Title with symbols", utils.system_safe_title("The Title: with? symbols!  "))
+
+    def test_move_leading_the_to_end(self):
+        self.assertEqual("Myth Busters, tHe", utils.move_leading_the_to_end("tHe Myth Busters"))
+        self.assertEqual("Theatre Busters", utils.move_leading_the_to_end("Theatre Busters"))
@@ -32,6 +32,16 @@ class AppSettings(object):
     def _django_setting(self, name, default):
         return getattr(settings, self.prefix + name, default)
 
+    @property
+    def AUTOMATED_DOWNLOADS_DAILY_BYTES(self):
+        """Bytes automated_archiver may download a day, 0 for no limit."""
+        return int(
+            self._setting(
+                "AUTOMATED_DOWNLOADS_DAILY_BYTES",
+                0,
+            )
+        )
+
     @property
     def AUTOMATED_DOWNLOADS_DAILY_LIMIT(self):
         return self._setting(
@@ -48,6 +58,26 @@ class AppSettings(object):
             90 * 60,
         )
 
+    @property
+    def AUTOMATED_DOWNLOADS_FREE_SPACE(self):
+        """Bytes automated_archiver leaves free on MEDIA_ROOT and MEDIA_CACHE, 0 to not check."""
+        return int(
+            self._setting(
+                "AUTOMATED_DOWNLOADS_FREE_SPACE",
+                0,
+            )
+        )
+
+    @property
+    def AUTOMATED_DOWNLOADS_PER_TASK_BYTES(self):
+        """Bytes of downloads each automated_archiver run may queue, 0 for no limit."""
+        return int(
+            self._setting(
+                "AUTOMATED_DOWNLOADS_PER_TASK_BYTES",
+                0,
+            )
+        )
+
     @property
     def AUTOMATED_DOWNLOADS_PER_TASK_LIMIT(self):
         return self._setting(
@@ -55,6 +85,19 @@ class AppSettings(object):
             4,
         )
 
+    @property
+    def AUTOMATED_DOWNLOADS_PER_TASK_SECONDS(self):
+        """
+        Estimated seconds of downloading each automated_archiver run may queue, 0 for no limit.
+            Estimated at the throughput measured so far that day, or the bandwidth budget.
+        """
+        return int(
+            self._setting(
+                "AUTOMATED_DOWNLOADS_PER_TASK_SECONDS",
+                0,
+            )
+        )
+
     @property
     def AUTOMATED_QUALITY_UPGRADES_PER_TASK_LIMIT(self):
         return self._setting(
@@ -69,6 +112,50 @@ class AppSettings(object):
             True,
         )
 
+    @property
+    def BANDWIDTH_ADMISSION_WINDOW(self):
+        """
+        Seconds of the bandwidth budget automated_archiver fills with new downloads,
+            roughly how often it runs.
+        """
+        return int(
+            self._setting(
+                "BANDWIDTH_ADMISSION_WINDOW",
+                10 * 60,
+            )
+        )
+
+    @property
+    def BANDWIDTH_LEASE_SECONDS(self):
+        """How long a download holds its share of the bandwidth budget without reporting progress."""
+        return int(
+            self._setting(
+                "BANDWIDTH_LEASE_SECONDS",
+                120,
+            )
+        )
+
+    @property
+    def BANDWIDTH_LIMIT(self):
+        """
+        KiB/s shared between every download of every worker, 0 to not coordinate bandwidth.
+            Each running download is rate limited to an equal share.
+        """
+        return int(
+            self._setting(
+                "BANDWIDTH_LIMIT",
+                0,
+            )
+        )
+
+    @property
+    def BANDWIDTH_SCHEDULE(self):
+        """
+        Time of day overrides of BANDWIDTH_LIMIT, {"HH:MM": KiB/s}.
+            Each applies from its time until the next, the last wraps around past midnight.
+        """
+        return self._setting("BANDWIDTH_SCHEDULE", {})
+
     @property
     def CHANNEL_BANNER_RATE_LIMIT(self):
         return self._setting(
@@ -92,6 +179,32 @@ class AppSettings(object):
             2,
         )
 
+    @property
+    def CHANNEL_SCAN_INCREMENTAL(self):
+        """
+        Channel scans list the tab flat and only extract the details of videos not yet indexed,
+            rather than extracting every video within the scanner limit.
+        """
+        return self._setting("CHANNEL_SCAN_INCREMENTAL", False)
+
+    @property
+    def CHANNEL_SCAN_INCREMENTAL_KNOWN_RUN(self):
+        """An incremental scan stops once this many consecutive listed videos are already indexed."""
+        return int(
+            self._setting(
+                "CHANNEL_SCAN_INCREMENTAL_KNOWN_RUN",
+                3,
+            )
+        )
+
+    @property
+    def CHANNEL_SCAN_SINGLE_PASS(self):
+        """
+        Scan every indexed tab of a channel within one task and one yt-dlp session,
+            rather than one task per tab staggered by the wait period.
+        """
+        return self._setting("CHANNEL_SCAN_SINGLE_PASS", False)
+
     @property
     def COMMENTS_MAX_PARENTS(self):
         return self._setting(
@@ -194,6 +307,36 @@ class AppSettings(object):
             )
         )
 
+    @property
+    def DAILY_MAINTENANCE_CHUNK_SIZE(self):
+        """How many objects each daily maintenance section processes before persisting its position."""
+        return int(
+            self._setting(
+                "DAILY_MAINTENANCE_CHUNK_SIZE",
+                250,
+            )
+        )
+
+    @property
+    def DEDUPE_HASH_BATCH_SIZE(self):
+        """How many videos, with their extra files, a single file hashing task on queue-vidar-processor hashes."""
+        return int(
+            self._setting(
+                "DEDUPE_HASH_BATCH_SIZE",
+                50,
+            )
+        )
+
+    @property
+    def DEDUPE_HASH_MAX_PER_RUN(self):
+        """How many videos, with their extra files, a single run of trigger_file_hashing queues for hashing."""
+        return int(
+            self._setting(
+                "DEDUPE_HASH_MAX_PER_RUN",
+                1000,
+            )
+        )
+
     @property
     def DELETE_DOWNLOAD_CACHE(self):
         return self._setting(
@@ -214,6 +357,33 @@ class AppSettings(object):
     def DISCORD_URL(self):
         return self._setting("DISCORD_URL", None)
 
+    @property
+    def DOWNLOAD_PROFILE(self):
+        """Name of the DOWNLOAD_PROFILES profile used by channels and playlists without one selected."""
+        return self._setting("DOWNLOAD_PROFILE", "default")
+
+    @property
+    def DOWNLOAD_PROFILES(self):
+        """
+        Named sets of yt-dlp download tuning options, {name: {option: value}}.
+            Options are concurrent_fragment_downloads, http_chunk_size, buffersize, noresizebuffer,
+            external_downloader and external_downloader_args.
+        """
+        return self._setting(
+            "DOWNLOAD_PROFILES",
+            {
+                "default": {},
+                "parallel": {
+                    "concurrent_fragment_downloads": 4,
+                    "http_chunk_size": 10 * 1024 * 1024,
+                },
+                "aria2c": {
+                    "external_downloader": {"default": "aria2c"},
+                    "external_downloader_args": {"aria2c": ["-x8", "-s8", "-k1M"]},
+                },
+            },
+        )
+
     @property
     def DOWNLOAD_SPEED_RATE_LIMIT(self):
         return self._setting(
@@ -227,6 +397,26 @@ class AppSettings(object):
         func = import_callable(user_func)
         return func
 
+    @property
+    def EXTRACTION_CACHE_SECONDS(self):
+        """Seconds a yt-dlp extraction of a video is reused for, 0 disables the extraction cache."""
+        return int(
+            self._setting(
+                "EXTRACTION_CACHE_SECONDS",
+                60 * 60,
+            )
+        )
+
+    @property
+    def EXTRACTION_WORKERS(self):
+        """Concurrent yt-dlp extractions made by extraction_services.video_details_many."""
+        return int(
+            self._setting(
+                "EXTRACTION_WORKERS",
+                2,
+            )
+        )
+
     @property
     def GOTIFY_PRIORITY(self):
         return self._setting("GOTIFY_PRIORITY", 5)
@@ -243,6 +433,73 @@ class AppSettings(object):
     def GOTIFY_URL_VERIFY(self):
         return self._setting("GOTIFY_URL_VERIFY", True)
 
+    @property
+    def IMAGE_FETCH_TIMEOUT(self):
+        """Seconds to wait on the connection to, and each read from, a server providing thumbnails and banners."""
+        return int(
+            self._setting(
+                "IMAGE_FETCH_TIMEOUT",
+                30,
+            )
+        )
+
+    @property
+    def IMAGE_FETCH_WORKERS(self):
+        """How many images are downloaded concurrently by image_services.fetch_many."""
+        return int(
+            self._setting(
+                "IMAGE_FETCH_WORKERS",
+                16,
+            )
+        )
+
+    @property
+    def IMAGE_JPEG_OPTIMIZE(self):
+        """Have Pillow compute optimal Huffman tables for converted jpgs, smaller files for a little more CPU."""
+        return self._setting("IMAGE_JPEG_OPTIMIZE", True)
+
+    @property
+    def IMAGE_JPEG_PROGRESSIVE(self):
+        """Encode converted jpgs progressively, so browsers can render them before they are fully loaded."""
+        return self._setting("IMAGE_JPEG_PROGRESSIVE", True)
+
+    @property
+    def IMAGE_VARIANTS(self):
+        """
+        Reduced copies of thumbnails, banners and tvart served on list pages, {name: longest side in pixels}.
+        """
+        return self._setting(
+            "IMAGE_VARIANTS",
+            {
+                "small": 160,
+                "medium": 480,
+            },
+        )
+
+    @property
+    def IMAGE_VARIANTS_DIRECTORY(self):
+        """Directory within the media storage holding the image variants."""
+        return self._setting("IMAGE_VARIANTS_DIRECTORY", "variants")
+
+    @property
+    def IMAGE_VARIANTS_FORMAT(self):
+        """Pillow format the image variants are encoded with, WEBP or AVIF."""
+        return self._setting("IMAGE_VARIANTS_FORMAT", "WEBP")
+
+    @property
+    def IMAGE_VARIANTS_ON_INGEST(self):
+        """Generate the image variants as soon as an image is downloaded, rather than when it is first displayed."""
+        return self._setting("IMAGE_VARIANTS_ON_INGEST", False)
+
+    @property
+    def IMAGE_VARIANTS_QUALITY(self):
+        return int(
+            self._setting(
+                "IMAGE_VARIANTS_QUALITY",
+                75,
+            )
+        )
+
     @property
     def LOAD_SPONSORBLOCK_DATA_ON_DOWNLOAD(self):
         return self._setting(
@@ -261,6 +518,29 @@ class AppSettings(object):
     def MEDIA_CACHE(self):
         return pathlib.Path(self._setting("MEDIA_CACHE", "cache/"))
 
+    @property
+    def MEDIA_CACHE_MAX_AGE(self):
+        """Seconds after which files in MEDIA_CACHE not used by a running download or conversion are deleted."""
+        return int(
+            self._setting(
+                "MEDIA_CACHE_MAX_AGE",
+                24 * 60 * 60,
+            )
+        )
+
+    @property
+    def MEDIA_CACHE_QUOTA(self):
+        """
+        Bytes MEDIA_CACHE may hold, 0 for no quota. Least recently used files are deleted beyond it
+            and automated_archiver only queues downloads that fit within what remains.
+        """
+        return int(
+            self._setting(
+                "MEDIA_CACHE_QUOTA",
+                0,
+            )
+        )
+
     @property
     def MEDIA_HARDLINK(self):
         return self._setting("MEDIA_HARDLINK", False)
@@ -380,6 +660,15 @@ class AppSettings(object):
             2,
         )
 
+    @property
+    def PLAYLIST_MIRROR_RATE_LIMIT(self):
+        """Seconds between each mirror_live_playlist task dispatched by trigger_mirror_live_playlists.
+        Stretched automatically while the provider is failing or throttling requests."""
+        return self._setting(
+            "PLAYLIST_MIRROR_RATE_LIMIT",
+            120,
+        )
+
     @property
     def PRIVACY_STATUS_CHECK_HOURS_PER_DAY(self):
         """How many hours per day does the update_video_statuses_and_details task run for?"""
@@ -411,6 +700,18 @@ class AppSettings(object):
             0,
         )
 
+    @property
+    def PRIVACY_STATUS_CHECK_USE_CHANNEL_LISTINGS(self):
+        """Check privacy statuses of channel videos using one flat listing of the channels uploads
+        instead of one yt-dlp extraction per video. Videos missing from the listing are still checked
+        individually."""
+        return bool(
+            self._setting(
+                "PRIVACY_STATUS_CHECK_USE_CHANNEL_LISTINGS",
+                False,
+            )
+        )
+
     @property
     def PROXIES(self):
         """A list of proxies to select from.
@@ -454,6 +755,67 @@ class AppSettings(object):
         """The default proxy to use if all PROXIES fails"""
         return self._setting("PROXIES_DEFAULT", "")
 
+    @property
+    def PROXY_COOLDOWN_MAX_SECONDS(self):
+        """The longest a failing proxy is left out of selection, however many times in a row it failed."""
+        return int(
+            self._setting(
+                "PROXY_COOLDOWN_MAX_SECONDS",
+                60 * 60,
+            )
+        )
+
+    @property
+    def PROXY_COOLDOWN_SECONDS(self):
+        """
+        How long a proxy is left out of selection after a connection failure or throttling,
+            doubled for each further failure in a row.
+        """
+        return int(
+            self._setting(
+                "PROXY_COOLDOWN_SECONDS",
+                5 * 60,
+            )
+        )
+
+    @property
+    def PROXY_FAILOVER_RETRIES(self):
+        """How many download retries caused by a failing proxy are not counted against the video."""
+        return int(
+            self._setting(
+                "PROXY_FAILOVER_RETRIES",
+                3,
+            )
+        )
+
+    @property
+    def PROXY_HEALTH_ENABLED(self):
+        """
+        Record the success rate, latency and throughput of each of VIDAR_PROXIES
+            and select between them by score, leaving failing proxies out for a cool-down.
+        """
+        return self._setting("PROXY_HEALTH_ENABLED", True)
+
+    @property
+    def PROXY_HEALTH_EXPIRES(self):
+        """Seconds without use after which the recorded health of a proxy is forgotten."""
+        return int(
+            self._setting(
+                "PROXY_HEALTH_EXPIRES",
+                60 * 60 * 24 * 7,
+            )
+        )
+
+    @property
+    def RECONCILIATION_WORKERS(self):
+        """How many channel directories are walked in parallel when reconciling the media tree against the database."""
+        return int(
+            self._setting(
+                "RECONCILIATION_WORKERS",
+                4,
+            )
+        )
+
     @property
     def REDIS_CHANNEL_INDEXING(self):
         return self._setting("REDIS_CHANNEL_INDEXING", True)
@@ -478,6 +840,16 @@ class AppSettings(object):
     def REDIS_VIDEO_CONVERSION_STARTED(self):
         return self._setting("REDIS_VIDEO_CONVERSION_STARTED", True)
 
+    @property
+    def RENAME_WORKERS(self):
+        """How many threads move files in parallel when renaming the files of many videos at once."""
+        return int(
+            self._setting(
+                "RENAME_WORKERS",
+                4,
+            )
+        )
+
     @property
     def REQUESTS_RATE_LIMIT(self):
         return self._setting(
@@ -485,6 +857,16 @@ class AppSettings(object):
             5,
         )
 
+    @property
+    def RETENTION_DELETE_WORKERS(self):
+        """How many threads delete files in parallel when channel retention policies remove videos."""
+        return int(
+            self._setting(
+                "RETENTION_DELETE_WORKERS",
+                4,
+            )
+        )
+
     @property
     def SAVE_INFO_JSON_FILE(self):
         return self._setting(
@@ -517,6 +899,27 @@ class AppSettings(object):
             1,
         )
 
+    @property
+    def TASK_INSTRUMENTATION(self):
+        """Record query counts, query time, cache and redis calls and wall time of every task
+        in the vidar queues. Results are logged and stored on the task's TaskResult meta."""
+        return bool(
+            self._setting(
+                "TASK_INSTRUMENTATION",
+                False,
+            )
+        )
+
+    @property
+    def TASK_INSTRUMENTATION_BUDGETS(self):
+        """Per task limits, a warning is logged when a task exceeds any of them. Example:
+        {"vidar.tasks.automated_archiver": {"queries": 500, "query_time": 2.0, "wall_time": 60}}
+        Supported keys: queries, query_time, cache_calls, redis_calls, wall_time."""
+        return self._setting(
+            "TASK_INSTRUMENTATION_BUDGETS",
+            {},
+        )
+
     @property
     def VIDEO_AUTO_DOWNLOAD_LIVE_AMQ_WHEN_DETECTED(self):
         """When update_video_details task is called, a video's live quality may have been
@@ -595,6 +998,28 @@ class AppSettings(object):
             user_initializer_func = import_callable(user_initializer)
             return user_initializer_func
 
+    @property
+    def YTDLP_POOL_IDLE_SECONDS(self):
+        """Pooled YoutubeDL instances unused for this long are closed."""
+        return int(
+            self._setting(
+                "YTDLP_POOL_IDLE_SECONDS",
+                300,
+            )
+        )
+
+    @property
+    def YTDLP_POOL_SIZE(self):
+        """
+        How many idle YoutubeDL instances each worker process keeps per proxy and cookie file, 0 disables pooling.
+        """
+        return int(
+            self._setting(
+                "YTDLP_POOL_SIZE",
+                0,
+            )
+        )
+
 
 _app_settings = AppSettings("VIDAR_")
 
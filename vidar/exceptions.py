@@ -28,3 +28,7 @@ class FileStorageBackendHasNoMoveError(VidarException):
 
 class YTDLPCalledDuringTests(VidarException):
     pass
+
+
+class MediaHardlinkDisabledError(VidarException):
+    pass
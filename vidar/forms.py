@@ -9,6 +9,15 @@ from vidar.helpers import video_helpers
 from vidar.models import Channel, DurationSkip, ExtraFile, Highlight, Playlist, PossibleQualities, Video
 
 
+def set_download_profile_choices(field, current=""):
+    """Download profiles are configured in VIDAR_DOWNLOAD_PROFILES, a profile no longer configured stays selectable."""
+    choices = [("", f"System default ({app_settings.DOWNLOAD_PROFILE})")]
+    choices.extend((x, x) for x in app_settings.DOWNLOAD_PROFILES)
+    if current and current not in app_settings.DOWNLOAD_PROFILES:
+        choices.append((current, current))
+    field.widget = forms.Select(choices=choices)
+
+
 class VideoUpdateForm(forms.ModelForm):
     class Meta:
         model = Video
@@ -90,6 +99,7 @@ class PlaylistAdderForm(forms.ModelForm):
             "title_skips",
             "disable_when_string_found_in_video_title",
             "quality",
+            "download_profile",
             "playback_speed",
             "playback_volume",
             "videos_playback_ordering",
@@ -120,6 +130,7 @@ class PlaylistAdderForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        set_download_profile_choices(self.fields["download_profile"], current=self.instance.download_profile)
         self.fields["disable_when_string_found_in_video_title"].strip = False
 
     def clean_provider_object_id(self):
@@ -148,6 +159,7 @@ class PlaylistEditForm(forms.ModelForm):
             "title_skips",
             "disable_when_string_found_in_video_title",
             "quality",
+            "download_profile",
             "playback_speed",
             "playback_volume",
             "videos_playback_ordering",
@@ -179,6 +191,7 @@ class PlaylistEditForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        set_download_profile_choices(self.fields["download_profile"], current=self.instance.download_profile)
         self.fields["disable_when_string_found_in_video_title"].strip = False
 
 
@@ -194,6 +207,7 @@ class PlaylistCustomForm(forms.ModelForm):
             "convert_to_audio",
             "channel",
             "quality",
+            "download_profile",
             "playback_speed",
             "playback_volume",
             "videos_display_ordering",
@@ -216,6 +230,7 @@ class PlaylistCustomForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        set_download_profile_choices(self.fields["download_profile"], current=self.instance.download_profile)
         self.fields["video_indexing_add_by_title"].strip = False
 
         if instance := kwargs.get("instance"):
@@ -545,6 +560,7 @@ class ChannelAdministrativeOptionsForm(forms.ModelForm):
             "block_rescan_window_in_hours",
             "check_videos_privacy_status",
             "needs_cookies",
+            "download_profile",
         ]
         help_texts = {
             "fully_indexed": "Do not change this unless you know what you are doing.",
@@ -558,6 +574,7 @@ class ChannelAdministrativeOptionsForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        set_download_profile_choices(self.fields["download_profile"], current=self.instance.download_profile)
         self.fields["video_directory_schema"].widget.attrs["placeholder"] = app_settings.VIDEO_DIRECTORY_SCHEMA
         self.fields["video_filename_schema"].widget.attrs["placeholder"] = app_settings.VIDEO_FILENAME_SCHEMA
         self.fields["directory_schema"].widget.attrs["placeholder"] = app_settings.CHANNEL_DIRECTORY_SCHEMA
@@ -7,6 +7,8 @@ from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from celery import states
 from celery.exceptions import Ignore
 
+from vidar.helpers import instrumentation_helpers
+
 
 log = logging.getLogger(__name__)
 
@@ -74,10 +76,12 @@ def prevent_asynchronous_task_execution(
             def acquire_lock():
                 # Django cache.add returns True if the key was actually added.
                 # Ensure that the cache backend has atomic add if you want really precise locking.
+                instrumentation_helpers.increment("cache_calls")
                 return cache.add(inner_lock_key, True, inner_lock_expiry)
 
             def release_lock():
                 # cache.delete is silent if the key does not exist
+                instrumentation_helpers.increment("cache_calls")
                 return cache.delete(inner_lock_key)
 
             if acquire_lock():
@@ -103,8 +107,29 @@ def prevent_asynchronous_task_execution(
     return decorator
 
 
+def refresh_task_lock(lock_key, lock_expiry):
+    """
+    Extends the lock of a task using prevent_asynchronous_task_execution, for long running tasks working in chunks.
+        The lock then expires lock_expiry seconds after the last chunk instead of after the task started.
+    """
+    instrumentation_helpers.increment("cache_calls")
+    return cache.set(lock_key, True, lock_expiry)
+
+
+def task_lock_acquire(lock_key, lock_expiry=DEFAULT_TIMEOUT):
+    """Takes the lock of another task using prevent_asynchronous_task_execution, returns whether it was free."""
+    instrumentation_helpers.increment("cache_calls")
+    return cache.add(lock_key, True, lock_expiry)
+
+
+def task_lock_release(lock_key):
+    instrumentation_helpers.increment("cache_calls")
+    return cache.delete(lock_key)
+
+
 def is_object_locked(obj):
     lock_key = obj.celery_object_lock_key()
+    instrumentation_helpers.increment("cache_calls")
     value = cache.get(lock_key)
     if value:
         log.info(f"{lock_key=} is locked")
@@ -115,9 +140,27 @@ def object_lock_acquire(obj, value=True, timeout=None):
     lock_key = obj.celery_object_lock_key()
     timeout = timeout or obj.celery_object_lock_timeout()
 
+    instrumentation_helpers.increment("cache_calls")
     return cache.add(lock_key, value, timeout)
 
 
 def object_lock_release(obj):
     lock_key = obj.celery_object_lock_key()
+    instrumentation_helpers.increment("cache_calls")
     return cache.delete(lock_key)
+
+
+def get_task_cursor(key):
+    """Position a chunked task reached during a previous run, None if it finished or never ran."""
+    instrumentation_helpers.increment("cache_calls")
+    return cache.get(key)
+
+
+def set_task_cursor(key, value, timeout=2 * 24 * 60 * 60):
+    instrumentation_helpers.increment("cache_calls")
+    return cache.set(key, value, timeout)
+
+
+def clear_task_cursor(key):
+    instrumentation_helpers.increment("cache_calls")
+    return cache.delete(key)
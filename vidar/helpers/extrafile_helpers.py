@@ -1,5 +1,5 @@
 from vidar.helpers.video_helpers import video_upload_to_side_by_side
 
 
-def extrafile_file_upload_to(instance, filename):
-    return video_upload_to_side_by_side(instance.video, filename)
+def extrafile_file_upload_to(instance, filename, resolution=None):
+    return video_upload_to_side_by_side(instance.video, filename, resolution=resolution)
@@ -0,0 +1,137 @@
+import json
+import logging
+import time
+
+from django.db import connection
+
+from celery import signals
+from django_celery_results.models import TaskResult
+
+from vidar import app_settings
+
+
+log = logging.getLogger(__name__)
+
+INSTRUMENTED_QUEUES = ["queue-vidar", "queue-vidar-processor"]
+
+TASK_RESULT_META_KEY = "vidar_instrumentation"
+
+# Metrics of the tasks currently running in this worker process, keyed by task_id.
+#   Eager tasks called from within other tasks nest, every active task counts the work of its children.
+_ACTIVE_TASKS = {}
+
+
+class TaskMetrics:
+    """Counts the work performed by a single task invocation.
+
+    An instance is installed as a database execute wrapper for the duration of the task."""
+
+    def __init__(self, task_name):
+        self.task_name = task_name
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_calls = 0
+        self.redis_calls = 0
+        self.wall_time = 0.0
+        self._started = time.perf_counter()
+        self._execute_wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+    def start(self):
+        self._execute_wrapper = connection.execute_wrapper(self)
+        self._execute_wrapper.__enter__()
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self._started
+        if self._execute_wrapper:
+            self._execute_wrapper.__exit__(None, None, None)
+            self._execute_wrapper = None
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "query_time": round(self.query_time, 4),
+            "cache_calls": self.cache_calls,
+            "redis_calls": self.redis_calls,
+            "wall_time": round(self.wall_time, 4),
+        }
+
+
+def is_instrumented(task):
+    if not app_settings.TASK_INSTRUMENTATION:
+        return False
+    return getattr(task, "queue", None) in INSTRUMENTED_QUEUES
+
+
+def increment(counter, amount=1):
+    """Record a cache or redis call against every task currently being instrumented."""
+    for metrics in _ACTIVE_TASKS.values():
+        setattr(metrics, counter, getattr(metrics, counter) + amount)
+
+
+def get_budget_violations(metrics):
+    budget = app_settings.TASK_INSTRUMENTATION_BUDGETS.get(metrics.task_name)
+    if not budget:
+        return {}
+
+    output = {}
+    for key, value in metrics.as_dict().items():
+        limit = budget.get(key)
+        if limit is not None and value > limit:
+            output[key] = (value, limit)
+    return output
+
+
+def store_metrics(task_id, metrics):
+    try:
+        result = TaskResult.objects.get(task_id=task_id)
+    except TaskResult.DoesNotExist:
+        return
+
+    try:
+        meta = json.loads(result.meta) if result.meta else {}
+    except (TypeError, ValueError):
+        meta = {}
+
+    if not isinstance(meta, dict):
+        return
+
+    meta[TASK_RESULT_META_KEY] = metrics.as_dict()
+    result.meta = json.dumps(meta)
+    result.save(update_fields=["meta"])
+
+
+@signals.task_prerun.connect
+def task_prerun_handler(task_id=None, task=None, **kwargs):
+    if not is_instrumented(task):
+        return
+
+    metrics = TaskMetrics(task_name=task.name)
+    metrics.start()
+    _ACTIVE_TASKS[task_id] = metrics
+
+
+@signals.task_postrun.connect
+def task_postrun_handler(task_id=None, task=None, **kwargs):
+    metrics = _ACTIVE_TASKS.pop(task_id, None)
+    if not metrics:
+        return
+
+    metrics.finish()
+
+    log.info(f"Task instrumentation {metrics.task_name} {task_id=} {metrics.as_dict()}")
+
+    for key, (value, limit) in get_budget_violations(metrics).items():
+        log.warning(f"Task {metrics.task_name} {task_id=} exceeded its {key} budget: {value} > {limit}")
+
+    try:
+        store_metrics(task_id=task_id, metrics=metrics)
+    except:  # noqa: E722 ; pragma: no cover
+        log.exception(f"Failed to store task instrumentation for {task_id=}")
@@ -10,7 +10,7 @@ from vidar.services import schema_services
 log = logging.getLogger(__name__)
 
 
-def get_video_upload_to_directory(instance):
+def get_video_upload_to_directory(instance, resolution=None):
     if instance.channel_id:
         channel_dir = schema_services.channel_directory_name(channel=instance.channel)
         path = pathlib.PurePosixPath(channel_dir)
@@ -23,11 +23,12 @@ def get_video_upload_to_directory(instance):
             path /= str(year)
 
         if instance.channel.store_videos_in_separate_directories:
-            path /= schema_services.video_directory_name(video=instance)
+            path /= schema_services.video_directory_name(video=instance, resolution=resolution)
 
     else:
-        if schema_services.video_uses_custom_directory_schema(video=instance):
-            custom_dir = schema_services.video_directory_name(video=instance)
+        resolution = schema_services.get_schema_resolution(instance, resolution)
+        if schema_services.video_uses_custom_directory_schema(video=instance, resolution=resolution):
+            custom_dir = schema_services.video_directory_name(video=instance, resolution=resolution)
             path = pathlib.PurePosixPath(custom_dir)
         else:
             path = pathlib.PurePosixPath("public")
@@ -42,29 +43,29 @@ def get_video_upload_to_directory(instance):
     return path
 
 
-def video_upload_to_side_by_side(instance, filename):
+def video_upload_to_side_by_side(instance, filename, resolution=None):
 
-    path = get_video_upload_to_directory(instance)
+    path = get_video_upload_to_directory(instance, resolution=resolution)
 
     path /= filename
 
     return path
 
 
-def upload_to_file(instance, filename):
-    return video_upload_to_side_by_side(instance, filename)
+def upload_to_file(instance, filename, resolution=None):
+    return video_upload_to_side_by_side(instance, filename, resolution=resolution)
 
 
-def upload_to_infojson(instance, filename):
-    return video_upload_to_side_by_side(instance, filename)
+def upload_to_infojson(instance, filename, resolution=None):
+    return video_upload_to_side_by_side(instance, filename, resolution=resolution)
 
 
-def upload_to_audio(instance, filename):
-    return video_upload_to_side_by_side(instance, filename)
+def upload_to_audio(instance, filename, resolution=None):
+    return video_upload_to_side_by_side(instance, filename, resolution=resolution)
 
 
-def upload_to_thumbnail(instance, filename):
-    return video_upload_to_side_by_side(instance, filename)
+def upload_to_thumbnail(instance, filename, resolution=None):
+    return video_upload_to_side_by_side(instance, filename, resolution=resolution)
 
 
 def default_quality():
@@ -1,4 +1,8 @@
+import contextlib
+import hashlib
 import logging
+import os
+import threading
 import time
 from functools import partial
 
@@ -7,7 +11,7 @@ from django.conf import settings
 import yt_dlp
 
 from vidar import app_settings, exceptions, utils
-from vidar.services import redis_services, ytdlp_services
+from vidar.services import proxy_services, redis_services, ytdlp_services
 
 
 log = logging.getLogger(__name__)
@@ -43,6 +47,166 @@ def get_ytdlp(kwargs):
     return ret
 
 
+# Params YoutubeDL only reads while being constructed, calls supplying them are never pooled.
+POOL_INIT_ONLY_PARAMS = {
+    "download_archive",
+    "forceprint",
+    "format",
+    "outtmpl",
+    "paths",
+    "post_hooks",
+    "postprocessor_hooks",
+    "postprocessors",
+    "progress_hooks",
+    "simulate",
+}
+
+# Params behind the HTTP opener and cookie jar of an instance, pooled instances are keyed by them.
+POOL_KEY_PARAMS = ("proxy", "cookiefile", "cookiesfrombrowser", "http_headers", "impersonate", "source_address")
+
+
+class YoutubeDLPool:
+    """
+    Idle YoutubeDL instances of this worker process, reused so their extractors, HTTP connections
+        and cookie jar survive between interactor calls.
+
+    Instances are keyed by the params they were constructed with, every other param is applied for the
+        length of one call and then restored. Instances idle for longer than VIDAR_YTDLP_POOL_IDLE_SECONDS are closed.
+    """
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        expired = []
+        idle_seconds = app_settings.YTDLP_POOL_IDLE_SECONDS
+        for key, entries in list(self._idle.items()):
+            kept = [x for x in entries if now - x[1] < idle_seconds]
+            expired.extend(x[0] for x in entries if now - x[1] >= idle_seconds)
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+        return expired
+
+    def acquire(self, key):
+        with self._lock:
+            expired = self._evict(time.monotonic())
+            entries = self._idle.get(key)
+            ydl = entries.pop()[0] if entries else None
+        for x in expired:
+            _close(x)
+        return ydl
+
+    def release(self, key, ydl):
+        with self._lock:
+            entries = self._idle.setdefault(key, [])
+            if len(entries) < app_settings.YTDLP_POOL_SIZE:
+                entries.append((ydl, time.monotonic()))
+                return
+        _close(ydl)
+
+    def clear(self):
+        with self._lock:
+            entries = [x for y in self._idle.values() for x in y]
+            self._idle = {}
+        for ydl, _ in entries:
+            _close(ydl)
+
+    def __len__(self):
+        return sum(len(x) for x in self._idle.values())
+
+
+ytdlp_pool = YoutubeDLPool()
+
+
+def _close(ydl):
+    try:
+        ydl.close()
+    except Exception:  # pragma: no cover
+        log.exception("Failure to close pooled YoutubeDL")
+
+
+def _pool_key_value(name, value):
+    """
+    repr of a pool key param. A cookiefile that is a file object, such as the StringIO of the default
+        VIDAR_COOKIES_GETTER, is keyed by its contents as its repr differs for every call.
+
+    Returns None for file objects whose contents cannot be read without consuming them, those are not pooled.
+    """
+    if name != "cookiefile" or value is None or isinstance(value, (str, os.PathLike)):
+        return repr(value)
+    if not hasattr(value, "getvalue"):
+        return
+    contents = value.getvalue()
+    if isinstance(contents, str):
+        contents = contents.encode()
+    return f"cookies:{hashlib.blake2b(contents, digest_size=16).hexdigest()}"
+
+
+def _pool_key(kwargs, initializer):
+    """Returns None when kwargs cannot be pooled."""
+    key = tuple(_pool_key_value(x, kwargs.get(x)) for x in POOL_KEY_PARAMS)
+    if None in key:
+        return
+    if initializer:
+        # The initializer may build a different instance for every action and object.
+        instance = kwargs.get("instance")
+        key += (kwargs.get("action"), type(instance).__name__, getattr(instance, "pk", None))
+    return key
+
+
+@contextlib.contextmanager
+def ytdlp_session(kwargs):
+    """
+    Context manager yielding a YoutubeDL for kwargs, taken from ytdlp_pool when VIDAR_YTDLP_POOL_SIZE is set.
+
+    Pooled instances are built through get_ytdlp, and so VIDAR_YTDLP_INITIALIZER, from the pool key params alone.
+    """
+
+    if not app_settings.YTDLP_POOL_SIZE or POOL_INIT_ONLY_PARAMS & kwargs.keys():
+        with get_ytdlp(kwargs) as ydl:
+            yield ydl
+        return
+
+    initializer = app_settings.YTDLP_INITIALIZER
+
+    if not initializer and "proxy" not in kwargs:
+        if proxy := utils.get_proxy():
+            kwargs["proxy"] = proxy
+
+    key = _pool_key(kwargs, initializer=initializer)
+    if key is None:
+        with get_ytdlp(kwargs) as ydl:
+            yield ydl
+        return
+
+    ydl = ytdlp_pool.acquire(key)
+    if ydl is None:
+        base = {x: kwargs[x] for x in POOL_KEY_PARAMS if x in kwargs}
+        if initializer:
+            base.update({x: kwargs[x] for x in ("action", "instance") if x in kwargs})
+        ydl = get_ytdlp(base)
+    else:
+        log.debug(f"Reusing pooled YoutubeDL {key=}")
+
+    _clean_kwargs(kwargs)
+
+    params = dict(ydl.params)
+    ydl.params.update(kwargs)
+
+    try:
+        yield ydl
+    except BaseException:
+        _close(ydl)
+        raise
+
+    ydl.params.clear()
+    ydl.params.update(params)
+    ytdlp_pool.release(key, ydl)
+
+
 def playlist_details(url, ignore_errors=True, detailed_video_data=False, **kwargs):
     kwargs.setdefault("default_search", "ytsearch")
     kwargs.setdefault("quiet", False)
@@ -52,13 +216,14 @@ def playlist_details(url, ignore_errors=True, detailed_video_data=False, **kwarg
     kwargs.setdefault("noplaylist", True)
     kwargs.setdefault("check_formats", "none")
     kwargs["action"] = "playlist_details"
-    with get_ytdlp(kwargs) as ydl:
+    with ytdlp_session(kwargs) as ydl:
         return ydl.extract_info(url, download=False)
 
 
 def video_download(url, **kwargs):
 
     local_url = kwargs.pop("local_url", None)
+    bandwidth_lease = kwargs.pop("bandwidth_lease", None)
     hook_partial = partial(redis_services.progress_hook_download_status, url=local_url)
 
     kwargs.setdefault("progress_hooks", [hook_partial])
@@ -77,8 +242,26 @@ def video_download(url, **kwargs):
 
     kwargs["action"] = "video_download"
 
-    with get_ytdlp(kwargs) as ydl:
-        return ydl.extract_info(url, download=True), kwargs
+    monitor = proxy_services.download_monitor(kwargs.get("proxy"))
+    if monitor:
+        kwargs["progress_hooks"] = [*kwargs["progress_hooks"], monitor]
+    if bandwidth_lease:
+        kwargs["progress_hooks"] = [*kwargs["progress_hooks"], bandwidth_lease]
+
+    with ytdlp_session(kwargs) as ydl:
+        if bandwidth_lease:
+            bandwidth_lease.attach(ydl.params)
+        try:
+            info = ydl.extract_info(url, download=True)
+        except yt_dlp.DownloadError as exc:
+            if monitor:
+                monitor.failed(exc)
+            raise
+
+    if monitor:
+        monitor.succeeded()
+
+    return info, kwargs
 
 
 def video_details(url, **kwargs):
@@ -87,7 +270,7 @@ def video_details(url, **kwargs):
     kwargs.setdefault("skip_download", True)
     kwargs.setdefault("extract_flat", True)
     kwargs["action"] = "video_details"
-    with get_ytdlp(kwargs) as ydl:
+    with ytdlp_session(kwargs) as ydl:
         return ydl.extract_info(url)
 
 
@@ -118,7 +301,7 @@ def video_comments(
 
         kwargs.update(extractor_args)
     kwargs["action"] = "video_comments"
-    with get_ytdlp(kwargs) as ydl:
+    with ytdlp_session(kwargs) as ydl:
         return ydl.extract_info(url, download=False)
 
 
@@ -129,7 +312,7 @@ def channel_details(url, **kwargs):
     # kwargs.setdefault('extract_flat', True)
     kwargs.setdefault("playlist_items", "1,0")
     kwargs["action"] = "channel_details"
-    with get_ytdlp(kwargs) as ydl:
+    with ytdlp_session(kwargs) as ydl:
         return ydl.extract_info(url, download=False)
 
 
@@ -145,17 +328,62 @@ def channel_videos(url, limit=None, **kwargs):
     if limit:
         kwargs["playlistend"] = limit
 
-    with get_ytdlp(kwargs) as ydl:
+    with ytdlp_session(kwargs) as ydl:
+        return ydl.extract_info(url, download=False)
+
+
+def channel_listing(url, **kwargs):
+    """Flat listing of a channel or playlist, one request per page rather than one per video."""
+    kwargs.setdefault("quiet", True)
+    kwargs.setdefault("skip_download", True)
+    kwargs.setdefault("extract_flat", "in_playlist")
+    kwargs.setdefault("ignoreerrors", True)
+    kwargs["action"] = "channel_listing"
+    with ytdlp_session(kwargs) as ydl:
         return ydl.extract_info(url, download=False)
 
 
+def channel_scan_session(incremental=False, **kwargs):
+    """
+    One YoutubeDL for scanning every tab of a channel, sharing cookies, proxy and HTTP connections between them.
+        Use it as a context manager and extract each tab with channel_scan_tab.
+    """
+    kwargs.setdefault("default_search", "ytsearch")
+    kwargs.setdefault("quiet", False)
+    kwargs.setdefault("skip_download", True)
+    kwargs.setdefault("extract_flat", "in_playlist" if incremental else False)
+    kwargs.setdefault("ignoreerrors", True)
+    kwargs["action"] = "channel_scan_session"
+    return ytdlp_session(kwargs)
+
+
+def channel_scan_tab(ydl, url, limit=None, sleep=5):
+    """Extracts one tab through a channel_scan_session, retried like func_with_retry when nothing is listed."""
+
+    if limit:
+        ydl.params["playlistend"] = limit
+    else:
+        ydl.params.pop("playlistend", None)
+
+    for x in range(2):
+
+        chan = ydl.extract_info(url, download=False)
+
+        if chan and chan.get("entries"):
+            return chan
+
+        time.sleep(sleep)
+
+    log.info(f"channel_scan_tab failed for {url}")
+
+
 def channel_playlists(youtube_id, **kwargs):
     kwargs.setdefault("quiet", False)
     kwargs.setdefault("skip_download", True)
     kwargs.setdefault("extract_flat", True)
     kwargs.setdefault("ignoreerrors", True)
     kwargs["action"] = "channel_playlists"
-    with get_ytdlp(kwargs) as ydl:
+    with ytdlp_session(kwargs) as ydl:
         return ydl.extract_info(
             f"https://www.youtube.com/channel/{youtube_id}" f"/playlists?view=1&sort=dd&shelf_id=0", download=False
         )
@@ -44,6 +44,11 @@ class Command(BaseCommand):
                 "task": "vidar.tasks.automated_video_quality_upgrades",
                 "cron": "26 * * * *",
             },
+            {
+                "name": "vidar: clean media cache",
+                "task": "vidar.tasks.clean_media_cache",
+                "cron": "41 * * * *",
+            },
             {
                 "name": "vidar: daily maintenances",
                 "task": "vidar.tasks.daily_maintenances",
@@ -64,6 +69,16 @@ class Command(BaseCommand):
                 "task": "vidar.tasks.trigger_crontab_scans",
                 "cron": "*/10 * * * *",
             },
+            {
+                "name": "vidar: reconcile media files",
+                "task": "vidar.tasks.reconcile_media_files",
+                "cron": "27 3 * * 0",
+            },
+            {
+                "name": "vidar: trigger file hashing",
+                "task": "vidar.tasks.trigger_file_hashing",
+                "cron": "52 * * * *",
+            },
             {
                 "name": "vidar: mirror channel playlists",
                 "task": "vidar.tasks.trigger_mirror_live_playlists",
@@ -119,14 +134,25 @@ class Command(BaseCommand):
 
         if options["init_settings"]:
             self.stdout.write("Calling all system settings.")
+            app_settings.AUTOMATED_DOWNLOADS_DAILY_BYTES
             app_settings.AUTOMATED_DOWNLOADS_DAILY_LIMIT
             app_settings.AUTOMATED_DOWNLOADS_DURATION_LIMIT_SPLIT
+            app_settings.AUTOMATED_DOWNLOADS_FREE_SPACE
+            app_settings.AUTOMATED_DOWNLOADS_PER_TASK_BYTES
             app_settings.AUTOMATED_DOWNLOADS_PER_TASK_LIMIT
+            app_settings.AUTOMATED_DOWNLOADS_PER_TASK_SECONDS
             app_settings.AUTOMATED_QUALITY_UPGRADES_PER_TASK_LIMIT
             app_settings.AUTOMATED_CRONTAB_CATCHUP
+            app_settings.BANDWIDTH_ADMISSION_WINDOW
+            app_settings.BANDWIDTH_LEASE_SECONDS
+            app_settings.BANDWIDTH_LIMIT
+            app_settings.BANDWIDTH_SCHEDULE
             app_settings.CHANNEL_BANNER_RATE_LIMIT
             app_settings.CHANNEL_DIRECTORY_SCHEMA
             app_settings.CHANNEL_BLOCK_RESCAN_WINDOW_HOURS
+            app_settings.CHANNEL_SCAN_INCREMENTAL
+            app_settings.CHANNEL_SCAN_INCREMENTAL_KNOWN_RUN
+            app_settings.CHANNEL_SCAN_SINGLE_PASS
             app_settings.COMMENTS_MAX_PARENTS
             app_settings.COMMENTS_MAX_REPLIES
             app_settings.COMMENTS_MAX_REPLIES_PER_THREAD
@@ -142,17 +168,35 @@ class Command(BaseCommand):
             app_settings.CRON_DEFAULT_SELECTION
             app_settings.CRONTAB_CHECK_INTERVAL
             app_settings.CRONTAB_CHECK_INTERVAL_MAX_IN_DAYS
+            app_settings.DAILY_MAINTENANCE_CHUNK_SIZE
+            app_settings.DEDUPE_HASH_BATCH_SIZE
+            app_settings.DEDUPE_HASH_MAX_PER_RUN
             app_settings.DELETE_DOWNLOAD_CACHE
             app_settings.DEFAULT_QUALITY
             app_settings.DISCORD_URL
+            app_settings.DOWNLOAD_PROFILE
+            app_settings.DOWNLOAD_PROFILES
             app_settings.DOWNLOAD_SPEED_RATE_LIMIT
+            app_settings.EXTRACTION_CACHE_SECONDS
+            app_settings.EXTRACTION_WORKERS
             app_settings.GOTIFY_PRIORITY
             app_settings.GOTIFY_TOKEN
             app_settings.GOTIFY_URL
             app_settings.GOTIFY_URL_VERIFY
+            app_settings.IMAGE_FETCH_TIMEOUT
+            app_settings.IMAGE_FETCH_WORKERS
+            app_settings.IMAGE_JPEG_OPTIMIZE
+            app_settings.IMAGE_JPEG_PROGRESSIVE
+            app_settings.IMAGE_VARIANTS
+            app_settings.IMAGE_VARIANTS_DIRECTORY
+            app_settings.IMAGE_VARIANTS_FORMAT
+            app_settings.IMAGE_VARIANTS_ON_INGEST
+            app_settings.IMAGE_VARIANTS_QUALITY
             app_settings.LOAD_SPONSORBLOCK_DATA_ON_DOWNLOAD
             app_settings.LOAD_SPONSORBLOCK_DATA_ON_UPDATE_VIDEO_DETAILS
             app_settings.MEDIA_CACHE
+            app_settings.MEDIA_CACHE_MAX_AGE
+            app_settings.MEDIA_CACHE_QUOTA
             app_settings.MEDIA_HARDLINK
             app_settings.MEDIA_ROOT
             app_settings.MEDIA_URL
@@ -180,23 +224,35 @@ class Command(BaseCommand):
             app_settings.NOTIFICATIONS_VIDEO_READDED_TO_PLAYLIST
             app_settings.NOTIFICATIONS_VIDEO_REMOVED_FROM_PLAYLIST
             app_settings.PLAYLIST_BLOCK_RESCAN_WINDOW_HOURS
+            app_settings.PLAYLIST_MIRROR_RATE_LIMIT
             app_settings.PRIVACY_STATUS_CHECK_HOURS_PER_DAY
             app_settings.PRIVACY_STATUS_CHECK_MAX_CHECK_PER_VIDEO
             app_settings.PRIVACY_STATUS_CHECK_MIN_AGE
             app_settings.PRIVACY_STATUS_CHECK_FORCE_CHECK_PER_CALL
+            app_settings.PRIVACY_STATUS_CHECK_USE_CHANNEL_LISTINGS
             app_settings.PROXIES
             app_settings.PROXIES_DEFAULT
+            app_settings.PROXY_COOLDOWN_MAX_SECONDS
+            app_settings.PROXY_COOLDOWN_SECONDS
+            app_settings.PROXY_FAILOVER_RETRIES
+            app_settings.PROXY_HEALTH_ENABLED
+            app_settings.PROXY_HEALTH_EXPIRES
+            app_settings.RECONCILIATION_WORKERS
             app_settings.REDIS_CHANNEL_INDEXING
             app_settings.REDIS_ENABLED
             app_settings.REDIS_PLAYLIST_INDEXING
             app_settings.REDIS_VIDEO_DOWNLOADING
             app_settings.REDIS_VIDEO_CONVERSION_FINISHED
             app_settings.REDIS_VIDEO_CONVERSION_STARTED
+            app_settings.RENAME_WORKERS
             app_settings.REQUESTS_RATE_LIMIT
+            app_settings.RETENTION_DELETE_WORKERS
             app_settings.SAVE_INFO_JSON_FILE
             app_settings.SHOULD_CONVERT_FILE_TO_HTML_PLAYABLE_FORMAT
             app_settings.SHORTS_FORCE_MAX_QUALITY
             app_settings.SLOW_FULL_ARCHIVE_TASK_DOWNLOAD_LIMIT
+            app_settings.TASK_INSTRUMENTATION
+            app_settings.TASK_INSTRUMENTATION_BUDGETS
             app_settings.VIDEO_AUTO_DOWNLOAD_LIVE_AMQ_WHEN_DETECTED
             app_settings.VIDEO_DOWNLOAD_ERROR_ATTEMPTS
             app_settings.VIDEO_DOWNLOAD_ERROR_DAILY_ATTEMPTS
@@ -207,3 +263,5 @@ class Command(BaseCommand):
             app_settings.VIDEO_FILENAME_SCHEMA
             app_settings.VIDEO_LIVE_DOWNLOAD_RETRY_HOURS
             app_settings.YTDLP_INITIALIZER
+            app_settings.YTDLP_POOL_IDLE_SECONDS
+            app_settings.YTDLP_POOL_SIZE
@@ -0,0 +1,41 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vidar import exceptions
+from vidar.services import dedupe_services
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the stored files sharing the same content, as hashed by the hash_video_files task. "
+        "Duplicates are replaced with hardlinks when --hardlink is supplied."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hardlink",
+            action="store_true",
+            help="Replace duplicates with hardlinks to the oldest copy. Requires VIDAR_MEDIA_HARDLINK.",
+        )
+
+    def handle(self, *args, **options):
+
+        groups = dedupe_services.find_duplicates()
+
+        for file_hash, files in groups.items():
+            self.stdout.write(file_hash)
+            for file in files:
+                self.stdout.write(f"    {file.name}")
+
+        try:
+            report = dedupe_services.hardlink_duplicates(groups=groups, commit=options["hardlink"])
+        except exceptions.MediaHardlinkDisabledError as e:
+            raise CommandError(str(e))
+
+        reclaimed = sum(x["size"] for x in report)
+        action = "Reclaimed" if options["hardlink"] else "Would reclaim"
+        self.stdout.write(f"{action} {reclaimed} bytes by hardlinking {len(report)} duplicates.")
@@ -0,0 +1,56 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vidar.services import benchmark_services
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the query plans of the heaviest Video queries. "
+        "Optionally generates a synthetic library first, which is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--channels",
+            type=int,
+            default=0,
+            help="Number of synthetic channels to generate. Zero runs against the existing data.",
+        )
+        parser.add_argument("--videos-per-channel", type=int, default=100)
+        parser.add_argument(
+            "--slow-ms",
+            type=float,
+            default=50.0,
+            help="Queries slower than this many milliseconds are flagged as slow.",
+        )
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE where supported.")
+
+    def handle(self, *args, **options):
+
+        with transaction.atomic():
+
+            if options["channels"]:
+                benchmark_services.generate_library(
+                    channels=options["channels"],
+                    videos_per_channel=options["videos_per_channel"],
+                )
+
+            results = benchmark_services.explain_querysets(
+                benchmark_services.get_hot_querysets(),
+                analyze=options["analyze"],
+            )
+
+            # Never keep the synthetic library.
+            transaction.set_rollback(True)
+
+        for name, duration, plan in results:
+            label = "SLOW" if duration >= options["slow_ms"] else "OK"
+            self.stdout.write(f"[{label}] {name}: {duration:.2f}ms")
+            self.stdout.write(plan)
+            self.stdout.write("")
@@ -0,0 +1,31 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from vidar.services import retention_services
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the videos whose files the channel retention policies would delete during daily maintenances. "
+        "Nothing is deleted unless --commit is supplied."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--commit", action="store_true", help="Delete the files now instead of reporting.")
+
+    def handle(self, *args, **options):
+
+        report = retention_services.apply_retention_policies(dry_run=not options["commit"])
+
+        for row in report:
+            video = row["video"]
+            self.stdout.write(f"[{row['reason']}] {video.pk} {video.channel} - {video}")
+            for name in row["files"]:
+                self.stdout.write(f"    {name}")
+
+        action = "Deleted" if options["commit"] else "Would delete"
+        self.stdout.write(f"{action} the files of {len(report)} videos.")
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:18
+
+from django.db import migrations, models
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS vidar_video_system_notes_gin ON vidar_video USING gin (system_notes)"
+    )
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS vidar_video_system_notes_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0005_playlist_directory_schema_playlist_filename_schema'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='date_downloaded',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='provider_object_id',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['channel', 'sort_ordering'], name='vidar_video_channel_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['privacy_status', 'last_privacy_status_check'], name='vidar_video_privacy_check_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('file', '')), fields=['upload_date'], name='vidar_video_not_downloaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('system_notes__video_was_live_at_last_attempt', True)), fields=['inserted'], name='vidar_video_was_live_idx'),
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0006_video_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaManifestDirectory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('mtime_ns', models.BigIntegerField()),
+                ('inserted', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['path'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MediaManifestFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('mtime_ns', models.BigIntegerField()),
+                ('inode', models.PositiveBigIntegerField()),
+                ('inserted', models.DateTimeField(auto_now_add=True)),
+                ('directory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='vidar.mediamanifestdirectory')),
+            ],
+            options={
+                'ordering': ['path'],
+            },
+        ),
+    ]
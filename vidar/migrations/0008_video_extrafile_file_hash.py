@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0007_media_manifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extrafile',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='Content hash of file, see dedupe_services.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='Content hash of file, see dedupe_services.', max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0008_video_extrafile_file_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='download_profile',
+            field=models.CharField(blank=True, help_text='Name of the download profile, see VIDAR_DOWNLOAD_PROFILES. Blank for system default.', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='download_profile',
+            field=models.CharField(blank=True, help_text='Name of the download profile, see VIDAR_DOWNLOAD_PROFILES. Takes precedence over the channel profile. Blank for the channel or system default.', max_length=100),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0009_download_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('stage', models.CharField(choices=[('download', 'Download'), ('conversion', 'Conversion'), ('local_copy', 'Local copy of a remote file')], max_length=20)),
+                ('last_used', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inserted', models.DateTimeField(auto_now_add=True)),
+                ('video', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cached_files', to='vidar.video')),
+            ],
+            options={
+                'ordering': ['last_used'],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:02
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+# Frozen copy of ytdlp_services.summarize_formats as of this migration, later changes to it must not alter history.
+FORMAT_SUMMARY_FIELDS = [
+    "format_id",
+    "format_note",
+    "height",
+    "video_ext",
+    "vcodec",
+    "acodec",
+    "filesize",
+    "filesize_approx",
+    "tbr",
+]
+
+
+def summarize_formats(formats):
+    output = []
+    for f in formats or []:
+        if f.get("video_ext") == "none" and f.get("audio_ext") == "none":
+            continue
+        output.append({k: f[k] for k in FORMAT_SUMMARY_FIELDS if f.get(k) is not None})
+    return output
+
+
+def summarize_dlp_formats(apps, schema_editor):
+    Video = apps.get_model("vidar", "Video")
+
+    queryset = Video.objects.exclude(dlp_formats__isnull=True).only("pk", "dlp_formats").order_by("pk")
+
+    batch = []
+    for video in queryset.iterator(chunk_size=BATCH_SIZE):
+        summary = summarize_formats(video.dlp_formats)
+        if summary == video.dlp_formats:
+            continue
+        video.dlp_formats = summary
+        batch.append(video)
+        if len(batch) >= BATCH_SIZE:
+            Video.objects.bulk_update(batch, ["dlp_formats"])
+            batch = []
+
+    if batch:
+        Video.objects.bulk_update(batch, ["dlp_formats"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0010_cachedfile'),
+    ]
+
+    operations = [
+        migrations.RunPython(summarize_dlp_formats, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vidar', '0011_summarize_dlp_formats'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='rightssupport',
+            options={'default_permissions': (), 'managed': False, 'permissions': (('access_vidar', 'General Access to Vidar'), ('view_index_download_stats', 'Index View - See Download Stats'), ('view_download_queue', 'View Download Queue'), ('view_update_details_queue', 'View Update Details Queue'), ('access_watch_later_playlist', 'Access Watch Later Functionality'), ('change_proxy_health', 'Reset Proxy Health'))},
+        ),
+    ]
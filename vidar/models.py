@@ -54,6 +54,7 @@ class RightsSupport(models.Model):
             ("view_download_queue", "View Download Queue"),
             ("view_update_details_queue", "View Update Details Queue"),
             ("access_watch_later_playlist", "Access Watch Later Functionality"),
+            ("change_proxy_health", "Reset Proxy Health"),
         )
 
 
@@ -238,6 +239,12 @@ class Channel(models.Model):
         help_text="Changing the channel quality will cause all videos to redownload. Do you want this to happen?",
     )
 
+    download_profile = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Name of the download profile, see VIDAR_DOWNLOAD_PROFILES. Blank for system default.",
+    )
+
     playback_speed = models.CharField(max_length=10, null=True, blank=True, choices=model_helpers.PlaybackSpeed.choices)
     playback_volume = models.CharField(
         max_length=10,
@@ -360,26 +367,11 @@ class Channel(models.Model):
 
     @property
     def system_safe_name(self):
-        replaceables = {
-            "&": "and",
-            "–": "-",
-        }
-        keepers = "&– -"
-        safe_name = "".join([c for c in self.name if c.isalnum() or c in keepers]).rstrip()
-        for k, v in replaceables.items():
-            safe_name = safe_name.replace(k, v)
-        safe_string = re.sub(" +", " ", safe_name)
-        safe_string_without_multiple_spaces = " ".join(safe_string.split())
-        return safe_string_without_multiple_spaces
+        return utils.system_safe_name(self.name)
 
     @property
     def system_safe_name_the(self):
-        current_name = self.system_safe_name
-        if current_name.lower().startswith("the "):
-            cased_the = current_name[:4].strip()
-            title_without_the = current_name[4:]
-            current_name = f"{title_without_the}, {cased_the}"
-        return current_name
+        return utils.move_leading_the_to_end(self.system_safe_name)
 
     @property
     def base_url(self):  # pragma: no cover
@@ -389,6 +381,13 @@ class Channel(models.Model):
     def url(self):  # pragma: no cover
         return f"{self.base_url}/videos"
 
+    @property
+    def uploads_url(self):
+        # Every upload, regardless of tab, is listed in the channel's uploads playlist.
+        if self.provider_object_id.startswith("UC"):
+            return f"https://www.youtube.com/playlist?list=UU{self.provider_object_id[2:]}"
+        return self.url
+
     @property
     def shorts_url(self):  # pragma: no cover
         return f"{self.base_url}/shorts"
@@ -595,9 +594,15 @@ class Channel(models.Model):
 
 class VideoObjectsManager(models.Manager):
 
+    # Fields only needed when working on a single video, deferred on pages listing many.
+    LISTING_DEFERRED_FIELDS = ["dlp_formats"]
+
     def archived(self):
         return self.exclude(file="")
 
+    def listing(self):
+        return self.defer(*self.LISTING_DEFERRED_FIELDS)
+
     def get_or_create_from_ytdlp_response(
         self, data, is_video=False, is_short=False, is_livestream=False
     ) -> [Video, bool]:
@@ -625,12 +630,22 @@ class Video(model_helpers.CeleryLockableModel, models.Model):
             ("play_videos", "Can play video"),
             ("star_video", "Can Star video"),
         ]
+        indexes = [
+            models.Index(fields=["channel", "sort_ordering"], name="vidar_video_channel_sort_idx"),
+            models.Index(fields=["privacy_status", "last_privacy_status_check"], name="vidar_video_privacy_check_idx"),
+            models.Index(fields=["upload_date"], name="vidar_video_not_downloaded_idx", condition=Q(file="")),
+            models.Index(
+                fields=["inserted"],
+                name="vidar_video_was_live_idx",
+                condition=Q(system_notes__video_was_live_at_last_attempt=True),
+            ),
+        ]
 
     objects = VideoObjectsManager()
 
     channel = models.ForeignKey(Channel, on_delete=models.SET_NULL, null=True, blank=True, related_name="videos")
 
-    provider_object_id = models.CharField(max_length=255)
+    provider_object_id = models.CharField(max_length=255, db_index=True)
     channel_provider_object_id = models.CharField(max_length=255, blank=True)
 
     title = models.CharField(max_length=500, blank=True)
@@ -642,6 +657,9 @@ class Video(model_helpers.CeleryLockableModel, models.Model):
     file = models.FileField(upload_to=video_helpers.upload_to_file, blank=True, storage=vidar_storage, max_length=500)
     file_size = models.PositiveBigIntegerField(null=True, blank=True)
     file_not_found = models.BooleanField(default=False)
+    file_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, help_text="Content hash of file, see dedupe_services."
+    )
 
     info_json = models.FileField(
         upload_to=video_helpers.upload_to_infojson, blank=True, storage=vidar_storage, max_length=500
@@ -674,7 +692,7 @@ class Video(model_helpers.CeleryLockableModel, models.Model):
     watched = models.DateTimeField(null=True, blank=True)
 
     date_added_to_system = models.DateTimeField(auto_now_add=True)
-    date_downloaded = models.DateTimeField(null=True, blank=True)
+    date_downloaded = models.DateTimeField(null=True, blank=True, db_index=True)
 
     duration = models.IntegerField(default=0, blank=True)
 
@@ -865,18 +883,11 @@ class Video(model_helpers.CeleryLockableModel, models.Model):
 
     @property
     def system_safe_title(self):
-        safe_string = "".join([c for c in self.title if c.isalnum() or c == " "]).rstrip()
-        safe_string_without_multiple_spaces = " ".join(safe_string.split())
-        return safe_string_without_multiple_spaces
+        return utils.system_safe_title(self.title)
 
     @property
     def system_safe_title_the(self):
-        current_title = self.system_safe_title
-        if current_title.lower().startswith("the "):
-            cased_the = current_title[:4].strip()
-            title_without_the = current_title[4:]
-            current_title = f"{title_without_the}, {cased_the}"
-        return current_title
+        return utils.move_leading_the_to_end(self.system_safe_title)
 
     def set_details_from_yt_dlp_response(self, data, is_video=False, is_short=False, is_livestream=False):
 
@@ -916,7 +927,7 @@ class Video(model_helpers.CeleryLockableModel, models.Model):
             self.upload_date = timezone.make_aware(timezone.datetime.fromtimestamp(0))
 
         if formats := data.get("formats"):
-            self.dlp_formats = formats
+            self.dlp_formats = ytdlp_services.summarize_formats(formats)
 
         if live_status := data.get("availability"):
             status_mapping = {
@@ -1343,6 +1354,13 @@ class Playlist(models.Model):
         default=None,
     )
 
+    download_profile = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Name of the download profile, see VIDAR_DOWNLOAD_PROFILES. "
+        "Takes precedence over the channel profile. Blank for the channel or system default.",
+    )
+
     playback_speed = models.CharField(max_length=10, blank=True, choices=model_helpers.PlaybackSpeed.choices)
     playback_volume = models.CharField(
         max_length=10,
@@ -1756,8 +1774,72 @@ class ExtraFile(models.Model):
     video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="extra_files")
 
     file = models.FileField(upload_to=extrafile_helpers.extrafile_file_upload_to, storage=vidar_storage, max_length=500)
+    file_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, help_text="Content hash of file, see dedupe_services."
+    )
 
     note = models.TextField(blank=True)
 
     inserted = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+
+
+class MediaManifestDirectory(models.Model):
+    """A directory within the media tree as it was last seen by reconciliation_services.scan_media_tree."""
+
+    path = models.CharField(max_length=500, unique=True)
+    mtime_ns = models.BigIntegerField()
+
+    inserted = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["path"]
+
+    def __str__(self):  # pragma: no cover
+        return self.path or "."
+
+
+class MediaManifestFile(models.Model):
+    """A file within the media tree as it was last seen by reconciliation_services.scan_media_tree."""
+
+    directory = models.ForeignKey(MediaManifestDirectory, on_delete=models.CASCADE, related_name="files")
+
+    path = models.CharField(max_length=500, unique=True)
+    size = models.PositiveBigIntegerField()
+    mtime_ns = models.BigIntegerField()
+    inode = models.PositiveBigIntegerField()
+
+    inserted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["path"]
+
+    def __str__(self):  # pragma: no cover
+        return self.path
+
+
+class CachedFile(models.Model):
+    """A file created within MEDIA_CACHE, see cache_services.
+
+    Downloads are tracked by the name yt-dlp writes its files under, the path without extensions,
+        so the entry owns every fragment, .part and info.json file of the download."""
+
+    class Stages(models.TextChoices):
+        DOWNLOAD = "download", "Download"
+        CONVERSION = "conversion", "Conversion"
+        LOCAL_COPY = "local_copy", "Local copy of a remote file"
+
+    video = models.ForeignKey(Video, on_delete=models.SET_NULL, null=True, blank=True, related_name="cached_files")
+
+    path = models.CharField(max_length=500, unique=True)
+    stage = models.CharField(max_length=20, choices=Stages.choices)
+
+    last_used = models.DateTimeField(default=timezone.now)
+    inserted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["last_used"]
+
+    def __str__(self):  # pragma: no cover
+        return self.path
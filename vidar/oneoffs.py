@@ -1,7 +1,6 @@
 # flake8:noqa
 import copy
 import csv
-import glob
 import json
 import logging
 import math
@@ -24,7 +23,7 @@ from vidar import app_settings, helpers, renamers, utils
 from vidar.exceptions import FileStorageBackendHasNoMoveError
 from vidar.helpers import file_helpers, video_helpers
 from vidar.models import Channel, DurationSkip, Video, vidar_storage
-from vidar.services import crontab_services, schema_services, video_services
+from vidar.services import crontab_services, reconciliation_services, schema_services, video_services
 
 
 log = logging.getLogger(__name__)
@@ -32,14 +31,7 @@ log = logging.getLogger(__name__)
 
 def find_existing_files_with_missing_video_entries():
 
-    current_files = []
-    for file in glob.glob(f"{app_settings.MEDIA_ROOT}/**/*.*", recursive=True):
-        if not file.endswith((".mp4", ".webm", ".mkv")):
-            continue
-        current_files.append(file.replace("/", ""))
-
-    for video in Video.objects.archived():
-        current_files.remove(video.file.path)
+    current_files = reconciliation_services.reconcile()["orphaned_files"]
 
     for x in current_files:
         print(x)
@@ -49,12 +41,10 @@ def find_existing_files_with_missing_video_entries():
 
 def find_existing_videos_without_local_file():
 
-    missing = []
-    for video in Video.objects.archived():
+    missing = list(Video.objects.filter(pk__in=reconciliation_services.reconcile()["missing_videos"]))
 
-        if not video.file.storage.exists(video.file.name):
-            missing.append(video)
-            print(video)
+    for video in missing:
+        print(video)
 
     return missing
 
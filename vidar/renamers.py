@@ -1,9 +1,13 @@
 import logging
 import pathlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from django.utils import timezone
+
+from vidar import app_settings, models
 from vidar.exceptions import FileStorageBackendHasNoMoveError
 from vidar.helpers import channel_helpers, extrafile_helpers, file_helpers, video_helpers
-from vidar.services import channel_services, schema_services, video_services
+from vidar.services import channel_services, image_services, schema_services, video_services
 from vidar.storages import vidar_storage
 
 
@@ -34,6 +38,7 @@ def channel_rename_thumbnail_file(channel, commit=True):
     log.debug(f"{old_storage_path=}")
     log.debug(f"{new_storage_path=}")
     channel.thumbnail.storage.move(old_storage_path, new_storage_path)
+    image_services.move_variants(channel.thumbnail.storage, old_storage_path, new_storage_path)
     channel.thumbnail.name = str(new_storage_path)
     if commit:
         channel.save()
@@ -63,6 +68,7 @@ def channel_rename_banner_file(channel, commit=True):
     log.debug(f"{old_storage_path=}")
     log.debug(f"{new_storage_path=}")
     channel.banner.storage.move(old_storage_path, new_storage_path)
+    image_services.move_variants(channel.banner.storage, old_storage_path, new_storage_path)
     channel.banner.name = str(new_storage_path)
     if commit:
         channel.save()
@@ -92,6 +98,7 @@ def channel_rename_tvart_file(channel, commit=True):
     log.debug(f"{old_storage_path=}")
     log.debug(f"{new_storage_path=}")
     channel.tvart.storage.move(old_storage_path, new_storage_path)
+    image_services.move_variants(channel.tvart.storage, old_storage_path, new_storage_path)
     channel.tvart.name = str(new_storage_path)
     if commit:
         channel.save()
@@ -99,11 +106,8 @@ def channel_rename_tvart_file(channel, commit=True):
 
 
 def channel_rename_all_videos(videos, commit=True, remove_empty=True):
-    videos_changed = 0
-    for video in videos.exclude(file=""):
-        if video_rename_all_files(video=video, commit=commit, remove_empty=remove_empty):
-            videos_changed += 1
-    return videos_changed
+    videos = videos.exclude(file="").select_related("channel").prefetch_related("extra_files")
+    return len(rename_videos(videos=videos, commit=commit, remove_empty=remove_empty))
 
 
 def channel_rename_all_files(channel, commit=True, remove_empty=True, rename_videos=False):
@@ -147,7 +151,7 @@ def channel_rename_all_files(channel, commit=True, remove_empty=True, rename_vid
     return changed
 
 
-def video_rename_local_file(video, commit=True):
+def video_rename_local_file(video, commit=True, resolution=None):
     """Renames the given Video.file to update its path and filename."""
     if not video.file:
         log.info(f"{video.file=} is empty, cannot rename file that does not exist.")
@@ -157,7 +161,7 @@ def video_rename_local_file(video, commit=True):
 
     ext = video.file.name.rsplit(".", 1)[-1]
 
-    _, new_storage_path = video_services.generate_filepaths_for_storage(video=video, ext=ext)
+    _, new_storage_path = video_services.generate_filepaths_for_storage(video=video, ext=ext, resolution=resolution)
 
     if old_storage_path == new_storage_path:
         log.info(f"{video.pk=} storage paths already match, {video.file.name} does not need renaming.")
@@ -172,7 +176,7 @@ def video_rename_local_file(video, commit=True):
     return True
 
 
-def video_rename_local_info_json(video, commit=True):
+def video_rename_local_info_json(video, commit=True, resolution=None):
     """Renames the given Video.info_json to update its path and filename."""
     if not video.info_json:
         log.info(f"{video.info_json=} is empty, cannot rename info_json that does not exist.")
@@ -181,7 +185,7 @@ def video_rename_local_info_json(video, commit=True):
     old_storage_path = pathlib.PurePosixPath(video.info_json.name)
 
     _, new_storage_path = video_services.generate_filepaths_for_storage(
-        video=video, ext="info.json", upload_to=video_helpers.upload_to_infojson
+        video=video, ext="info.json", upload_to=video_helpers.upload_to_infojson, resolution=resolution
     )
     if old_storage_path == new_storage_path:
         log.info(f"{video.pk=} storage paths already match, {video.info_json.name} does not need renaming.")
@@ -196,7 +200,7 @@ def video_rename_local_info_json(video, commit=True):
     return True
 
 
-def video_rename_thumbnail_file(video, commit=True):
+def video_rename_thumbnail_file(video, commit=True, resolution=None):
     """Renames the given Video.thumbnail to update its path and filename."""
     if not video.thumbnail:
         log.info(f"{video.thumbnail=} is empty, cannot rename thumbnail that does not exist.")
@@ -207,7 +211,7 @@ def video_rename_thumbnail_file(video, commit=True):
     ext = video.thumbnail.name.rsplit(".", 1)[-1]
 
     _, new_storage_path = video_services.generate_filepaths_for_storage(
-        video=video, ext=ext, upload_to=video_helpers.upload_to_thumbnail
+        video=video, ext=ext, upload_to=video_helpers.upload_to_thumbnail, resolution=resolution
     )
     if old_storage_path == new_storage_path:
         log.info(f"{video.pk=} storage paths already match, {video.thumbnail.name} does not need renaming.")
@@ -216,13 +220,14 @@ def video_rename_thumbnail_file(video, commit=True):
     log.debug(f"{old_storage_path=}")
     log.debug(f"{new_storage_path=}")
     video.thumbnail.storage.move(old_storage_path, new_storage_path)
+    image_services.move_variants(video.thumbnail.storage, old_storage_path, new_storage_path)
     video.thumbnail.name = str(new_storage_path)
     if commit:
         video.save()
     return True
 
 
-def video_rename_local_audio(video, commit=True):
+def video_rename_local_audio(video, commit=True, resolution=None):
     """Renames the given Video.audio to update its path and filename."""
     if not video.audio:
         log.info(f"{video.audio=} is empty, cannot rename audio that does not exist.")
@@ -233,7 +238,7 @@ def video_rename_local_audio(video, commit=True):
     ext = video.audio.name.rsplit(".", 1)[-1]
 
     _, new_storage_path = video_services.generate_filepaths_for_storage(
-        video=video, ext=ext, upload_to=video_helpers.upload_to_audio
+        video=video, ext=ext, upload_to=video_helpers.upload_to_audio, resolution=resolution
     )
 
     if old_storage_path == new_storage_path:
@@ -249,13 +254,14 @@ def video_rename_local_audio(video, commit=True):
     return True
 
 
-def video_rename_extra_file(video, extra_file, commit=True):
+def video_rename_extra_file(video, extra_file, commit=True, resolution=None):
 
     old_storage_path = pathlib.Path(extra_file.file.name)
     new_storage_path = pathlib.Path(
         extrafile_helpers.extrafile_file_upload_to(
             instance=extra_file,
             filename=old_storage_path.name,
+            resolution=resolution,
         )
     )
 
@@ -286,18 +292,20 @@ def video_rename_all_files(video, commit=True, remove_empty=True):
         if an_existing_file:
             pre_exising_file_path = an_existing_file.name
 
+    resolution = schema_services.SchemaResolution(video)
+
     changed = []
-    if video_rename_local_file(video=video, commit=commit):
+    if video_rename_local_file(video=video, commit=commit, resolution=resolution):
         changed.append("file")
-    if video_rename_local_audio(video=video, commit=commit):
+    if video_rename_local_audio(video=video, commit=commit, resolution=resolution):
         changed.append("audio")
-    if video_rename_local_info_json(video=video, commit=commit):
+    if video_rename_local_info_json(video=video, commit=commit, resolution=resolution):
         changed.append("info_json")
-    if video_rename_thumbnail_file(video=video, commit=commit):
+    if video_rename_thumbnail_file(video=video, commit=commit, resolution=resolution):
         changed.append("thumbnail")
 
     for extra_file in video.extra_files.all():
-        video_rename_extra_file(video=video, extra_file=extra_file, commit=commit)
+        video_rename_extra_file(video=video, extra_file=extra_file, commit=commit, resolution=resolution)
 
     if changed:
         log.info(f"{changed} were renamed.")
@@ -312,3 +320,166 @@ def video_rename_all_files(video, commit=True, remove_empty=True):
                         raise
 
     return changed
+
+
+VIDEO_FILE_FIELDS = {
+    "file": video_helpers.upload_to_file,
+    "audio": video_helpers.upload_to_audio,
+    "info_json": video_helpers.upload_to_infojson,
+    "thumbnail": video_helpers.upload_to_thumbnail,
+}
+
+
+def _video_field_storage_path(video, field_name, resolution=None):
+    if field_name == "info_json":
+        ext = "info.json"
+    else:
+        ext = getattr(video, field_name).name.rsplit(".", 1)[-1]
+    _, new_storage_path = video_services.generate_filepaths_for_storage(
+        video=video, ext=ext, upload_to=VIDEO_FILE_FIELDS[field_name], resolution=resolution
+    )
+    return pathlib.PurePosixPath(new_storage_path)
+
+
+def plan_video_renames(videos):
+    """Computes every old to new storage path for the files of the supplied videos, nothing is moved.
+
+    Returns (moves, collisions). Each move is (video, instance, field_name, old_path, new_path) where instance
+        is the video itself or one of its extra files.
+    A video with any move landing on a path that is already planned, or on a file that is not moving away,
+        is left out of moves entirely and returned within collisions.
+    """
+
+    moves = []
+    staying_paths = set()
+
+    for video in videos:
+        resolution = schema_services.SchemaResolution(video)
+
+        for field_name in VIDEO_FILE_FIELDS:
+            field = getattr(video, field_name)
+            if not field:
+                continue
+            old_path = pathlib.PurePosixPath(field.name)
+            new_path = _video_field_storage_path(video, field_name, resolution=resolution)
+            if old_path == new_path:
+                staying_paths.add(old_path)
+            else:
+                moves.append((video, video, field_name, old_path, new_path))
+
+        for extra_file in video.extra_files.all():
+            if not extra_file.file:
+                continue
+            old_path = pathlib.PurePosixPath(extra_file.file.name)
+            new_path = pathlib.PurePosixPath(
+                extrafile_helpers.extrafile_file_upload_to(
+                    instance=extra_file, filename=old_path.name, resolution=resolution
+                )
+            )
+            if old_path == new_path:
+                staying_paths.add(old_path)
+            else:
+                moves.append((video, extra_file, "file", old_path, new_path))
+
+    old_paths = {move[3] for move in moves}
+    targets = {}
+    for move in moves:
+        targets.setdefault(move[4], []).append(move)
+
+    colliding_videos = {}
+    for new_path, planned in targets.items():
+        # Moves run in parallel, a target that is also a source could be overwritten before it moves away.
+        if len(planned) > 1 or new_path in staying_paths or new_path in old_paths:
+            for video, *_ in planned:
+                colliding_videos[video.pk] = video
+
+    if colliding_videos:
+        log.warning(f"Rename plan has {len(colliding_videos)} videos with colliding paths, skipping them.")
+        moves = [move for move in moves if move[0].pk not in colliding_videos]
+
+    return moves, list(colliding_videos.values())
+
+
+def _move_file(instance, field_name, old_path, new_path):
+    storage = getattr(instance, field_name).storage
+    if storage.exists(str(new_path)):
+        raise FileExistsError(f"{new_path} already exists")
+    storage.move(old_path, new_path)
+    if field_name == "thumbnail":
+        image_services.move_variants(storage, old_path, new_path)
+
+
+def execute_video_renames(moves, commit=True, remove_empty=True):
+    """Performs the moves of a rename plan with a bounded thread pool.
+
+    Database paths are committed with bulk_update and emptied directories are removed once all moves finished.
+    Returns the primary keys of the videos that had at least one file renamed.
+    """
+
+    for video, instance, field_name, _, _ in moves:
+        if not file_helpers.can_file_be_moved(getattr(instance, field_name)):
+            raise FileStorageBackendHasNoMoveError("video files storage backend has no ability to move")
+
+    changed_video_pks = set()
+    videos = {}
+    extra_files = {}
+    emptied_directories = {}
+
+    with ThreadPoolExecutor(max_workers=app_settings.RENAME_WORKERS) as executor:
+        futures = {executor.submit(_move_file, *move[1:]): move for move in moves}
+
+        for future in as_completed(futures):
+            video, instance, field_name, old_path, new_path = futures[future]
+            videos[video.pk] = video
+
+            try:
+                future.result()
+            except OSError:
+                log.exception(f"Failed to rename {old_path} to {new_path} for {video=}")
+                video.file_not_found = True
+                continue
+
+            field = getattr(instance, field_name)
+            emptied_directories.setdefault(field.storage, set()).add(old_path.parent)
+            field.name = str(new_path)
+
+            changed_video_pks.add(video.pk)
+            if instance is not video:
+                extra_files[instance.pk] = instance
+
+    log.info(f"Renamed the files of {len(changed_video_pks)} videos, {len(moves)} files planned {commit=}")
+
+    if commit and videos:
+        now = timezone.now()
+        for video in videos.values():
+            video.updated = now
+        models.Video.objects.bulk_update(
+            videos.values(),
+            fields=list(VIDEO_FILE_FIELDS) + ["file_not_found", "updated"],
+            batch_size=500,
+        )
+        models.ExtraFile.objects.bulk_update(extra_files.values(), fields=["file"], batch_size=500)
+
+    if remove_empty:
+        for storage, directories in emptied_directories.items():
+            # Deepest directories first so their parents may be empty afterwards.
+            for directory in sorted(directories, key=lambda x: len(x.parts), reverse=True):
+                if directory == pathlib.PurePosixPath():
+                    continue
+                try:
+                    storage.delete(str(directory))
+                except OSError as e:
+                    if "not empty" not in str(e):
+                        log.exception(f"Failure to remove emptied {directory=}")
+
+    return changed_video_pks
+
+
+def rename_videos(videos, commit=True, remove_empty=True):
+    """Plans and executes the renaming of every file belonging to the supplied videos."""
+    moves, collisions = plan_video_renames(videos=videos)
+
+    for video in collisions:
+        log.warning(f"Not renaming files of {video=}, its new paths collide with other files.")
+
+    return execute_video_renames(moves=moves, commit=commit, remove_empty=remove_empty)
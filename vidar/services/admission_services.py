@@ -0,0 +1,232 @@
+import datetime
+import logging
+import pathlib
+import shutil
+from collections import namedtuple
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from vidar import app_settings, models, utils
+from vidar.services import bandwidth_services, cache_services, pacing_services, video_services, ytdlp_services
+
+
+log = logging.getLogger(__name__)
+
+
+Estimate = namedtuple("Estimate", ["bytes", "seconds"])
+
+# timed_bytes are the bytes of the downloads download_ms was measured from, seeded downloads have no timing.
+COUNTERS = ["downloads", "bytes", "timed_bytes", "download_ms"]
+
+
+class DailyUsage(pacing_services.SharedState):
+    """
+    Downloads, bytes and download time of the current day, kept as counters as downloads finish.
+
+    The first use of a day seeds the counters from the videos downloaded so far that day,
+        after which they are only ever incremented.
+    """
+
+    NAME_SPACE = "daily-usage:"
+    TIMEOUT = 2 * 24 * 60 * 60
+
+    def __init__(self, day=None):
+        super().__init__()
+        self.day = day or timezone.localdate()
+
+    def _key(self, suffix):
+        return self._name(f"{self.NAME_SPACE}{self.day.isoformat()}:{suffix}")
+
+    def _seed(self, exclude=None):
+        """
+        Counts the videos downloaded so far today, returns whether it was this call that did so.
+
+        exclude is left out of the count, record counts the video it is called for itself.
+        """
+        if not self._add(self._key("seeded"), 1, self.TIMEOUT):
+            return False
+
+        day_start = timezone.make_aware(datetime.datetime.combine(self.day, datetime.time.min))
+        # Range filter instead of date_downloaded__date so the date_downloaded index is usable.
+        downloaded = models.Video.objects.filter(
+            date_downloaded__gte=day_start, date_downloaded__lt=day_start + timezone.timedelta(days=1)
+        ).exclude(file="")
+        if exclude is not None:
+            downloaded = downloaded.exclude(pk=exclude.pk)
+        totals = downloaded.aggregate(bytes=Sum("file_size"))
+        self._incr(self._key("downloads"), downloaded.count(), self.TIMEOUT)
+        self._incr(self._key("bytes"), totals["bytes"] or 0, self.TIMEOUT)
+        return True
+
+    def counters(self):
+        self._seed()
+        return {counter: int(self._get(self._key(counter), 0)) for counter in COUNTERS}
+
+    def record(self, video=None, downloads=1, downloaded_bytes=0, download_seconds=0):
+        # The video may or may not have its file set yet, it is counted here whichever it is.
+        self._seed(exclude=video)
+        self._incr(self._key("downloads"), downloads, self.TIMEOUT)
+        self._incr(self._key("bytes"), int(downloaded_bytes), self.TIMEOUT)
+        if download_seconds:
+            self._incr(self._key("timed_bytes"), int(downloaded_bytes), self.TIMEOUT)
+            self._incr(self._key("download_ms"), int(download_seconds * 1000), self.TIMEOUT)
+
+
+def free_space():
+    """
+    Returns:
+        dict: {directory: bytes free} of VIDAR_MEDIA_ROOT and VIDAR_MEDIA_CACHE, once per filesystem.
+            Directories that are not local, or do not exist yet, are left out.
+    """
+
+    output = {}
+    devices = set()
+    for directory in [app_settings.MEDIA_CACHE, app_settings.MEDIA_ROOT]:
+        if not directory:
+            continue
+        directory = pathlib.Path(directory)
+        try:
+            device = directory.stat().st_dev
+            usage = shutil.disk_usage(directory)
+        except (OSError, TypeError):
+            continue
+        if device in devices:
+            continue
+        devices.add(device)
+        output[directory] = usage.free
+    return output
+
+
+class DownloadAdmission:
+    """
+    Decides which downloads one run of automated_archiver queues.
+
+    Each candidate is estimated in bytes, from dlp_formats and the quality it would download at,
+        and in seconds, at the throughput measured so far today or else the bandwidth budget.
+        It is admitted while every budget has room for it:
+
+    * VIDAR_AUTOMATED_DOWNLOADS_PER_TASK_LIMIT downloads, halved for long videos.
+        Replaced by the bandwidth budget when VIDAR_BANDWIDTH_LIMIT or VIDAR_BANDWIDTH_SCHEDULE is set,
+        see bandwidth_services.
+    * VIDAR_AUTOMATED_DOWNLOADS_DAILY_LIMIT downloads and VIDAR_AUTOMATED_DOWNLOADS_DAILY_BYTES bytes a day.
+    * VIDAR_AUTOMATED_DOWNLOADS_PER_TASK_BYTES bytes and VIDAR_AUTOMATED_DOWNLOADS_PER_TASK_SECONDS seconds.
+    * VIDAR_AUTOMATED_DOWNLOADS_FREE_SPACE bytes left free on VIDAR_MEDIA_ROOT and VIDAR_MEDIA_CACHE.
+    * VIDAR_MEDIA_CACHE_QUOTA bytes held in VIDAR_MEDIA_CACHE, see cache_services.
+
+    The first download is admitted while anything remains of the budgets so a video larger than them still downloads,
+        free space is the exception.
+    """
+
+    def __init__(self, usage=None):
+        self.usage = usage or DailyUsage()
+        counters = self.usage.counters()
+
+        self.limit = app_settings.AUTOMATED_DOWNLOADS_PER_TASK_LIMIT
+        self.admitted = 0
+        self.unknown_size = None
+        self._estimates = {}
+
+        self.daily_downloads = None
+        if daily_limit := app_settings.AUTOMATED_DOWNLOADS_DAILY_LIMIT:
+            self.daily_downloads = daily_limit - counters["downloads"]
+
+        # {name: bytes remaining}
+        self.budgets = {}
+        self.free_space = {}
+
+        if task_bytes := app_settings.AUTOMATED_DOWNLOADS_PER_TASK_BYTES:
+            self.budgets["task"] = task_bytes
+        if daily_bytes := app_settings.AUTOMATED_DOWNLOADS_DAILY_BYTES:
+            self.budgets["daily"] = daily_bytes - counters["bytes"]
+        if cache_quota := app_settings.MEDIA_CACHE_QUOTA:
+            self.budgets["cache"] = cache_quota - cache_services.usage()
+
+        self.bandwidth = bandwidth_services.get_limit()
+        if self.bandwidth:
+            window = app_settings.BANDWIDTH_ADMISSION_WINDOW
+            self.budgets["bandwidth"] = bandwidth_services.BandwidthBudget().available_bytes(
+                window=window, limit=self.bandwidth
+            )
+            self.unknown_size = self.bandwidth * window // max(self.limit, 1)
+        elif counters["downloads"] and counters["bytes"]:
+            self.unknown_size = counters["bytes"] // counters["downloads"]
+
+        if headroom := app_settings.AUTOMATED_DOWNLOADS_FREE_SPACE:
+            self.free_space = {directory: free - headroom for directory, free in free_space().items()}
+
+        self.seconds = app_settings.AUTOMATED_DOWNLOADS_PER_TASK_SECONDS or None
+
+        self.throughput = self.bandwidth or None
+        if counters["download_ms"] and counters["timed_bytes"]:
+            self.throughput = counters["timed_bytes"] / (counters["download_ms"] / 1000)
+
+    @property
+    def is_full(self):
+        if not self.bandwidth and self.admitted >= self.limit:
+            return True
+        if self.daily_downloads is not None and self.daily_downloads <= 0:
+            return True
+        if self.seconds is not None and self.seconds <= 0:
+            return True
+        return any(x <= 0 for x in [*self.budgets.values(), *self.free_space.values()])
+
+    @property
+    def estimating(self):
+        """Without byte, time or free space budgets only the number of downloads is limited."""
+        return bool(self.budgets or self.free_space or self.seconds is not None)
+
+    def estimate(self, video):
+        if video.pk not in self._estimates:
+            quality = video_services.quality_to_download(video=video)
+            expected_bytes = (
+                ytdlp_services.estimate_download_size(video.dlp_formats, quality=quality, duration=video.duration)
+                or self.unknown_size
+                or 0
+            )
+            expected_seconds = 0
+            if self.throughput:
+                expected_seconds = expected_bytes / self.throughput
+            self._estimates[video.pk] = Estimate(bytes=expected_bytes, seconds=expected_seconds)
+        return self._estimates[video.pk]
+
+    def admits(self, video):
+        """Whether video fits in what remains of the budgets."""
+        if self.is_full:
+            return False
+
+        if not self.estimating:
+            return True
+
+        estimate = self.estimate(video)
+
+        if any(estimate.bytes > x for x in self.free_space.values()):
+            log.info(f"Not enough free space to download {video=}, expected {estimate.bytes} bytes.")
+            return False
+
+        if not self.admitted:
+            return True
+
+        if self.seconds is not None and estimate.seconds > self.seconds:
+            return False
+        return all(estimate.bytes <= x for x in self.budgets.values())
+
+    def admit(self, video):
+        self.admitted += 1
+
+        if self.daily_downloads is not None:
+            self.daily_downloads -= 1
+
+        if not self.bandwidth and utils.should_halve_download_limit(duration=video.duration):
+            self.limit //= 2
+
+        if not self.estimating:
+            return
+
+        estimate = self.estimate(video)
+        if self.seconds is not None:
+            self.seconds -= estimate.seconds
+        for name in self.budgets:
+            self.budgets[name] -= estimate.bytes
+        for directory in self.free_space:
+            self.free_space[directory] -= estimate.bytes
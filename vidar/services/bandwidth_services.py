@@ -0,0 +1,180 @@
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from vidar import app_settings
+from vidar.services import pacing_services, ytdlp_services
+
+
+log = logging.getLogger(__name__)
+
+
+def get_limit(now=None):
+    """The bandwidth budget in effect at now, in bytes per second. 0 when bandwidth is not coordinated."""
+
+    limit = app_settings.BANDWIDTH_LIMIT
+
+    if schedule := app_settings.BANDWIDTH_SCHEDULE:
+        current = (now or timezone.localtime()).strftime("%H:%M")
+        starts = sorted(schedule)
+        # Before the first start of the day the last one is still in effect from yesterday.
+        start = max((x for x in starts if x <= current), default=starts[-1])
+        limit = int(schedule[start])
+
+    return limit * 1024
+
+
+class BandwidthBudget(pacing_services.SharedState):
+    """The downloads currently sharing the bandwidth budget, across every worker.
+
+    Each download holds a lease which it renews as it progresses, along with the bytes it still expects to download.
+        Leases of downloads that stopped reporting expire after VIDAR_BANDWIDTH_LEASE_SECONDS.
+
+    Leases are a sorted set in redis. The django cache fallback is not atomic between workers.
+    """
+
+    NAME_SPACE = "bandwidth:leases"
+
+    def __init__(self):
+        super().__init__()
+        self.key = self._name(self.NAME_SPACE)
+
+    def _remaining_key(self, lease_id):
+        return f"{self.key}:{lease_id}:remaining"
+
+    def leases(self):
+        """Returns {lease id: bytes still expected} of the active leases."""
+        now = time.time()
+
+        if self._redis:
+            self._redis.execute_command("ZREMRANGEBYSCORE", self.key, "-inf", now)
+            lease_ids = [
+                x.decode("utf8") if isinstance(x, bytes) else x
+                for x in self._redis.execute_command("ZRANGE", self.key, 0, -1) or []
+            ]
+            if not lease_ids:
+                return {}
+            remaining = self._redis.execute_command("MGET", *[self._remaining_key(x) for x in lease_ids])
+            return {lease_id: int(x or 0) for lease_id, x in zip(lease_ids, remaining)}
+
+        return {k: v for k, (expires, v) in cache.get(self.key, {}).items() if expires > now}
+
+    def renew(self, lease_id, remaining=0):
+        timeout = app_settings.BANDWIDTH_LEASE_SECONDS
+        expires = time.time() + timeout
+
+        if self._redis:
+            self._redis.execute_command("ZADD", self.key, expires, lease_id)
+            self._redis.execute_command("EXPIRE", self.key, timeout)
+            self._set(self._remaining_key(lease_id), int(remaining), timeout)
+            return
+
+        leases = {k: v for k, v in cache.get(self.key, {}).items() if v[0] > time.time()}
+        leases[lease_id] = (expires, int(remaining))
+        cache.set(self.key, leases, timeout)
+
+    def release(self, lease_id):
+        if self._redis:
+            self._redis.execute_command("ZREM", self.key, lease_id)
+            self._delete(self._remaining_key(lease_id))
+            return
+
+        leases = cache.get(self.key, {})
+        if leases.pop(lease_id, None):
+            cache.set(self.key, leases, app_settings.BANDWIDTH_LEASE_SECONDS)
+
+    def share(self, limit=None):
+        """The rate, in bytes per second, of each running download."""
+        if limit is None:
+            limit = get_limit()
+        if not limit:
+            return 0
+        return max(limit // max(len(self.leases()), 1), 1)
+
+    def available_bytes(self, window, limit=None):
+        """Bytes the budget can take on within window seconds, after the downloads still running."""
+        if limit is None:
+            limit = get_limit()
+        return limit * window - sum(self.leases().values())
+
+
+class BandwidthLease:
+    """
+    The share of the bandwidth budget held by one download, also a yt-dlp progress hook.
+
+    As the download progresses the lease is renewed and the rate limit of the download follows its share,
+        taking effect straight away on direct downloads and from the next format on fragmented ones.
+
+    yt-dlp rate limits each connection of a fragmented download separately, so the share is split between
+        the connections. Direct downloads use a single connection and receive the whole share once they start.
+    """
+
+    RENEW_INTERVAL = 10
+
+    def __init__(self, expected_bytes=None, rate_limit=None, budget=None, connections=1):
+        self.id = uuid.uuid4().hex
+        self.expected_bytes = expected_bytes or 0
+        # The rate limit the download would have had anyway, the share never exceeds it.
+        self.rate_limit = rate_limit
+        self.connections = max(connections or 1, 1)
+        self.budget = budget or BandwidthBudget()
+        self.params = None
+        self._downloaded = {}
+        self._renewed = 0
+
+    def __repr__(self):
+        return f"<BandwidthLease: {self.id}>"
+
+    @property
+    def remaining_bytes(self):
+        return max(self.expected_bytes - sum(self._downloaded.values()), 0)
+
+    def ratelimit(self, connections=None):
+        share = self.budget.share() // (connections or self.connections)
+        if share and self.rate_limit:
+            return min(share, self.rate_limit)
+        return share or self.rate_limit
+
+    def acquire(self):
+        """Takes a share of the budget, returning the rate limit the download starts with."""
+        self.budget.renew(self.id, remaining=self.expected_bytes)
+        self._renewed = time.monotonic()
+        ratelimit = self.ratelimit()
+        log.info(f"{self!r} acquired, {ratelimit=} bytes/s.")
+        return ratelimit
+
+    def attach(self, params):
+        """Supplied the params of the YoutubeDL instance downloading, its rate limit is updated in place."""
+        self.params = params
+
+    def __call__(self, d):
+        if d.get("status") not in ("downloading", "finished"):
+            return
+
+        if filename := d.get("filename"):
+            self._downloaded[filename] = d.get("downloaded_bytes") or 0
+
+        if time.monotonic() - self._renewed < self.RENEW_INTERVAL:
+            return
+
+        self._renewed = time.monotonic()
+        self.budget.renew(self.id, remaining=self.remaining_bytes)
+
+        if self.params is not None:
+            self.params["ratelimit"] = self.ratelimit(connections=self.connections if d.get("fragment_count") else 1)
+
+    def release(self):
+        self.budget.release(self.id)
+
+
+def lease_for(video, quality=None, rate_limit=None, connections=1):
+    """A lease for downloading video, None when VIDAR_BANDWIDTH_LIMIT and VIDAR_BANDWIDTH_SCHEDULE are unset."""
+
+    if not app_settings.BANDWIDTH_LIMIT and not app_settings.BANDWIDTH_SCHEDULE:
+        return
+
+    expected_bytes = ytdlp_services.estimate_download_size(video.dlp_formats, quality=quality, duration=video.duration)
+    return BandwidthLease(expected_bytes=expected_bytes, rate_limit=rate_limit, connections=connections)
@@ -0,0 +1,138 @@
+import datetime
+import logging
+import random
+import time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from vidar.helpers import channel_helpers
+from vidar.models import Channel, Video
+
+
+log = logging.getLogger(__name__)
+
+SYNTHETIC_CHANNEL_PREFIX = "synthetic-channel-"
+SYNTHETIC_VIDEO_PREFIX = "synthetic-video-"
+
+
+def generate_library(channels=10, videos_per_channel=100, seed=0, payload=None):
+    """Bulk create a synthetic library of channels and videos.
+
+    Rows are spread across the values the hot queries filter on (downloaded or not, privacy status,
+    last privacy check, system notes) so query plans resemble a real library.
+
+    payload is an optional yt-dlp video response used as the template for every video's details,
+    giving each row realistic field sizes such as dlp_formats.
+    """
+
+    rand = random.Random(seed)
+    now = timezone.now()
+
+    channel_objs = Channel.objects.bulk_create(
+        [
+            Channel(
+                provider_object_id=f"{SYNTHETIC_CHANNEL_PREFIX}{seed}-{index}",
+                name=f"Synthetic Channel {index}",
+                slug=f"synthetic-channel-{index}",
+                status=channel_helpers.ChannelStatuses.ACTIVE,
+            )
+            for index in range(channels)
+        ]
+    )
+
+    statuses = [choice for choice, _ in Video.VideoPrivacyStatuses.choices]
+
+    video_objs = []
+    for channel in channel_objs:
+        for index in range(videos_per_channel):
+            provider_object_id = f"{SYNTHETIC_VIDEO_PREFIX}{channel.pk}-{index}"
+
+            video = Video(
+                channel=channel,
+                channel_provider_object_id=channel.provider_object_id,
+                provider_object_id=provider_object_id,
+            )
+
+            if payload:
+                video.set_details_from_yt_dlp_response(
+                    dict(payload, id=provider_object_id, channel_id=channel.provider_object_id)
+                )
+
+            inserted = now - timezone.timedelta(days=rand.randint(0, 1000))
+            downloaded = rand.random() < 0.7
+
+            video.title = f"Synthetic Video {index}"
+            video.inserted = inserted
+            video.updated = inserted
+            video.upload_date = inserted.date()
+            video.file = f"synthetic/{channel.pk}/{index}.mp4" if downloaded else ""
+            video.date_downloaded = inserted if downloaded else None
+            video.duration = rand.randint(30, 7200)
+            video.privacy_status = rand.choices(statuses, weights=[90] + [1] * (len(statuses) - 1))[0]
+            video.sort_ordering = index + 1
+
+            if rand.random() < 0.8:
+                video.last_privacy_status_check = now - timezone.timedelta(days=rand.randint(0, 90))
+            else:
+                video.last_privacy_status_check = None
+
+            if rand.random() < 0.01:
+                video.system_notes["video_was_live_at_last_attempt"] = True
+
+            video_objs.append(video)
+
+    Video.objects.bulk_create(video_objs, batch_size=1000)
+
+    return channel_objs
+
+
+def get_hot_querysets():
+    """Querysets mirroring the filters used by the scheduled tasks and busiest views."""
+
+    channel = Channel.objects.order_by("pk").first()
+    video = Video.objects.order_by("pk").last()
+    thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
+    today_start = timezone.make_aware(datetime.datetime.combine(timezone.localdate(), datetime.time.min))
+
+    return {
+        "video by provider_object_id": Video.objects.filter(
+            provider_object_id=video.provider_object_id if video else ""
+        ),
+        "channel last sort_ordering": Video.objects.filter(channel=channel).order_by("sort_ordering").reverse()[:1],
+        "videos not downloaded": Video.objects.filter(
+            file="", privacy_status__in=Video.VideoPrivacyStatuses_Publicly_Visible
+        ).order_by("upload_date"),
+        "downloaded today": Video.objects.filter(
+            date_downloaded__gte=today_start, date_downloaded__lt=today_start + timezone.timedelta(days=1)
+        ).exclude(file=""),
+        "privacy status check due": Video.objects.exclude(file="").filter(
+            Q(last_privacy_status_check__lt=thirty_days_ago) | Q(last_privacy_status_check__isnull=True),
+            privacy_status__in=Video.VideoPrivacyStatuses_Publicly_Visible,
+        ),
+        "videos live at last attempt": Video.objects.filter(
+            system_notes__video_was_live_at_last_attempt=True,
+            inserted__lte=timezone.now() - timezone.timedelta(hours=6),
+        ),
+    }
+
+
+def explain_querysets(querysets, analyze=False):
+    """Evaluate each queryset and return its duration in milliseconds alongside its query plan."""
+
+    output = []
+
+    for name, qs in querysets.items():
+        start = time.perf_counter()
+        list(qs)
+        duration = (time.perf_counter() - start) * 1000
+
+        try:
+            plan = qs.explain(analyze=True) if analyze else qs.explain()
+        except ValueError:
+            # The database backend does not support EXPLAIN options, such as ANALYZE on SQLite.
+            plan = qs.explain()
+
+        output.append((name, duration, plan))
+
+    return sorted(output, key=lambda x: x[1], reverse=True)
@@ -0,0 +1,198 @@
+import logging
+import os
+import pathlib
+import time
+from collections import namedtuple
+
+from django.utils import timezone
+
+from vidar import app_settings, models
+from vidar.helpers import celery_helpers
+
+
+log = logging.getLogger(__name__)
+
+
+CacheFile = namedtuple("CacheFile", ["path", "size", "modified", "last_used", "owner"])
+
+# Files written to within this many seconds are in use regardless of their owner.
+IN_USE_SECONDS = 10 * 60
+
+
+def download_stem(video, quality, cache_folder=None):
+    """The name yt-dlp writes the files of a download under, see ytdlp_services.get_video_downloader_args."""
+    cache_folder = pathlib.Path(cache_folder or app_settings.MEDIA_CACHE)
+    return cache_folder / f"{video.provider_object_id}_{quality}"
+
+
+def track(path, stage, video=None):
+    """Records a file, or for downloads the name its files share, as created within MEDIA_CACHE."""
+    entry, _ = models.CachedFile.objects.update_or_create(
+        path=str(path),
+        defaults={"stage": stage, "video": video, "last_used": timezone.now()},
+    )
+    return entry
+
+
+def forget(path):
+    models.CachedFile.objects.filter(path=str(path)).delete()
+
+
+def _owner_names(name):
+    """abc_1080.f137.mp4.part is owned by an entry of abc_1080.f137.mp4.part, abc_1080.f137.mp4, ... or abc_1080."""
+    names = [name]
+    while "." in name:
+        name = name.rsplit(".", 1)[0]
+        names.append(name)
+    return names
+
+
+def scan(entries=None):
+    """
+    Returns:
+        list: CacheFile of every file within MEDIA_CACHE, with the CachedFile owning it or None for orphans.
+    """
+
+    cache_folder = pathlib.Path(app_settings.MEDIA_CACHE)
+
+    if entries is None:
+        entries = models.CachedFile.objects.select_related("video")
+    by_name = {pathlib.Path(x.path).name: x for x in entries if pathlib.Path(x.path).parent == cache_folder}
+
+    output = []
+    try:
+        dir_entries = list(os.scandir(cache_folder))
+    except FileNotFoundError:
+        return output
+
+    for dir_entry in dir_entries:
+        try:
+            if not dir_entry.is_file():
+                continue
+            stat = dir_entry.stat()
+        except FileNotFoundError:
+            continue
+
+        owner = next((by_name[x] for x in _owner_names(dir_entry.name) if x in by_name), None)
+
+        last_used = stat.st_mtime
+        if owner:
+            last_used = max(last_used, owner.last_used.timestamp())
+
+        output.append(
+            CacheFile(
+                path=pathlib.Path(dir_entry.path),
+                size=stat.st_size,
+                modified=stat.st_mtime,
+                last_used=last_used,
+                owner=owner,
+            )
+        )
+
+    return output
+
+
+def usage():
+    """Bytes held within MEDIA_CACHE."""
+    return sum(x.size for x in scan())
+
+
+def partial_bytes(stem):
+    """Bytes already downloaded into .part files under stem, which yt-dlp resumes from."""
+    return sum(x.size for x in scan() if x.path.name.startswith(f"{stem.name}.") and x.path.name.endswith(".part"))
+
+
+def _delete(files):
+    freed = 0
+    for x in files:
+        try:
+            x.path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError:
+            log.exception(f"Failure to delete cached file {x.path}")
+            continue
+        freed += x.size
+    return freed
+
+
+def release(video, stage=models.CachedFile.Stages.DOWNLOAD):
+    """
+    Deletes what is left in MEDIA_CACHE of the finished stage of video, such as the info.json of a download.
+        With VIDAR_DELETE_DOWNLOAD_CACHE=False the files are kept until they age out.
+    """
+
+    entries = list(video.cached_files.filter(stage=stage))
+    if not entries:
+        return 0
+
+    freed = 0
+    if app_settings.DELETE_DOWNLOAD_CACHE:
+        freed = _delete([x for x in scan(entries=entries) if x.owner])
+
+    models.CachedFile.objects.filter(pk__in=[x.pk for x in entries]).delete()
+
+    return freed
+
+
+def collect_garbage(dry_run=False):
+    """
+    Deletes files within MEDIA_CACHE older than VIDAR_MEDIA_CACHE_MAX_AGE, then the least recently used files
+        while it holds more than VIDAR_MEDIA_CACHE_QUOTA.
+
+    Files of videos locked by a running download or processing, and files recently written to, are never deleted,
+        so partial downloads waiting on a retry are kept until they age out and are resumed by it.
+
+    Returns:
+        dict: deleted files, bytes freed and the bytes MEDIA_CACHE holds afterwards.
+    """
+
+    now = time.time()
+    max_age = app_settings.MEDIA_CACHE_MAX_AGE
+    quota = app_settings.MEDIA_CACHE_QUOTA
+
+    entries = list(models.CachedFile.objects.select_related("video"))
+    active = {x.pk for x in entries if x.video and celery_helpers.is_object_locked(obj=x.video)}
+
+    files = scan(entries=entries)
+
+    def in_use(x):
+        return (x.owner and x.owner.pk in active) or now - x.modified < IN_USE_SECONDS
+
+    deletable = sorted([x for x in files if not in_use(x)], key=lambda x: x.last_used)
+
+    expired = [x for x in deletable if max_age and now - x.last_used > max_age]
+
+    total = sum(x.size for x in files) - sum(x.size for x in expired)
+    over_quota = []
+    if quota and total > quota:
+        for x in deletable:
+            if total <= quota:
+                break
+            if x in expired:
+                continue
+            over_quota.append(x)
+            total -= x.size
+        if total > quota:
+            log.warning(f"MEDIA_CACHE holds {total} bytes in use, over its quota of {quota} bytes.")
+
+    deleted = expired + over_quota
+
+    output = {"deleted": [str(x.path) for x in deleted], "freed": sum(x.size for x in deleted), "usage": total}
+
+    if dry_run:
+        return output
+
+    output["freed"] = _delete(deleted)
+
+    # Entries whose files are all gone, that no running download is about to write to.
+    remaining = {x.owner.pk for x in files if x.owner and x not in deleted}
+    models.CachedFile.objects.filter(
+        pk__in=[x.pk for x in entries if x.pk not in remaining and x.pk not in active],
+        last_used__lt=timezone.now() - timezone.timedelta(seconds=IN_USE_SECONDS),
+    ).delete()
+
+    if deleted:
+        log.info(f"Deleted {len(deleted)} files from MEDIA_CACHE, freeing {output['freed']} bytes.")
+
+    return output
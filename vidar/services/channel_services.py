@@ -1,7 +1,6 @@
 import logging
 import pathlib
 
-from django.core.files.base import ContentFile
 from django.utils import timezone
 
 from vidar import app_settings, exceptions, storages
@@ -12,24 +11,56 @@ from vidar.services import image_services, notification_services, schema_service
 log = logging.getLogger(__name__)
 
 
-def set_thumbnail(channel, url, save=True):
+def _image_or_download(url, image):
+    if image is None:
+        return image_services.download_and_convert_to_jpg(url)
+    return image.contents, image.ext
+
+
+def set_thumbnail(channel, url, save=True, image=None):
     log.debug(f"Setting thumbnail with {url}")
-    contents, final_ext = image_services.download_and_convert_to_jpg(url)
+    contents, final_ext = _image_or_download(url=url, image=image)
     directory_name = schema_services.channel_directory_name(channel=channel)
     final_filename = f"{directory_name}.{final_ext}"
-    channel.thumbnail.save(final_filename, ContentFile(contents), save=save)
+    channel.thumbnail.save(final_filename, image_services.as_file(contents), save=save)
+    image_services.refresh_variants(channel.thumbnail, contents=contents)
 
 
-def set_banner(channel, url, save=True):
+def set_banner(channel, url, save=True, image=None):
     log.debug(f"Setting banner with {url}")
-    contents, final_ext = image_services.download_and_convert_to_jpg(url)
-    channel.banner.save("banner.jpg", ContentFile(contents), save=save)
+    contents, final_ext = _image_or_download(url=url, image=image)
+    channel.banner.save("banner.jpg", image_services.as_file(contents), save=save)
+    image_services.refresh_variants(channel.banner, contents=contents)
 
 
-def set_tvart(channel, url, save=True):
+def set_tvart(channel, url, save=True, image=None):
     log.debug(f"Setting tvart with {url}")
-    contents, final_ext = image_services.download_and_convert_to_jpg(url)
-    channel.tvart.save("tvart.jpg", ContentFile(contents), save=save)
+    contents, final_ext = _image_or_download(url=url, image=image)
+    channel.tvart.save("tvart.jpg", image_services.as_file(contents), save=save)
+    image_services.refresh_variants(channel.tvart, contents=contents)
+
+
+def set_channel_images(channel, thumbnail_url=None, banner_url=None, tvart_url=None):
+    """Fetches the channel images concurrently. Images unchanged since they were last fetched are not saved again."""
+
+    images = image_services.fetch_many([thumbnail_url, banner_url, tvart_url], conditional=True)
+
+    for url, field, setter in [
+        (thumbnail_url, channel.thumbnail, set_thumbnail),
+        (banner_url, channel.banner, set_banner),
+        (tvart_url, channel.tvart, set_tvart),
+    ]:
+        if not url:
+            continue
+
+        image = images.get(url)
+        if image and image.not_modified:
+            if field:
+                log.debug(f"{url=} has not changed, keeping {field.name=}")
+                continue
+            image = None
+
+        setter(channel=channel, url=url, image=image)
 
 
 def generate_filepaths_for_storage(channel, field, filename, upload_to):
@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import mmap
+import os
+import pathlib
+
+from django.db.models import Count, Q
+
+from vidar import app_settings, exceptions, models
+from vidar.helpers import file_helpers
+
+
+log = logging.getLogger(__name__)
+
+
+READ_SIZE = 8 * 1024 * 1024
+
+# Stored as the file_hash of files that cannot be hashed, such as missing or remote files, so they are not
+#   queued again on every run. Cleared along with file_hash whenever the file changes.
+UNHASHABLE = "unhashable"
+
+
+def hash_file(path, read_size=READ_SIZE):
+    """BLAKE2b digest of a file, read through a memory map in fixed size slices."""
+    hasher = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as fo:
+        size = os.fstat(fo.fileno()).st_size
+        if size:
+            with mmap.mmap(fo.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for start in range(0, size, read_size):
+                    end = start + read_size
+                    hasher.update(view[start:end])
+    return hasher.hexdigest()
+
+
+def _hash_field(field):
+    if not field:
+        return ""
+    if not file_helpers.is_field_using_local_storage(field):
+        return UNHASHABLE
+    try:
+        return hash_file(field.path)
+    except (OSError, NotImplementedError):
+        log.exception(f"Failure to hash {field.name=}")
+        return UNHASHABLE
+
+
+def get_unhashed_videos():
+    """Archived videos missing the hash of their file or of one of their extra files."""
+    return (
+        models.Video.objects.exclude(file="")
+        .filter(Q(file_hash="") | Q(extra_files__file_hash="", extra_files__isnull=False))
+        .distinct()
+        .order_by("pk")
+    )
+
+
+def hash_videos(pks):
+    """
+    Hashes every unhashed file of the supplied videos, files that cannot be hashed are marked UNHASHABLE.
+
+    Returns:
+        int: how many files were hashed.
+    """
+
+    videos = models.Video.objects.filter(pk__in=pks).exclude(file="").prefetch_related("extra_files")
+
+    hashed_videos = []
+    hashed_extra_files = []
+    for video in videos:
+        if not video.file_hash and (file_hash := _hash_field(video.file)):
+            video.file_hash = file_hash
+            hashed_videos.append(video)
+
+        for extra_file in video.extra_files.all():
+            if not extra_file.file_hash and (file_hash := _hash_field(extra_file.file)):
+                extra_file.file_hash = file_hash
+                hashed_extra_files.append(extra_file)
+
+    models.Video.objects.bulk_update(hashed_videos, fields=["file_hash"], batch_size=500)
+    models.ExtraFile.objects.bulk_update(hashed_extra_files, fields=["file_hash"], batch_size=500)
+
+    return len([x for x in hashed_videos + hashed_extra_files if x.file_hash != UNHASHABLE])
+
+
+def _duplicated_hashes():
+    video_hashes = models.Video.objects.exclude(file="").exclude(file_hash__in=["", UNHASHABLE])
+    extra_file_hashes = models.ExtraFile.objects.exclude(file="").exclude(file_hash__in=["", UNHASHABLE])
+
+    hashes = set()
+    for qs in [video_hashes, extra_file_hashes]:
+        hashes.update(
+            qs.values("file_hash").annotate(total=Count("pk")).filter(total__gt=1).values_list("file_hash", flat=True)
+        )
+    hashes.update(
+        video_hashes.filter(file_hash__in=extra_file_hashes.values("file_hash")).values_list("file_hash", flat=True)
+    )
+    return hashes
+
+
+def find_duplicates():
+    """
+    Groups of stored files sharing the same content, across Video.file and ExtraFile.file.
+
+    Returns:
+        dict: {file_hash: [FieldFile, ...]} with the files of the oldest video first.
+    """
+
+    hashes = _duplicated_hashes()
+
+    groups = {}
+    for video in models.Video.objects.filter(file_hash__in=hashes).exclude(file="").order_by("pk"):
+        groups.setdefault(video.file_hash, []).append(video.file)
+    for extra_file in (
+        models.ExtraFile.objects.filter(file_hash__in=hashes).exclude(file="").select_related("video").order_by("pk")
+    ):
+        groups.setdefault(extra_file.file_hash, []).append(extra_file.file)
+
+    return groups
+
+
+def hardlink_duplicates(groups=None, commit=False):
+    """
+    Replaces every duplicate with a hardlink to the first file of its group, reclaiming its space.
+
+    Files on remote storage, on another device or already sharing the inode are left alone.
+        Requires VIDAR_MEDIA_HARDLINK, nothing is changed unless commit=True.
+
+    Returns:
+        list: {"kept": name, "linked": name, "size": bytes reclaimed}
+    """
+
+    if commit and not app_settings.MEDIA_HARDLINK:
+        raise exceptions.MediaHardlinkDisabledError("VIDAR_MEDIA_HARDLINK must be enabled to hardlink duplicates.")
+
+    if groups is None:
+        groups = find_duplicates()
+
+    report = []
+    for file_hash, files in groups.items():
+        files = [x for x in files if file_helpers.is_field_using_local_storage(x)]
+        if len(files) < 2:
+            continue
+
+        keeper = files[0]
+        keeper_path = pathlib.Path(keeper.path)
+        try:
+            keeper_stat = keeper_path.stat()
+        except FileNotFoundError:
+            log.warning(f"Cannot dedupe {file_hash=}, {keeper.name=} does not exist.")
+            continue
+
+        for duplicate in files[1:]:
+            duplicate_path = pathlib.Path(duplicate.path)
+            try:
+                duplicate_stat = duplicate_path.stat()
+            except FileNotFoundError:
+                continue
+
+            if duplicate_stat.st_dev != keeper_stat.st_dev:
+                log.info(f"Cannot hardlink {duplicate.name=} to {keeper.name=}, they are on different devices.")
+                continue
+            if duplicate_stat.st_ino == keeper_stat.st_ino:
+                continue
+            if duplicate_stat.st_size != keeper_stat.st_size:
+                log.warning(f"Not deduping {duplicate.name=}, its size differs from {keeper.name=}. Stale hash?")
+                continue
+
+            if commit:
+                temporary_path = duplicate_path.with_name(f".{duplicate_path.name}.vidar-dedupe")
+                temporary_path.unlink(missing_ok=True)
+                temporary_path.hardlink_to(keeper_path)
+                os.replace(temporary_path, duplicate_path)
+                log.info(f"Hardlinked {duplicate.name=} to {keeper.name=}")
+
+            report.append({"kept": keeper.name, "linked": duplicate.name, "size": duplicate_stat.st_size})
+
+    return report
@@ -0,0 +1,152 @@
+import json
+import logging
+import requests
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.cache import cache
+from django.db import connection
+
+import yt_dlp
+
+from vidar import app_settings, interactor
+from vidar.services import pacing_services
+
+
+log = logging.getLogger(__name__)
+
+
+# Extractions holding the full details of a video, such as its formats.
+FULL = "full"
+
+# Keys of the info dict that describe a download by this worker rather than the video.
+DOWNLOAD_KEYS = ["requested_downloads", "requested_formats", "filepath", "_filename", "filename"]
+
+
+class ExtractionCache(pacing_services.SharedState):
+    """
+    Recent yt-dlp extractions of videos, keyed by provider id and extractor mode and stored compressed.
+
+    Extractions expire after VIDAR_EXTRACTION_CACHE_SECONDS, the cache is disabled when it is 0.
+        Kept in redis, or the django cache which may be file based to keep them on disk.
+    """
+
+    NAME_SPACE = "extraction:"
+
+    def _key(self, provider_object_id, mode):
+        return self._name(f"{self.NAME_SPACE}{mode}:{provider_object_id}")
+
+    def get(self, provider_object_id, mode=FULL):
+        key = self._key(provider_object_id, mode)
+        if self._redis:
+            value = self._redis.execute_command("GET", key)
+        else:
+            value = cache.get(key)
+        if not value:
+            return
+        try:
+            return json.loads(zlib.decompress(value))
+        except (zlib.error, ValueError):
+            log.exception(f"Failure to load cached extraction {key=}")
+
+    def set(self, provider_object_id, info, mode=FULL):
+        timeout = app_settings.EXTRACTION_CACHE_SECONDS
+        info = {k: v for k, v in info.items() if k not in DOWNLOAD_KEYS and not k.startswith("__")}
+        value = zlib.compress(json.dumps(info, default=str).encode())
+        self._set(self._key(provider_object_id, mode), value, timeout)
+        return value
+
+    def delete(self, provider_object_id, mode=FULL):
+        self._delete(self._key(provider_object_id, mode))
+
+
+def store(info, mode=FULL):
+    """Caches info when it is the full extraction of a single video, flat listing entries have no formats."""
+
+    if not app_settings.EXTRACTION_CACHE_SECONDS:
+        return
+
+    if not isinstance(info, dict) or not info.get("id") or not info.get("formats"):
+        return
+
+    ExtractionCache().set(info["id"], info, mode=mode)
+
+
+def cached_video_details(video):
+    """The reusable extraction of video, None when there is none or the extraction cache is disabled."""
+
+    if app_settings.EXTRACTION_CACHE_SECONDS and video.provider_object_id:
+        if info := ExtractionCache().get(video.provider_object_id):
+            log.info(f"Reusing cached extraction of {video=}")
+            return info
+
+
+def video_details(video, cached=True, **kwargs):
+    """
+    interactor.video_details of video, reusing a recent extraction unless cached is False.
+
+    A reused extraction downloaded nothing, it has no requested_downloads even when writeinfojson is supplied.
+    """
+
+    if cached and (info := cached_video_details(video)):
+        return info
+
+    info = interactor.video_details(video.url, instance=video, **kwargs)
+
+    store(info)
+
+    return info
+
+
+def _video_details_in_thread(video, start_at, pacer, **kwargs):
+    try:
+        if (delay := start_at - time.monotonic()) > 0:
+            time.sleep(delay)
+        pacer.consume()
+        return video_details(video, cached=False, **kwargs)
+    finally:
+        # A connection opened by an initializer within a pool thread would otherwise be left open.
+        connection.close()
+
+
+def video_details_many(videos, cached=True, **kwargs):
+    """
+    video_details of many videos, VIDAR_EXTRACTION_WORKERS at a time.
+
+    Extractions are paced and counted as update_video_details is, each one starting its countdown after the
+        start of the previous one.
+
+    Returns:
+        dict: {video: info} of every video extracted successfully, failures are logged.
+    """
+
+    output = {}
+    pending = []
+    for video in videos:
+        if cached and (info := cached_video_details(video)):
+            output[video] = info
+        else:
+            pending.append(video)
+
+    if not pending:
+        return output
+
+    pacer = pacing_services.video_details_pacer()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=min(len(pending), app_settings.EXTRACTION_WORKERS)) as executor:
+        futures = {
+            executor.submit(_video_details_in_thread, video, started + countdown, pacer, **kwargs): video
+            for video, countdown in zip(pending, pacer.countdowns())
+        }
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                output[video] = future.result()
+            except (requests.exceptions.RequestException, yt_dlp.DownloadError) as exc:
+                log.exception(f"Failure to extract details of {video=}")
+                pacer.record_failure(throttled=pacing_services.is_throttled_exception(exc))
+            else:
+                pacer.record_success()
+
+    return output
@@ -1,31 +1,83 @@
+import hashlib
 import io
 import logging
 import os
 import requests
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from django.core.cache import cache
+from django.core.files.base import File
 
 from PIL import Image
 
+from vidar import app_settings
+
 
 log = logging.getLogger(__name__)
 
 
+FetchedImage = namedtuple("FetchedImage", ["url", "contents", "ext", "not_modified"])
+
+VALIDATORS_CACHE_TIMEOUT = 60 * 60 * 24 * 90
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """One requests.Session per process so keep-alive connections are pooled between image downloads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_maxsize=app_settings.IMAGE_FETCH_WORKERS)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
 def _convert_image_to_jpg_in_memory(image_bytes):
-    # Open the WebP image from bytes
-    image = Image.open(io.BytesIO(image_bytes))
+    """
+    Converts an image into a jpg without leaving memory.
+
+    Pillow reads straight from the supplied bytes and the encoded jpg is returned in the BytesIO it was written to,
+        see as_file, so neither side is copied.
+    """
+
+    image = Image.open(_as_stream(image_bytes))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
 
-    # Create a BytesIO object to hold the JPG image data
     jpg_buffer = io.BytesIO()
+    image.save(
+        jpg_buffer,
+        format="JPEG",
+        optimize=app_settings.IMAGE_JPEG_OPTIMIZE,
+        progressive=app_settings.IMAGE_JPEG_PROGRESSIVE,
+    )
+    jpg_buffer.seek(0)
 
-    # Convert the WebP image to JPG and save it in the BytesIO buffer
-    image.convert("RGB").save(jpg_buffer, format="JPEG")
+    return jpg_buffer
 
-    # Get the JPG image data as bytes
-    jpg_bytes = jpg_buffer.getvalue()
 
-    return jpg_bytes
+def _as_stream(contents):
+    if isinstance(contents, io.BytesIO):
+        contents.seek(0)
+        return contents
+    # A BytesIO initialised with bytes shares them until written to.
+    return io.BytesIO(contents)
 
 
-def download_and_convert_to_jpg(url):
+def as_file(contents):
+    """Wraps image contents, bytes or the BytesIO of a conversion, for FieldFile.save without copying them."""
+    return File(_as_stream(contents))
+
+
+def _get_ext_from_url(url):
     current_file_name_based_on_url = os.path.basename(url)
 
     # Some urls from youtube have a query string attached
@@ -35,17 +87,198 @@ def download_and_convert_to_jpg(url):
         bare_filename, ext = filename.rsplit(".", 1)
     except ValueError:
         ext = "jpg"
+    return ext
+
+
+def _validators_cache_key(url):
+    return f"vidar:image-validators:{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}"
+
+
+def _is_webp(image):
+    return image.ext and image.ext.lower() == "webp" and not image.not_modified
+
+
+def _convert_webp(image):
+    if not _is_webp(image):
+        return image
+
+    try:
+        contents = _convert_image_to_jpg_in_memory(image.contents)
+    except (ValueError, TypeError, OSError):
+        log.exception(f"Failure to convert {image.ext} to jpg")
+        return image
+
+    return image._replace(contents=contents, ext="jpg")
+
+
+def fetch(url, conditional=False):
+    """
+    Downloads an image through the shared session, converting webp into jpg.
+
+    ETag and Last-Modified of every response are remembered. With conditional=True they are sent back
+        and an unchanged image returns with not_modified=True and no contents.
+
+    The body is read once and Pillow decodes from it in place. Contents are either those bytes
+        or the BytesIO holding the converted jpg, pass them to storage with as_file.
+    """
+
+    ext = _get_ext_from_url(url)
+    cache_key = _validators_cache_key(url)
+
+    headers = {}
+    if conditional:
+        validators = cache.get(cache_key) or {}
+        if etag := validators.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := validators.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+
+    response = get_session().get(url, headers=headers, timeout=app_settings.IMAGE_FETCH_TIMEOUT)
+
+    if headers and response.status_code == 304:
+        return FetchedImage(url=url, contents=b"", ext=ext, not_modified=True)
+
+    response.raise_for_status()
+
+    validators = {}
+    if etag := response.headers.get("ETag"):
+        validators["etag"] = etag
+    if last_modified := response.headers.get("Last-Modified"):
+        validators["last_modified"] = last_modified
+    if validators:
+        cache.set(cache_key, validators, VALIDATORS_CACHE_TIMEOUT)
+
+    image = FetchedImage(url=url, contents=response.content, ext=ext, not_modified=False)
+
+    return _convert_webp(image)
+
+
+def fetch_many(urls, conditional=False):
+    """
+    Downloads many images concurrently, bounded by VIDAR_IMAGE_FETCH_WORKERS.
 
-    contents = requests.get(url).content
-    final_ext = ext
+    Returns:
+        dict: {url: FetchedImage} of every url fetched successfully, failures are logged.
+    """
 
-    if final_ext and final_ext.lower() == "webp":
+    urls = list(dict.fromkeys(x for x in urls if x))
+    if not urls:
+        return {}
+
+    images = {}
+    with ThreadPoolExecutor(max_workers=min(len(urls), app_settings.IMAGE_FETCH_WORKERS)) as executor:
+        futures = {executor.submit(fetch, url, conditional=conditional): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                images[url] = future.result()
+            except requests.exceptions.RequestException:
+                log.exception(f"Failure to fetch image {url=}")
+
+    return images
+
+
+def download_and_convert_to_jpg(url):
+    image = fetch(url)
+    return image.contents, image.ext
+
+
+def variant_name(name, variant):
+    ext = app_settings.IMAGE_VARIANTS_FORMAT.lower()
+    return f"{app_settings.IMAGE_VARIANTS_DIRECTORY}/{variant}/{name}.{ext}"
+
+
+def _render_variant(image, size):
+    """
+    Reduces an opened image so its longest side is at most size.
+
+    draft() lets the JPEG decoder scale by a power of two while decoding, thumbnail() then uses
+        reduce() to get most of the way before resampling.
+    """
+
+    image.draft("RGB", (size, size))
+    image = image.convert("RGB")
+    image.thumbnail((size, size), reducing_gap=2.0)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=app_settings.IMAGE_VARIANTS_FORMAT, quality=app_settings.IMAGE_VARIANTS_QUALITY)
+    return buffer
+
+
+def generate_variant(field_file, variant, contents=None):
+    """Writes one variant of field_file into storage, returns the variant name or None if the image is unreadable."""
+
+    size = app_settings.IMAGE_VARIANTS[variant]
+    name = variant_name(field_file.name, variant)
+
+    try:
+        if contents is None:
+            with field_file.storage.open(field_file.name, "rb") as fr:
+                output = _render_variant(Image.open(fr), size)
+        else:
+            output = _render_variant(Image.open(_as_stream(contents)), size)
+    except (ValueError, TypeError, OSError):
+        log.exception(f"Failure to generate image variant {variant=} of {field_file.name=}")
+        return
+
+    field_file.storage.save(name, as_file(output))
+    return name
+
+
+def refresh_variants(field_file, contents=None):
+    """
+    Called whenever an image is saved. Variants of the previous image under the same name are removed,
+        and with VIDAR_IMAGE_VARIANTS_ON_INGEST they are generated straight away.
+    """
+
+    for variant in app_settings.IMAGE_VARIANTS:
+        name = variant_name(field_file.name, variant)
+        if app_settings.IMAGE_VARIANTS_ON_INGEST:
+            generate_variant(field_file, variant, contents=contents)
+        elif field_file.storage.exists(name):
+            field_file.storage.delete(name)
+
+
+def delete_variants(storage, name):
+    """Deletes the variants of the image stored as name, called whenever the image itself is deleted."""
+
+    for variant in app_settings.IMAGE_VARIANTS:
+        variant_path = variant_name(name, variant)
         try:
-            conversion_tmp = _convert_image_to_jpg_in_memory(contents)
-            contents = conversion_tmp
-            final_ext = "jpg"
-        except (ValueError, TypeError, OSError):
-            log.exception(f"Failure to convert {ext} to jpg")
-            final_ext = ext
-
-    return contents, final_ext
+            if storage.exists(variant_path):
+                storage.delete(variant_path)
+        except OSError:
+            log.exception(f"Failure to delete image variant {variant_path=}")
+
+
+def move_variants(storage, old_name, new_name):
+    """Moves the variants of an image renamed from old_name to new_name, variants are named after their image."""
+
+    for variant in app_settings.IMAGE_VARIANTS:
+        old_path = variant_name(old_name, variant)
+        try:
+            if storage.exists(old_path):
+                storage.move(old_path, variant_name(new_name, variant))
+        except OSError:
+            log.exception(f"Failure to move image variant {old_path=}")
+
+
+def get_variant_url(field_file, variant):
+    """
+    The url of a reduced copy of field_file, the variant is derived on first request and kept in storage.
+
+    Unknown variants and images that cannot be reduced fall back to the url of the original.
+    """
+
+    if not field_file:
+        return ""
+
+    if variant not in app_settings.IMAGE_VARIANTS:
+        return field_file.url
+
+    name = variant_name(field_file.name, variant)
+    if not field_file.storage.exists(name):
+        if not field_file.storage.exists(field_file.name) or not generate_variant(field_file, variant):
+            return field_file.url
+
+    return field_file.storage.url(name)
@@ -0,0 +1,179 @@
+import logging
+import random
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from vidar import app_settings
+from vidar.services import redis_services
+
+
+log = logging.getLogger(__name__)
+
+
+THROTTLE_MESSAGES = [
+    "429",
+    "too many requests",
+    "rate-limit",
+    "rate limit",
+    "not a bot",
+]
+
+
+def is_throttled_exception(exc):
+    message = str(exc).lower()
+    return any(x in message for x in THROTTLE_MESSAGES)
+
+
+class SharedState:
+    """Values shared between task runs and worker processes.
+
+    State is kept in redis when VIDAR_REDIS_ENABLED and a connection is configured, otherwise within the django cache.
+        Key names are built with _name, outside of RedisMessaging.NAME_SPACE where every key is read as a message.
+    """
+
+    PREFIX = "vidar-state:"
+
+    def __init__(self):
+        self._redis = None
+        if app_settings.REDIS_ENABLED:
+            messaging = redis_services.RedisMessaging()
+            if messaging.conn:
+                self._redis = messaging
+
+    def _name(self, key):
+        return f"{self.PREFIX}{key}"
+
+    def _get(self, key, default=None):
+        if self._redis:
+            value = self._redis.execute_command("GET", key)
+            if value is None:
+                return default
+            return value.decode("utf8") if isinstance(value, bytes) else value
+        return cache.get(key, default)
+
+    def _get_many(self, keys, default=None):
+        """Values of keys in one round trip, in the same order as keys."""
+        if self._redis:
+            values = self._redis.execute_command("MGET", *keys) or [None] * len(keys)
+            return [
+                default if value is None else value.decode("utf8") if isinstance(value, bytes) else value
+                for value in values
+            ]
+        values = cache.get_many(keys)
+        return [values.get(key, default) for key in keys]
+
+    def _set(self, key, value, timeout):
+        if self._redis:
+            return self._redis.execute_command("SET", key, value, "EX", timeout)
+        return cache.set(key, value, timeout)
+
+    def _add(self, key, value, timeout):
+        """Sets key only when it does not exist yet, returning whether it was set."""
+        if self._redis:
+            return bool(self._redis.execute_command("SET", key, value, "EX", timeout, "NX"))
+        return cache.add(key, value, timeout)
+
+    def _incr(self, key, amount, timeout):
+        if self._redis:
+            value = self._redis.execute_command("INCRBY", key, amount)
+            self._redis.execute_command("EXPIRE", key, timeout)
+            return int(value)
+        cache.add(key, 0, timeout)
+        return cache.incr(key, amount)
+
+    def _delete(self, *keys):
+        if self._redis:
+            return self._redis.execute_command("DEL", *keys)
+        return cache.delete_many(keys)
+
+
+class PacingScheduler(SharedState):
+    """Token bucket style pacing shared between task runs and worker processes.
+
+    Tracks a daily budget and the tokens consumed against it, along with a penalty multiplier that grows
+        as the provider returns failures or throttles us and decays again as requests succeed.
+        The penalty stretches the spacing between dispatched tasks and shrinks the daily budget.
+    """
+
+    NAME_SPACE = "pacing:"
+
+    MAX_PENALTY = 16.0
+    FAILURE_MULTIPLIER = 1.25
+    THROTTLED_MULTIPLIER = 2.0
+    SUCCESS_MULTIPLIER = 0.9
+
+    def __init__(self, name, interval, interval_max=None):
+        super().__init__()
+        self.name = name
+        self.interval = interval
+        self.interval_max = max(interval_max or interval, interval)
+
+    def __repr__(self):
+        return f"<PacingScheduler: {self.name}>"
+
+    def _key(self, suffix):
+        return self._name(f"{self.NAME_SPACE}{self.name}:{suffix}")
+
+    def _daily_key(self, suffix):
+        return self._key(f"{suffix}:{timezone.localdate().isoformat()}")
+
+    def get_daily_budget(self, calculate):
+        """Returns today's budget, calling calculate() only once per day."""
+        key = self._daily_key("budget")
+        budget = self._get(key)
+        if budget is None:
+            budget = calculate()
+            self._set(key, budget, 60 * 60 * 24)
+        return int(budget)
+
+    def consumed_today(self):
+        return int(self._get(self._daily_key("consumed"), 0))
+
+    def consume(self, amount=1):
+        return self._incr(self._daily_key("consumed"), amount, 60 * 60 * 24)
+
+    @property
+    def penalty(self):
+        return float(self._get(self._key("penalty"), 1.0))
+
+    def _set_penalty(self, value):
+        value = min(max(value, 1.0), self.MAX_PENALTY)
+        self._set(self._key("penalty"), value, 60 * 60 * 24 * 7)
+        return value
+
+    def record_failure(self, throttled=False):
+        multiplier = self.THROTTLED_MULTIPLIER if throttled else self.FAILURE_MULTIPLIER
+        penalty = self._set_penalty(self.penalty * multiplier)
+        log.info(f"{self!r} failure recorded {throttled=}, {penalty=}")
+        return penalty
+
+    def record_success(self):
+        penalty = self.penalty
+        if penalty > 1.0:
+            penalty = self._set_penalty(penalty * self.SUCCESS_MULTIPLIER)
+        return penalty
+
+    def effective_budget(self, budget):
+        """Shrink the budget while the provider is failing or throttling requests."""
+        return int(budget / self.penalty)
+
+    def countdowns(self, start=0):
+        """Yields the countdown, in seconds, for each task dispatched in this run."""
+        penalty = self.penalty
+        countdown = start
+        while True:
+            yield countdown
+            countdown += int(random.randint(self.interval, self.interval_max) * penalty)
+
+
+def video_details_pacer(interval=10, interval_max=20):
+    return PacingScheduler("update_video_details", interval=interval, interval_max=interval_max)
+
+
+def channel_banners_pacer():
+    return PacingScheduler("update_channel_banners", interval=app_settings.CHANNEL_BANNER_RATE_LIMIT)
+
+
+def mirror_playlists_pacer():
+    return PacingScheduler("mirror_live_playlist", interval=app_settings.PLAYLIST_MIRROR_RATE_LIMIT)
@@ -0,0 +1,248 @@
+import hashlib
+import logging
+import random
+import time
+import urllib.parse
+
+from vidar import app_settings
+from vidar.services import pacing_services
+
+
+log = logging.getLogger(__name__)
+
+
+COUNTERS = [
+    "successes",
+    "failures",
+    "throttled",
+    "blocked",
+    "consecutive_failures",
+    "latency_ms",
+    "latency_count",
+    "downloaded_bytes",
+    "download_ms",
+]
+
+# Messages of errors caused by the proxy rather than by the video being requested through it.
+PROXY_FAILURE_MESSAGES = [
+    "proxy",
+    "tunnel connection failed",
+    "timed out",
+    "connection refused",
+    "connection reset",
+    "remote end closed connection",
+    "unable to connect",
+    "network is unreachable",
+]
+
+
+def is_country_blocked_exception(exc):
+    message = str(exc).lower()
+    return "country" in message and ("blocked" in message or ("not" in message and "available" in message))
+
+
+def is_proxy_exception(exc):
+    """Whether the error was caused by the proxy, the same download through another proxy may succeed."""
+    message = str(exc).lower()
+    return pacing_services.is_throttled_exception(exc) or any(x in message for x in PROXY_FAILURE_MESSAGES)
+
+
+def display_name(proxy):
+    """The proxy without any credentials within it, for logs and the dashboard."""
+    parsed = urllib.parse.urlsplit(proxy)
+    if parsed.password is None and parsed.username is None:
+        return proxy
+    return parsed._replace(netloc=parsed.netloc.rpartition("@")[2]).geturl()
+
+
+class ProxyHealth(pacing_services.SharedState):
+    """Success rate, latency, throughput and country blocks of one proxy, shared between worker processes.
+
+    A failure caused by the proxy puts it in a cool-down during which it is not selected,
+        the cool-down doubles with each failure in a row and a success clears it.
+    """
+
+    NAME_SPACE = "proxy-health:"
+
+    def __init__(self, proxy):
+        super().__init__()
+        self.proxy = proxy
+        # Proxies regularly contain credentials, keep them out of the key names.
+        self._digest = hashlib.blake2b(proxy.encode(), digest_size=16).hexdigest()
+
+    def __repr__(self):
+        return f"<ProxyHealth: {display_name(self.proxy)}>"
+
+    def _key(self, suffix):
+        return self._name(f"{self.NAME_SPACE}{self._digest}:{suffix}")
+
+    def _record(self, **amounts):
+        for counter, amount in amounts.items():
+            self._incr(self._key(counter), int(amount), app_settings.PROXY_HEALTH_EXPIRES)
+
+    def stats(self):
+        # Read on every yt-dlp call through get_health, all counters are fetched at once.
+        names = list(COUNTERS) + ["cooldown_until"]
+        values = dict(zip(names, self._get_many([self._key(x) for x in names], 0)))
+        output = {counter: int(values[counter]) for counter in COUNTERS}
+        output["cooldown_until"] = float(values["cooldown_until"])
+        return output
+
+    def record_success(self, latency=None, downloaded_bytes=0, download_seconds=0):
+        self._record(successes=1)
+        if latency is not None:
+            self._record(latency_ms=latency * 1000, latency_count=1)
+        if downloaded_bytes and download_seconds:
+            self._record(downloaded_bytes=downloaded_bytes, download_ms=download_seconds * 1000)
+        self._delete(self._key("consecutive_failures"), self._key("cooldown_until"))
+
+    def record_failure(self, exc):
+        """
+        Records the failure of a request made through the proxy.
+
+        Country blocks are counted but are a property of the video, not the health of the proxy.
+            Errors unrelated to the proxy are not recorded at all.
+
+        Returns:
+            str: "blocked", "throttled", "failure", or None when the error was not recorded.
+        """
+
+        if is_country_blocked_exception(exc):
+            self._record(blocked=1)
+            return "blocked"
+
+        if not is_proxy_exception(exc):
+            return
+
+        kind = "failure"
+        self._record(failures=1)
+        if pacing_services.is_throttled_exception(exc):
+            kind = "throttled"
+            self._record(throttled=1)
+
+        consecutive = self._incr(self._key("consecutive_failures"), 1, app_settings.PROXY_HEALTH_EXPIRES)
+        cooldown = min(
+            app_settings.PROXY_COOLDOWN_SECONDS * 2 ** (consecutive - 1),
+            app_settings.PROXY_COOLDOWN_MAX_SECONDS,
+        )
+        self._set(self._key("cooldown_until"), time.time() + cooldown, cooldown)
+
+        log.info(f"{self!r} {kind} recorded, cooling down for {cooldown} seconds.")
+
+        return kind
+
+    def reset(self):
+        self._delete(*[self._key(x) for x in COUNTERS + ["cooldown_until"]])
+
+
+def configured_proxies():
+    """VIDAR_PROXIES and VIDAR_PROXIES_DEFAULT, proxies returned by a callable VIDAR_PROXIES cannot be listed."""
+    proxies = app_settings.PROXIES
+    if callable(proxies):
+        proxies = []
+    elif isinstance(proxies, str):
+        proxies = proxies.split(",")
+    return [x for x in dict.fromkeys([*proxies, app_settings.PROXIES_DEFAULT]) if x]
+
+
+def summarize(stats):
+    attempts = stats["successes"] + stats["failures"]
+    output = dict(stats)
+    output["attempts"] = attempts
+    # Smoothed so a proxy with a single failure is not written off and unused proxies get tried.
+    output["success_rate"] = (stats["successes"] + 1) / (attempts + 2)
+    output["latency"] = None
+    if stats["latency_count"]:
+        output["latency"] = stats["latency_ms"] / stats["latency_count"] / 1000
+    output["throughput"] = None
+    if stats["download_ms"]:
+        output["throughput"] = stats["downloaded_bytes"] / (stats["download_ms"] / 1000)
+    return output
+
+
+def score(summary, best_latency=None, best_throughput=None):
+    """
+    The selection weight of a proxy, its success rate scaled by its latency and throughput
+        relative to the best of the proxies it is selected against. Unmeasured proxies are not penalised.
+    """
+
+    relative_latency = 1.0
+    if summary["latency"] and best_latency:
+        relative_latency = max(best_latency / summary["latency"], 0.1)
+
+    relative_throughput = 1.0
+    if summary["throughput"] and best_throughput:
+        relative_throughput = max(summary["throughput"] / best_throughput, 0.1)
+
+    return summary["success_rate"] * (relative_latency + relative_throughput) / 2
+
+
+def get_health(proxies):
+    """
+    Returns:
+        dict: {proxy: summary} with the score and cool-down of each proxy added to its summary.
+    """
+
+    now = time.time()
+
+    summaries = {proxy: summarize(ProxyHealth(proxy).stats()) for proxy in proxies}
+
+    latencies = [x["latency"] for x in summaries.values() if x["latency"]]
+    throughputs = [x["throughput"] for x in summaries.values() if x["throughput"]]
+    best_latency = min(latencies, default=None)
+    best_throughput = max(throughputs, default=None)
+
+    for proxy, summary in summaries.items():
+        summary["name"] = display_name(proxy)
+        summary["score"] = score(summary, best_latency=best_latency, best_throughput=best_throughput)
+        summary["cooldown_seconds"] = max(int(summary["cooldown_until"] - now), 0)
+
+    return summaries
+
+
+def choose(proxies):
+    """Selects one of proxies weighted by score, proxies cooling down are skipped. Returns None if all are."""
+
+    available = {proxy: x for proxy, x in get_health(proxies).items() if not x["cooldown_seconds"]}
+    if not available:
+        return
+
+    return random.choices(list(available), weights=[x["score"] for x in available.values()])[0]
+
+
+class DownloadMonitor:
+    """
+    A yt-dlp progress hook measuring a download through a proxy.
+
+    Latency is the time until the first bytes of the file arrive, so includes the page requests of the extraction.
+    """
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.started = time.monotonic()
+        self.latency = None
+        self.downloaded_bytes = 0
+        self.download_seconds = 0
+
+    def __call__(self, d):
+        if self.latency is None and d.get("status") == "downloading":
+            self.latency = time.monotonic() - self.started
+
+        if d.get("status") == "finished":
+            self.downloaded_bytes += d.get("total_bytes") or d.get("downloaded_bytes") or 0
+            self.download_seconds += d.get("elapsed") or 0
+
+    def succeeded(self):
+        ProxyHealth(self.proxy).record_success(
+            latency=self.latency,
+            downloaded_bytes=self.downloaded_bytes,
+            download_seconds=self.download_seconds,
+        )
+
+    def failed(self, exc):
+        return ProxyHealth(self.proxy).record_failure(exc)
+
+
+def download_monitor(proxy):
+    if proxy and app_settings.PROXY_HEALTH_ENABLED:
+        return DownloadMonitor(proxy)
@@ -0,0 +1,182 @@
+import logging
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import transaction
+
+from vidar import app_settings, models
+from vidar.storages import vidar_storage
+
+
+log = logging.getLogger(__name__)
+
+
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".mkv")
+
+
+def _join(parent, name):
+    if parent:
+        return f"{parent}/{name}"
+    return name
+
+
+def _walk(root, start, known_mtimes, known_subdirectories, recursive=True):
+    """
+    Walks the media tree below start with os.scandir, runs within a worker thread so it must not touch the database.
+
+    A directory whose mtime matches the manifest has the same entries as last time, it is not listed again
+        and its subdirectories are taken from the manifest instead.
+        Files changed in place do not update the mtime of their directory and are not picked up.
+
+    Returns:
+        dict: {relative directory path: (mtime_ns, files or None when unchanged, subdirectories)}
+    """
+
+    scanned = {}
+    stack = [start]
+
+    while stack:
+        relative = stack.pop()
+
+        try:
+            mtime_ns = os.stat(os.path.join(root, relative)).st_mtime_ns
+        except FileNotFoundError:
+            continue
+
+        if known_mtimes.get(relative) == mtime_ns:
+            subdirectories = known_subdirectories.get(relative, [])
+            scanned[relative] = (mtime_ns, None, subdirectories)
+
+        else:
+            files = []
+            subdirectories = []
+            with os.scandir(os.path.join(root, relative)) as entries:
+                for entry in entries:
+                    path = _join(relative, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files.append((path, stat.st_size, stat.st_mtime_ns, stat.st_ino))
+            scanned[relative] = (mtime_ns, files, subdirectories)
+
+        if recursive:
+            stack.extend(subdirectories)
+
+    return scanned
+
+
+def _save_manifest(scanned, known_mtimes):
+    removed = set(known_mtimes) - set(scanned)
+    changed = {path: values for path, values in scanned.items() if values[1] is not None}
+
+    with transaction.atomic():
+        # Files cascade with their directory.
+        models.MediaManifestDirectory.objects.filter(path__in=removed).delete()
+        models.MediaManifestFile.objects.filter(directory__path__in=changed).delete()
+
+        existing = {x.path: x for x in models.MediaManifestDirectory.objects.filter(path__in=changed)}
+        created = []
+        for path, (mtime_ns, _, _) in changed.items():
+            if path in existing:
+                existing[path].mtime_ns = mtime_ns
+            else:
+                created.append(models.MediaManifestDirectory(path=path, mtime_ns=mtime_ns))
+        models.MediaManifestDirectory.objects.bulk_update(existing.values(), fields=["mtime_ns"], batch_size=1000)
+        models.MediaManifestDirectory.objects.bulk_create(created, batch_size=1000)
+
+        directory_pks = dict(
+            models.MediaManifestDirectory.objects.filter(path__in=changed).values_list("path", "pk")
+        )
+        models.MediaManifestFile.objects.bulk_create(
+            [
+                models.MediaManifestFile(
+                    directory_id=directory_pks[directory],
+                    path=path,
+                    size=size,
+                    mtime_ns=mtime_ns,
+                    inode=inode,
+                )
+                for directory, (_, files, _) in changed.items()
+                for path, size, mtime_ns, inode in files
+            ],
+            batch_size=1000,
+        )
+
+    return changed, removed
+
+
+def scan_media_tree(root=None):
+    """
+    Brings the media manifest up to date with the media tree on disk.
+
+    The top level of the tree is read first, every directory beneath it, typically one per channel,
+        is then walked in parallel. Only directories changed since the previous scan are listed.
+    """
+
+    root = str(root or vidar_storage.location)
+
+    known_mtimes = dict(models.MediaManifestDirectory.objects.values_list("path", "mtime_ns"))
+    known_subdirectories = {}
+    for path in known_mtimes:
+        if path:
+            known_subdirectories.setdefault(path.rpartition("/")[0], []).append(path)
+
+    scanned = _walk(root, "", known_mtimes, known_subdirectories, recursive=False)
+
+    if "" in scanned:
+        top_level = scanned[""][2]
+        with ThreadPoolExecutor(max_workers=app_settings.RECONCILIATION_WORKERS) as executor:
+            for output in executor.map(
+                lambda x: _walk(root, x, known_mtimes, known_subdirectories),
+                top_level,
+            ):
+                scanned.update(output)
+
+    changed, removed = _save_manifest(scanned=scanned, known_mtimes=known_mtimes)
+
+    log.info(f"Scanned media tree {root=}, {len(scanned)} directories, {len(changed)} changed, {len(removed)} removed.")
+
+    return {
+        "directories": len(scanned),
+        "changed": len(changed),
+        "skipped": len(scanned) - len(changed),
+        "removed": len(removed),
+    }
+
+
+def reconcile(scan=True, root=None, commit=False):
+    """
+    Diffs the media manifest against the video files recorded in the database.
+
+    Returns:
+        dict: "orphaned_files" are video files on disk without a Video, "missing_videos" are the primary keys
+            of archived videos whose file is not on disk.
+        With commit=True Video.file_not_found is set to match.
+    """
+
+    if scan:
+        scan_media_tree(root=root)
+
+    on_disk = set(models.MediaManifestFile.objects.values_list("path", flat=True))
+
+    recorded = {}
+    for pk, name in models.Video.objects.exclude(file="").values_list("pk", "file"):
+        recorded[str(pathlib.PurePosixPath(name))] = pk
+
+    orphaned_files = sorted(x for x in on_disk - set(recorded) if x.endswith(VIDEO_EXTENSIONS))
+    missing_videos = sorted(recorded[x] for x in set(recorded) - on_disk)
+
+    log.info(f"Reconciled media tree, {len(orphaned_files)} orphaned files, {len(missing_videos)} missing videos.")
+
+    if commit:
+        models.Video.objects.filter(pk__in=missing_videos, file_not_found=False).update(file_not_found=True)
+        models.Video.objects.filter(file_not_found=True).exclude(file="").exclude(pk__in=missing_videos).update(
+            file_not_found=False
+        )
+
+    return {
+        "orphaned_files": orphaned_files,
+        "missing_videos": missing_videos,
+    }
@@ -7,6 +7,7 @@ from django.utils import timezone
 import redis
 
 from vidar import app_settings
+from vidar.helpers import instrumentation_helpers
 
 
 log = logging.getLogger(__name__)
@@ -65,16 +66,20 @@ class RedisMessaging:
         "vidar",
     ]
 
+    def execute_command(self, *args):
+        instrumentation_helpers.increment("redis_calls")
+        return self.conn.execute_command(*args)
+
     def set_direct_message(self, key, message, expire=True):
         """write new message to redis"""
-        output = self.conn.execute_command("SET", key, json.dumps(message))
+        output = self.execute_command("SET", key, json.dumps(message))
 
         if expire:
             if isinstance(expire, bool):
                 secs = 15
             else:
                 secs = expire
-            self.conn.execute_command("EXPIRE", key, secs)
+            self.execute_command("EXPIRE", key, secs)
 
         return output
 
@@ -88,7 +93,7 @@ class RedisMessaging:
 
     def get_direct_message(self, key):
         """get message dict from redis"""
-        reply = self.conn.execute_command("GET", key)
+        reply = self.execute_command("GET", key)
         if reply:
             json_str = json.loads(reply)
         else:
@@ -98,6 +103,7 @@ class RedisMessaging:
 
     def get_all_messages(self):
         messages = []
+        instrumentation_helpers.increment("redis_calls")
         for key in self.conn.scan_iter(f"{self.NAME_SPACE}*"):
             key = key.decode("utf8")
             reply = self.get_direct_message(key)
@@ -108,6 +114,7 @@ class RedisMessaging:
 
     def get_app_messages(self, app):
         messages = []
+        instrumentation_helpers.increment("redis_calls")
         for key in self.conn.scan_iter(f"{self.NAME_SPACE}{app}*"):
             key = key.decode("utf8")
             reply = self.get_direct_message(key)
@@ -117,7 +124,7 @@ class RedisMessaging:
         return messages
 
     def flushdb(self):
-        return self.conn.execute_command("FLUSHDB")
+        return self.execute_command("FLUSHDB")
 
 
 def channel_indexing(msg, channel, **kwargs):
@@ -0,0 +1,236 @@
+import functools
+import logging
+import operator
+import pathlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from vidar import app_settings, models
+from vidar.services import image_services, video_services
+
+
+log = logging.getLogger(__name__)
+
+
+# (Video type field, Channel days field, Channel watched field)
+RETENTION_KINDS = [
+    ("is_video", "delete_videos_after_days", "delete_videos_after_watching"),
+    ("is_short", "delete_shorts_after_days", "delete_shorts_after_watching"),
+    ("is_livestream", "delete_livestreams_after_days", "delete_livestreams_after_watching"),
+]
+
+FILE_FIELDS = ["file", "thumbnail", "audio", "info_json"]
+
+# Every field video_services.reset_fields changes, bulk_update needs them listed explicitly.
+RESET_FIELDS = FILE_FIELDS + [
+    "quality",
+    "at_max_quality",
+    "starred",
+    "format_note",
+    "format_id",
+    "date_downloaded",
+    "watched",
+    "force_download",
+    "download_kwargs",
+    "fps",
+    "width",
+    "height",
+    "file_size",
+    "file_hash",
+    "privacy_status",
+    "last_privacy_status_check",
+    "system_notes",
+    "requested_max_quality",
+    "download_comments_on_index",
+    "download_all_comments",
+    "convert_to_audio",
+    "updated",
+]
+
+
+def _age_conditions(now=None):
+    """Channels share a handful of retention periods, one condition is built per distinct period."""
+    now = now or timezone.now()
+
+    days_fields = [days_field for _, days_field, _ in RETENTION_KINDS]
+    periods = {days_field: set() for days_field in days_fields}
+
+    for values in (
+        models.Channel.objects.filter(functools.reduce(operator.or_, [Q(**{f"{x}__gt": 0}) for x in days_fields]))
+        .values_list(*days_fields)
+        .distinct()
+    ):
+        for days_field, days in zip(days_fields, values):
+            if days:
+                periods[days_field].add(days)
+
+    conditions = []
+    for type_field, days_field, _ in RETENTION_KINDS:
+        for days in sorted(periods[days_field]):
+            conditions.append(
+                Q(
+                    **{
+                        type_field: True,
+                        f"channel__{days_field}": days,
+                        "date_downloaded__lt": now - timezone.timedelta(days=days),
+                    }
+                )
+            )
+    return conditions
+
+
+def _watched_condition():
+    watched = Exists(
+        models.UserPlaybackHistory.objects.filter(video=OuterRef("pk"), seconds__gte=OuterRef("duration") * 0.9)
+    )
+    kinds = functools.reduce(
+        operator.or_,
+        [Q(**{type_field: True, f"channel__{field}": True}) for type_field, _, field in RETENTION_KINDS],
+    )
+    return kinds & Q(watched)
+
+
+def get_deletable_videos(now=None):
+    """Every archived video, across all channels, that a channel retention policy wants deleted.
+
+    Videos are annotated with retention_reason of either "age" or "watched"."""
+
+    age_conditions = _age_conditions(now=now)
+    watched_condition = _watched_condition()
+
+    conditions = age_conditions + [watched_condition]
+
+    reason = Value("watched")
+    if age_conditions:
+        reason = Case(When(functools.reduce(operator.or_, age_conditions), then=Value("age")), default=reason)
+
+    return (
+        models.Video.objects.exclude(file="")
+        .filter(starred__isnull=True)
+        .filter(functools.reduce(operator.or_, conditions))
+        .annotate(retention_reason=reason)
+        .select_related("channel")
+        .prefetch_related("extra_files")
+    )
+
+
+def _video_files(video):
+    files = [getattr(video, field) for field in FILE_FIELDS]
+    files += [ef.file for ef in video.extra_files.all()]
+    return [x for x in files if x]
+
+
+def _delete_directories(storage, directories):
+    location = getattr(storage, "location", None)
+    for directory in directories:
+        if location and pathlib.Path(location) == directory:
+            continue
+        try:
+            storage.delete(directory)
+        except OSError:
+            log.exception(f"Failure to delete video {directory=}")
+
+
+def delete_videos_keeping_records(videos, dry_run=False):
+    """Deletes the files of the supplied videos and resets their fields, keeping the Video records.
+
+    Files are deleted in parallel, emptied directories are removed once per storage afterwards and
+        the database is updated with bulk_update. A video whose files could not all be deleted keeps its fields,
+        only the files that were deleted are cleared from it.
+
+    Returns a report of the videos, the reason they were selected and their files.
+        Nothing is deleted with dry_run=True.
+    """
+
+    videos = list(videos)
+
+    report = []
+    files_by_video = {}
+    for video in videos:
+        files = _video_files(video)
+        files_by_video[video.pk] = files
+        report.append(
+            {
+                "video": video,
+                "reason": getattr(video, "retention_reason", ""),
+                "files": [x.name for x in files],
+            }
+        )
+
+    if dry_run or not videos:
+        return report
+
+    failed = {}
+    deletable_directories = {}
+
+    with ThreadPoolExecutor(max_workers=app_settings.RETENTION_DELETE_WORKERS) as executor:
+        futures = {}
+        for video in videos:
+            for x in files_by_video[video.pk]:
+                deletable_directories.setdefault(x.storage, set()).add(pathlib.Path(x.path).parent)
+                futures[executor.submit(x.storage.delete, x.name)] = (video, x)
+                if x.field.name == "thumbnail":
+                    # Failures are logged by delete_variants, they do not stop the video being reset.
+                    executor.submit(image_services.delete_variants, x.storage, x.name)
+
+        for future in as_completed(futures):
+            video, x = futures[future]
+            try:
+                future.result()
+            except (OSError, ValueError):
+                log.exception(f"Failed to delete video files {video=} {x.name=}")
+                failed.setdefault(video.pk, set()).add(x.name)
+
+        for future in [
+            executor.submit(_delete_directories, storage, directories)
+            for storage, directories in deletable_directories.items()
+        ]:
+            future.result()
+
+    deleted_videos = [video for video in videos if video.pk not in failed]
+    partially_deleted_videos = [video for video in videos if video.pk in failed]
+
+    models.ExtraFile.objects.filter(video__in=deleted_videos).delete()
+
+    now = timezone.now()
+
+    # The database must not keep pointing at files that are gone.
+    for video in partially_deleted_videos:
+        for field in FILE_FIELDS:
+            if getattr(video, field) and getattr(video, field).name not in failed[video.pk]:
+                setattr(video, field, "")
+        video.extra_files.exclude(file__in=failed[video.pk]).delete()
+        video.updated = now
+
+    history = []
+    for video in deleted_videos:
+        old_privacy_status = video.privacy_status
+
+        video_services.reset_fields(video=video, commit=False)
+        for field in FILE_FIELDS:
+            setattr(video, field, "")
+        video.updated = now
+
+        # Mirror the change history Video.save records, bulk_update bypasses it.
+        if old_privacy_status and video.privacy_status != old_privacy_status:
+            history.append(
+                models.VideoHistory(
+                    video=video,
+                    old_privacy_status=old_privacy_status,
+                    new_privacy_status=video.privacy_status,
+                )
+            )
+
+    models.Video.objects.bulk_update(deleted_videos, fields=RESET_FIELDS, batch_size=500)
+    models.Video.objects.bulk_update(partially_deleted_videos, fields=FILE_FIELDS + ["updated"], batch_size=500)
+    models.VideoHistory.objects.bulk_create(history)
+
+    log.info(f"Retention deleted the files of {len(deleted_videos)} videos, {len(failed)} partially failed.")
+
+    return report
+
+
+def apply_retention_policies(dry_run=False):
+    return delete_videos_keeping_records(get_deletable_videos().order_by("pk"), dry_run=dry_run)
@@ -1,6 +1,10 @@
+import functools
 import logging
 
+from django.apps import apps
+from django.db.models import Prefetch
 from django.template import Context, Template
+from django.utils.functional import cached_property
 
 from vidar import app_settings, exceptions
 
@@ -8,6 +12,69 @@ from vidar import app_settings, exceptions
 log = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1000)
+def _compile_template(string):
+    """
+    Compiling a schema is far more expensive than rendering it, and only a handful of distinct
+        schemas exist across every channel, playlist and video.
+
+    Returns:
+        Template: The compiled template, shared between calls with the same schema.
+    """
+    return Template(string)
+
+
+SCHEMA_PLAYLISTS_ATTR = "schema_playlists"
+
+
+class SchemaResolution:
+    """
+    The playlists a channel-less video takes its filename and directory schemas from.
+
+    Resolved lazily and at most once, pass the same resolution to every schema function working on the video.
+        Videos loaded through prefetch_schema_playlists resolve without a query.
+    """
+
+    def __init__(self, video):
+        self.video = video
+
+    def __repr__(self):
+        return f"<SchemaResolution: {self.video.pk}>"
+
+    @cached_property
+    def playlists(self):
+        prefetched = getattr(self.video, SCHEMA_PLAYLISTS_ATTR, None)
+        if prefetched is not None:
+            return prefetched
+        return list(self.video.playlists.exclude(filename_schema="", directory_schema="").order_by("pk"))
+
+    @cached_property
+    def filename_playlist(self):
+        return next((x for x in self.playlists if x.filename_schema), None)
+
+    @cached_property
+    def directory_playlist(self):
+        return next((x for x in self.playlists if x.directory_schema), None)
+
+
+def get_schema_resolution(video, resolution=None):
+    if resolution is not None and resolution.video is video:
+        return resolution
+    return SchemaResolution(video)
+
+
+def prefetch_schema_playlists(queryset):
+    """Prefetches, for a whole queryset of videos, the playlists their schemas may come from."""
+    playlist_model = apps.get_model("vidar", "Playlist")
+    return queryset.prefetch_related(
+        Prefetch(
+            "playlists",
+            queryset=playlist_model.objects.exclude(filename_schema="", directory_schema="").order_by("pk"),
+            to_attr=SCHEMA_PLAYLISTS_ATTR,
+        )
+    )
+
+
 def _render_string_using_object_data(string, **kwargs):
     """
     Renders a string using the Django template engine.
@@ -15,7 +82,7 @@ def _render_string_using_object_data(string, **kwargs):
     Returns:
         str: The rendered string.
     """
-    template = Template(string)
+    template = _compile_template(string)
     context = Context(kwargs)
     safe_string = template.render(context)
 
@@ -44,7 +111,7 @@ def channel_directory_name(channel):
     )
 
 
-def video_directory_name(video):
+def video_directory_name(video, resolution=None):
 
     if video.directory_schema:
         if rendered_value := _render_string_using_object_data(
@@ -71,7 +138,7 @@ def video_directory_name(video):
             )
     else:
 
-        if playlist := video.playlists.exclude(directory_schema="").order_by("pk").first():
+        if playlist := get_schema_resolution(video, resolution).directory_playlist:
             if rendered_value := _render_string_using_object_data(
                 playlist.directory_schema,
                 self=video,
@@ -91,7 +158,7 @@ def video_directory_name(video):
     )
 
 
-def video_file_name(video, ext):
+def video_file_name(video, ext, resolution=None):
 
     rendered_value = None
 
@@ -115,7 +182,7 @@ def video_file_name(video, ext):
                 )
 
     elif not rendered_value:
-        if playlist := video.playlists.exclude(filename_schema="").order_by("pk").first():
+        if playlist := get_schema_resolution(video, resolution).filename_playlist:
             rendered_value = _render_string_using_object_data(
                 playlist.filename_schema, self=video, video=video, playlist=playlist
             )
@@ -137,23 +204,23 @@ def video_file_name(video, ext):
     return rendered_value
 
 
-def video_uses_custom_filename_schema(video):
+def video_uses_custom_filename_schema(video, resolution=None):
     if video.filename_schema:
         return video.filename_schema
     if video.channel:
         if video.channel.video_filename_schema:
             return video.channel.video_filename_schema
     else:
-        if playlist := video.playlists.exclude(filename_schema="").order_by("pk").first():
+        if playlist := get_schema_resolution(video, resolution).filename_playlist:
             return playlist.filename_schema
 
 
-def video_uses_custom_directory_schema(video):
+def video_uses_custom_directory_schema(video, resolution=None):
     if video.directory_schema:
         return video.directory_schema
     if video.channel:
         if video.channel.video_directory_schema:
             return video.channel.video_directory_schema
     else:
-        if playlist := video.playlists.exclude(directory_schema="").order_by("pk").first():
+        if playlist := get_schema_resolution(video, resolution).directory_playlist:
             return playlist.directory_schema
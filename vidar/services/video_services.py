@@ -60,11 +60,12 @@ def _load_downloaded_infojson_file(downloaded_file_data):
             log.debug(f"Failure to delete .info.json file {infojson_filepath=}")
 
 
-def save_infojson_file(video, downloaded_file_data, save=True, overwrite_formats=True):
+def save_infojson_file(video, downloaded_file_data, save=True, overwrite_formats=True, infojson_data=None):
     if not app_settings.SAVE_INFO_JSON_FILE:
         return
 
-    infojson_data = _load_downloaded_infojson_file(downloaded_file_data=downloaded_file_data)
+    if infojson_data is None:
+        infojson_data = _load_downloaded_infojson_file(downloaded_file_data=downloaded_file_data)
 
     if video.format_id and overwrite_formats:
         # Video already has a format, ensure infojson has that format.
@@ -81,33 +82,38 @@ def save_infojson_file(video, downloaded_file_data, save=True, overwrite_formats
 
 
 def generate_filepaths_for_storage(
-    video, ext, filename=None, upload_to=video_helpers.upload_to_file, ensure_new_dir_exists=False
+    video, ext, filename=None, upload_to=video_helpers.upload_to_file, ensure_new_dir_exists=False, resolution=None
 ):
-    final_filename = filename or schema_services.video_file_name(video=video, ext=ext)
+    resolution = schema_services.get_schema_resolution(video, resolution)
+    final_filename = filename or schema_services.video_file_name(video=video, ext=ext, resolution=resolution)
     valid_new_filename = vidar_storage.get_valid_name(final_filename)
-    new_storage_path = upload_to(video, valid_new_filename)
+    new_storage_path = upload_to(video, valid_new_filename, resolution=resolution)
     new_full_filepath = pathlib.Path(vidar_storage.path(new_storage_path))
     if ensure_new_dir_exists:
         new_full_filepath.parent.mkdir(parents=True, exist_ok=True)
     return new_full_filepath, new_storage_path
 
 
-def set_thumbnail(video, url, save=True):
-    contents, final_ext = image_services.download_and_convert_to_jpg(url)
+def set_thumbnail(video, url, save=True, image=None):
+    if image is None:
+        contents, final_ext = image_services.download_and_convert_to_jpg(url)
+    else:
+        contents, final_ext = image.contents, image.ext
 
     final_filename = schema_services.video_file_name(video=video, ext=final_ext)
 
-    video.thumbnail.save(final_filename, ContentFile(contents), save=False)
+    video.thumbnail.save(final_filename, image_services.as_file(contents), save=False)
+    image_services.refresh_variants(video.thumbnail, contents=contents)
 
     if save:
         video.save(update_fields=["thumbnail"])
 
 
-def does_file_need_fixing(video):
+def does_file_need_fixing(video, resolution=None):
     if not video.file:
         return False
     ext = video.file.name.rsplit(".", 1)[-1]
-    new_full_filepath, new_storage_path = generate_filepaths_for_storage(video=video, ext=ext)
+    new_full_filepath, new_storage_path = generate_filepaths_for_storage(video=video, ext=ext, resolution=resolution)
     return video.file.name != str(new_storage_path)
 
 
@@ -258,6 +264,7 @@ def reset_fields(video, commit=True):
     video.width = 0
     video.height = 0
     video.file_size = None
+    video.file_hash = ""
     video.privacy_status = "Public"
     video.last_privacy_status_check = None
     video.system_notes = dict()
@@ -304,6 +311,9 @@ def delete_files(video, save=False):
 
     # Prepare necessary variables to remove video directory after removing the files.
     deletable_directories = {}
+    if video.thumbnail:
+        image_services.delete_variants(video.thumbnail.storage, video.thumbnail.name)
+
     for x in [video.file, video.thumbnail, video.audio, video.info_json]:
         if x:
             if x.storage not in deletable_directories:
@@ -478,6 +488,96 @@ def log_update_video_details_called(video, mode="auto", commit=True, result=None
         video.save(update_fields=["system_notes", "privacy_status_checks"])
 
 
+def bulk_update_details_from_listing(videos, entries, mode="auto", due_pks=None):
+    """Apply title, view count and privacy status from a flat channel listing onto videos using bulk_update.
+
+    Only videos within due_pks, the ones whose status check was due, are recorded as checked.
+        Counting every listed video would quickly push the videos of large channels past
+        PRIVACY_STATUS_CHECK_MAX_CHECK_PER_VIDEO.
+
+    Returns the videos that were not found within the listing entries.
+    """
+
+    due_pks = set(due_pks or [])
+
+    status_mapping = {
+        "unlisted": models.Video.VideoPrivacyStatuses.UNLISTED,
+        "public": models.Video.VideoPrivacyStatuses.PUBLIC,
+        "private": models.Video.VideoPrivacyStatuses.PRIVATE,
+        "deleted": models.Video.VideoPrivacyStatuses.DELETED,
+    }
+
+    entries_by_id = {entry["id"]: entry for entry in entries if entry and entry.get("id")}
+
+    now = timezone.now()
+    updated_videos = []
+    missing_videos = []
+    history = []
+
+    for video in videos:
+        entry = entries_by_id.get(video.provider_object_id)
+        if not entry:
+            missing_videos.append(video)
+            continue
+
+        old_title = video.title
+        old_privacy_status = video.privacy_status
+
+        title = entry.get("title") or ""
+        if title.lower() == "[private video]":
+            video.privacy_status = models.Video.VideoPrivacyStatuses.PRIVATE
+        elif title.lower() == "[deleted video]":
+            video.privacy_status = models.Video.VideoPrivacyStatuses.DELETED
+        else:
+            if title and not video.title_locked:
+                video.title = title
+
+            availability = (entry.get("availability") or "").lower()
+            # Entries listed publicly on a channel without an availability are visible to everyone.
+            video.privacy_status = status_mapping.get(availability, models.Video.VideoPrivacyStatuses.PUBLIC)
+
+            if view_count := entry.get("view_count"):
+                video.view_count = view_count
+
+        video.updated = now
+
+        if video.pk in due_pks:
+            video.last_privacy_status_check = now
+            log_update_video_details_called(video=video, mode=mode, commit=False, result="Success - Listing")
+
+        # Mirror the change history Video.save records, bulk_update bypasses it.
+        values = {}
+        if old_title and video.title != old_title:
+            values["new_title"] = video.title
+            values["old_title"] = old_title
+        if old_privacy_status and video.privacy_status != old_privacy_status:
+            values["new_privacy_status"] = video.privacy_status
+            values["old_privacy_status"] = old_privacy_status
+        if values:
+            history.append(models.VideoHistory(video=video, **values))
+
+        updated_videos.append(video)
+
+    models.Video.objects.bulk_update(
+        updated_videos,
+        fields=[
+            "title",
+            "view_count",
+            "privacy_status",
+            "last_privacy_status_check",
+            "privacy_status_checks",
+            "system_notes",
+            "updated",
+        ],
+        batch_size=500,
+    )
+    models.VideoHistory.objects.bulk_create(history)
+
+    log.info(f"Updated {len(updated_videos)} videos from listing, {len(missing_videos)} missing from listing.")
+
+    return missing_videos
+
+
 def should_download_comments(video):
     if video.download_comments_on_index or video.download_all_comments:
         return True
@@ -501,6 +601,35 @@ def is_blocked(provider_object_id):
         return True
 
 
+def get_unindexed_ids(entries, known_run):
+    """
+    Provider ids of a flat listing, newest first, that are neither indexed nor blocked.
+
+    The listing is walked until known_run consecutive entries are already known,
+        anything after them was covered by earlier scans.
+    """
+
+    ids = [x["id"] for x in entries if x and x.get("id")]
+
+    known = set()
+    for model in [models.Video, models.VideoBlocked]:
+        known.update(model.objects.filter(provider_object_id__in=ids).values_list("provider_object_id", flat=True))
+
+    unindexed = []
+    run = 0
+    for provider_object_id in ids:
+        if provider_object_id not in known:
+            unindexed.append(provider_object_id)
+            run = 0
+            continue
+
+        run += 1
+        if run >= known_run:
+            break
+
+    return unindexed
+
+
 def block(video: models.Video):
     obj, _ = models.VideoBlocked.objects.get_or_create(
         provider_object_id=video.provider_object_id,
@@ -30,6 +30,53 @@ def get_ytdlp_args(rate_limit=None, proxies_attempted=None, retries=0, video=Non
     return kwargs
 
 
+# yt-dlp options a download profile may set, see VIDAR_DOWNLOAD_PROFILES.
+DOWNLOAD_PROFILE_OPTIONS = [
+    "concurrent_fragment_downloads",
+    "http_chunk_size",
+    "buffersize",
+    "noresizebuffer",
+    "external_downloader",
+    "external_downloader_args",
+]
+
+
+def get_download_profile_name(video):
+    """The download profile of the first of the videos playlists with one, then its channel, then the default."""
+
+    name = ""
+    if video.pk:
+        name = (
+            video.playlists.exclude(download_profile="")
+            .order_by("inserted")
+            .values_list("download_profile", flat=True)
+            .first()
+        )
+    if not name and video.channel:
+        name = video.channel.download_profile
+
+    if name and name not in app_settings.DOWNLOAD_PROFILES:
+        log.warning(f"Download profile {name=} of {video=} is not within VIDAR_DOWNLOAD_PROFILES, using the default.")
+        name = ""
+
+    return name or app_settings.DOWNLOAD_PROFILE
+
+
+def get_download_profile(name):
+    profile = app_settings.DOWNLOAD_PROFILES.get(name) or {}
+    return {k: v for k, v in profile.items() if k in DOWNLOAD_PROFILE_OPTIONS}
+
+
+def get_download_connections(dl_kwargs):
+    """
+    Connections a fragmented download opens at once. yt-dlp rate limits each of them separately,
+        external downloaders apply the rate limit to the download as a whole.
+    """
+    if dl_kwargs.get("external_downloader"):
+        return 1
+    return max(int(dl_kwargs.get("concurrent_fragment_downloads") or 1), 1)
+
+
 def get_video_downloader_args(
     video, retries=0, cache_folder=None, quality=None, rate_limit=None, video_format=None, **kwargs
 ):
@@ -66,6 +113,9 @@ def get_video_downloader_args(
 
     kwargs.setdefault("writeinfojson", True)
 
+    for option, value in get_download_profile(get_download_profile_name(video)).items():
+        kwargs.setdefault(option, value)
+
     return kwargs
 
 
@@ -156,6 +206,34 @@ def get_video_downloaded_quality_from_dlp_response(info):
             return convert_format_note_to_int(format_note)
 
 
+# The fields of a yt-dlp format read from Video.dlp_formats, everything else is left out when storing them.
+FORMAT_SUMMARY_FIELDS = [
+    "format_id",
+    "format_note",
+    "height",
+    "video_ext",
+    "vcodec",
+    "acodec",
+    "filesize",
+    "filesize_approx",
+    "tbr",
+]
+
+
+def summarize_formats(formats):
+    """
+    The formats of a yt-dlp response without their urls, fragments and http headers, for Video.dlp_formats.
+        Formats that are neither video nor audio, such as storyboards, are left out.
+    """
+
+    output = []
+    for f in formats or []:
+        if f.get("video_ext") == "none" and f.get("audio_ext") == "none":
+            continue
+        output.append({k: f[k] for k in FORMAT_SUMMARY_FIELDS if f.get(k) is not None})
+    return output
+
+
 def get_possible_qualities_from_dlp_formats(formats):
     possible_formats = set()
     for f in formats:
@@ -214,6 +292,49 @@ def get_higher_qualities_from_video_dlp_formats(dlp_formats, current_quality):
     return higher_qualities
 
 
+def _estimate_format_size(dlp_format, duration=None):
+    if size := dlp_format.get("filesize") or dlp_format.get("filesize_approx"):
+        return size
+    if dlp_format.get("tbr") and duration:
+        # tbr is in kbit/s
+        return int(dlp_format["tbr"] * 1000 / 8 * duration)
+
+
+def estimate_download_size(dlp_formats, quality=None, duration=None):
+    """
+    Estimates the bytes of downloading a video at quality, the largest video format of the best height
+        at or below quality plus the largest audio format.
+
+    Returns None when dlp_formats has no sizes, or bitrates and a duration, to estimate from.
+    """
+
+    if not dlp_formats:
+        return
+
+    videos = [x for x in dlp_formats if x.get("height") and x.get("vcodec") not in (None, "none")]
+    audios = [x for x in dlp_formats if x.get("vcodec") == "none" and x.get("acodec") != "none"]
+
+    if not videos:
+        return
+
+    heights = {x["height"] for x in videos}
+    if quality:
+        height = max((x for x in heights if x <= quality), default=min(heights))
+    else:
+        height = max(heights)
+
+    video_size = max(
+        filter(None, (_estimate_format_size(x, duration=duration) for x in videos if x["height"] == height)),
+        default=None,
+    )
+    if video_size is None:
+        return
+
+    audio_size = max(filter(None, (_estimate_format_size(x, duration=duration) for x in audios)), default=0)
+
+    return video_size + audio_size
+
+
 def get_banner_art(thumbnails):
     """extract banner artwork"""
     for i in thumbnails:
@@ -4,31 +4,40 @@ import logging
 import math
 import os
 import pathlib
-import random
 import requests.exceptions
 import time
 from functools import partial
 
 from django.db import transaction
-from django.db.models import Case, Count, F, Q, When
+from django.db.models import Case, Count, Q, When
 from django.db.utils import DataError
 from django.utils import timezone
 
 import yt_dlp
-from celery import chain, shared_task, states
+from celery import chain, chord, group, shared_task, states
 from celery.exceptions import Ignore
 from django_celery_results.models import TaskResult
 
 from vidar import app_settings, helpers, interactor, oneoffs, renamers, signals, utils
 from vidar.exceptions import FileStorageBackendHasNoMoveError
 from vidar.helpers import celery_helpers, channel_helpers, file_helpers, statistics_helpers, video_helpers
-from vidar.models import Channel, Comment, Playlist, PlaylistItem, Video
+from vidar.models import CachedFile, Channel, Comment, Playlist, PlaylistItem, Video
 from vidar.services import (
+    admission_services,
+    bandwidth_services,
+    cache_services,
     channel_services,
     crontab_services,
+    dedupe_services,
+    extraction_services,
+    image_services,
     notification_services,
+    pacing_services,
     playlist_services,
+    proxy_services,
+    reconciliation_services,
     redis_services,
+    retention_services,
     schema_services,
     video_services,
     ytdlp_services,
@@ -60,8 +69,11 @@ def update_channel_banners(self, pk):
             # ignore the task so no other state is recorded
             raise Ignore()
 
+        pacing_services.channel_banners_pacer().record_failure(throttled=pacing_services.is_throttled_exception(exc))
         raise
 
+    pacing_services.channel_banners_pacer().record_success()
+
     try:
         channel_services.set_channel_details_from_ytdlp(
             channel=channel,
@@ -80,12 +92,7 @@ def update_channel_banners(self, pk):
         log.info(f"Failed to get 3 thumbnails for {channel=}")
         raise self.retry()
 
-    if tn_url:
-        channel_services.set_thumbnail(channel=channel, url=tn_url)
-    if b_url:
-        channel_services.set_banner(channel=channel, url=b_url)
-    if tv_url:
-        channel_services.set_tvart(channel=channel, url=tv_url)
+    channel_services.set_channel_images(channel=channel, thumbnail_url=tn_url, banner_url=b_url, tvart_url=tv_url)
 
     return self.request.retries
 
@@ -94,6 +101,12 @@ def trigger_channel_scanner_tasks(channel, limit=None, wait_period=30, countdown
 
     channel.scan_history.create()
 
+    if app_settings.CHANNEL_SCAN_SINGLE_PASS:
+        if channel.index_videos or channel.index_shorts or channel.index_livestreams:
+            scan_channel_tabs.apply_async(kwargs=dict(pk=channel.pk, limit=limit), countdown=countdown)
+            countdown += wait_period
+        return countdown
+
     if channel.index_videos:
         scan_channel_for_new_videos.apply_async(kwargs=dict(pk=channel.pk, limit=limit), countdown=countdown)
         countdown += wait_period
@@ -339,41 +352,28 @@ def fully_index_channel(self, pk, limit=None):
     channel_services.recalculate_video_sort_ordering(channel=channel)
 
 
-def scan_channel_for_new_content(
-    self, channel, url, limit=None, download_video=False, is_video=False, is_short=False, is_livestream=False
-):
-
-    dl_kwargs = ytdlp_services.get_ytdlp_args()
-
-    msg_logger = partial(utils.OutputCapturer, callback_func=redis_services.channel_indexing, channel=channel)
-
-    try:
-        chan = interactor.func_with_retry(
-            url=url, limit=limit or channel.scanner_limit, logger=msg_logger(), **dl_kwargs
-        )
-    except yt_dlp.DownloadError as exc:
-
-        if channel_services.apply_exception_status(channel=channel, exc=exc):
-
-            self.update_state(state=states.FAILURE, meta=f"Channel status changed to {channel.status=}")
-            # ignore the task so no other state is recorded
-            raise Ignore()
-
-        raise
+def _extract_unindexed_entries(channel, entries, extract):
+    # Full details are only extracted for videos the listing shows are new.
+    video_ids = video_services.get_unindexed_ids(
+        entries=entries, known_run=app_settings.CHANNEL_SCAN_INCREMENTAL_KNOWN_RUN
+    )
+    log.info(f"Incremental scan found {len(video_ids)} new videos for {channel=}")
+    return [extract(f"https://www.youtube.com/watch?v={video_id}") for video_id in video_ids]
 
-    if not chan:
-        return
 
-    if not chan.get("entries"):
-        log.info(f"No videos found for {channel=}")
-        return
+def _ingest_scanned_entries(
+    channel, entries, download_video=False, is_video=False, is_short=False, is_livestream=False
+):
 
-    for video_data in chan["entries"]:
+    for video_data in entries:
 
         # Videos premiering in the future cannot be downloaded.
         if not video_data:
             continue
 
+        # Full extractions of scans are reused by the tasks that follow, such as update_video_details.
+        extraction_services.store(video_data)
+
         if not channel.uploader_id and video_data["uploader_id"]:
             channel.uploader_id = video_data["uploader_id"]
             channel.save(update_fields=["uploader_id"])
@@ -433,6 +433,65 @@ def scan_channel_for_new_content(
         else:
             log.info("Video not permitted, skipping.")
 
+
+def scan_channel_for_new_content(
+    self, channel, url, limit=None, download_video=False, is_video=False, is_short=False, is_livestream=False
+):
+
+    dl_kwargs = ytdlp_services.get_ytdlp_args()
+
+    msg_logger = partial(utils.OutputCapturer, callback_func=redis_services.channel_indexing, channel=channel)
+
+    incremental = app_settings.CHANNEL_SCAN_INCREMENTAL
+
+    try:
+        if incremental:
+            chan = interactor.func_with_retry(
+                url=url,
+                func=interactor.channel_listing,
+                playlistend=limit or channel.scanner_limit,
+                logger=msg_logger(),
+                **dl_kwargs,
+            )
+        else:
+            chan = interactor.func_with_retry(
+                url=url, limit=limit or channel.scanner_limit, logger=msg_logger(), **dl_kwargs
+            )
+    except yt_dlp.DownloadError as exc:
+
+        if channel_services.apply_exception_status(channel=channel, exc=exc):
+
+            self.update_state(state=states.FAILURE, meta=f"Channel status changed to {channel.status=}")
+            # ignore the task so no other state is recorded
+            raise Ignore()
+
+        raise
+
+    if not chan:
+        return
+
+    if not chan.get("entries"):
+        log.info(f"No videos found for {channel=}")
+        return
+
+    entries = chan["entries"]
+
+    if incremental:
+        entries = _extract_unindexed_entries(
+            channel=channel,
+            entries=entries,
+            extract=lambda x: interactor.video_details(url=x, ignoreerrors=True, logger=msg_logger(), **dl_kwargs),
+        )
+
+    _ingest_scanned_entries(
+        channel=channel,
+        entries=entries,
+        download_video=download_video,
+        is_video=is_video,
+        is_short=is_short,
+        is_livestream=is_livestream,
+    )
+
     return True
 
 
@@ -516,6 +575,130 @@ def scan_channel_for_new_livestreams(self, pk, limit=None):
     return output
 
 
+@shared_task(bind=True, queue="queue-vidar")
+@celery_helpers.prevent_asynchronous_task_execution(lock_key="channel-scan-{pk}")
+def scan_channel_tabs(self, pk, limit=None):
+    """Scans every indexed tab of a channel in one pass, through one yt-dlp session."""
+
+    channel = Channel.objects.get(pk=pk)
+
+    targets = {}
+    if channel.index_videos:
+        targets["Videos"] = {
+            "url": channel.url,
+            "limit": limit or channel.scanner_limit,
+            "download_video": channel.download_videos,
+            "video_field": "is_video",
+            "lock_key": f"channel-scan-videos-{pk}",
+            "scanned_field": "last_scanned",
+        }
+    if channel.index_shorts:
+        targets["Shorts"] = {
+            "url": channel.shorts_url,
+            "limit": limit or channel.scanner_limit_shorts,
+            "download_video": channel.download_shorts,
+            "video_field": "is_short",
+            "lock_key": f"channel-scan-shorts-{pk}",
+            "scanned_field": "last_scanned_shorts",
+            "missing_tab": ("does not have a shorts tab", ["index_shorts", "download_shorts"]),
+        }
+    if channel.index_livestreams:
+        targets["Livestreams"] = {
+            "url": channel.livestreams_url,
+            "limit": limit or channel.scanner_limit_livestreams,
+            "download_video": channel.download_livestreams,
+            "video_field": "is_livestream",
+            "lock_key": f"channel-scan-livestreams-{pk}",
+            "scanned_field": "last_scanned_livestreams",
+            "missing_tab": ("not currently live", ["index_livestreams", "download_livestreams"]),
+        }
+
+    # Tabs being scanned by their own task, scan_channel_for_new_videos and so on, are left to that task.
+    locked = []
+    for target_name, target_data in list(targets.items()):
+        if celery_helpers.task_lock_acquire(target_data["lock_key"]):
+            locked.append(target_data["lock_key"])
+        else:
+            log.info(f"{target_name} of {channel=} is already being scanned")
+            del targets[target_name]
+
+    try:
+        if not targets:
+            log.info(f"No tabs to scan for {channel=}")
+            return
+        return _scan_channel_tabs(self, channel=channel, targets=targets)
+    finally:
+        for lock_key in locked:
+            celery_helpers.task_lock_release(lock_key)
+
+
+def _scan_channel_tabs(self, channel, targets):
+    incremental = app_settings.CHANNEL_SCAN_INCREMENTAL
+
+    dl_kwargs = ytdlp_services.get_ytdlp_args()
+    msg_logger = partial(utils.OutputCapturer, callback_func=redis_services.channel_indexing, channel=channel)
+
+    scanned = {}
+    failure = None
+
+    with interactor.channel_scan_session(incremental=incremental, logger=msg_logger(), **dl_kwargs) as ydl:
+        for target_name, target_data in targets.items():
+            try:
+                chan = interactor.channel_scan_tab(ydl, url=target_data["url"], limit=target_data["limit"])
+            except yt_dlp.DownloadError as exc:
+
+                if channel_services.apply_exception_status(channel=channel, exc=exc):
+                    self.update_state(state=states.FAILURE, meta=f"Channel status changed to {channel.status=}")
+                    # ignore the task so no other state is recorded
+                    raise Ignore()
+
+                message, fields = target_data.get("missing_tab", ("", []))
+                if message and message in str(exc):
+                    for field in fields:
+                        setattr(channel, field, False)
+
+                log.exception(f"Failure to scan {target_name} of {channel=}")
+                failure = failure or exc
+                continue
+
+            if not chan:
+                continue
+
+            entries = chan["entries"]
+            if incremental:
+                entries = _extract_unindexed_entries(
+                    channel=channel,
+                    entries=entries,
+                    extract=lambda x: ydl.extract_info(x, download=False),
+                )
+
+            scanned[target_name] = entries
+
+    for target_name, entries in scanned.items():
+        target_data = targets[target_name]
+        _ingest_scanned_entries(
+            channel=channel,
+            entries=entries,
+            download_video=target_data["download_video"],
+            **{target_data["video_field"]: True},
+        )
+
+    now = timezone.now()
+    update_fields = []
+    for target_name, target_data in targets.items():
+        if target_name in scanned:
+            setattr(channel, target_data["scanned_field"], now)
+            update_fields.append(target_data["scanned_field"])
+        update_fields.extend(target_data.get("missing_tab", ("", []))[1])
+
+    channel.save(update_fields=update_fields)
+
+    if failure:
+        raise failure
+
+    return list(scanned)
+
+
 @shared_task(queue="queue-vidar")
 def automated_archiver():
     # NOTE: Update logic in views.download_queue if you change it below.
@@ -548,13 +731,17 @@ def automated_archiver():
         channel.swap_index_livestreams_after = None
         channel.save()
 
-    max_automated_downloads = app_settings.AUTOMATED_DOWNLOADS_PER_TASK_LIMIT
-    total_downloads = 0
-    max_daily_automated_downloads = app_settings.AUTOMATED_DOWNLOADS_DAILY_LIMIT
-    todays_downloads = Video.objects.filter(date_downloaded__date=timezone.localdate()).exclude(file="").count()
+    if app_settings.MEDIA_CACHE_QUOTA:
+        # Frees what it can of the quota before it limits the downloads queued.
+        cache_services.collect_garbage()
+
+    admission = admission_services.DownloadAdmission()
 
-    if max_daily_automated_downloads and todays_downloads >= max_daily_automated_downloads:
-        log.info(f"Max daily automated downloads reached. {todays_downloads=} >= {max_daily_automated_downloads=}")
+    if admission.daily_downloads is not None and admission.daily_downloads <= 0:
+        log.info(
+            f"Max daily automated downloads reached. "
+            f"{admission.daily_downloads=} remaining of {app_settings.AUTOMATED_DOWNLOADS_DAILY_LIMIT=}"
+        )
         return
 
     for playlist in Playlist.objects.filter(hidden=False).order_by("inserted"):
@@ -568,7 +755,7 @@ def automated_archiver():
         for pli in public_playlist_videos:
             video = pli.video
 
-            if total_downloads >= max_automated_downloads:
+            if admission.is_full:
                 break
 
             if video.download_errors.exists():
@@ -591,16 +778,16 @@ def automated_archiver():
                 )
                 continue
 
+            if not admission.admits(video):
+                continue
+
             download_provider_video.delay(
                 pk=video.pk,
                 task_source=f"automated_archiver - Playlist Scanner: {playlist}",
                 requested_by=f"Playlist: {playlist!r}",
             )
 
-            total_downloads += 1
-
-            if utils.should_halve_download_limit(duration=video.duration):
-                max_automated_downloads //= 2
+            admission.admit(video)
 
     for channel in Channel.objects.active().filter(full_archive=True):
 
@@ -629,9 +816,9 @@ def automated_archiver():
             channel_services.full_archiving_completed(channel=channel)
             notification_services.full_archiving_completed(channel=channel)
 
-        for video in full_archive_videos_to_process.order_by("upload_date"):
+        for video in full_archive_videos_to_process.order_by("upload_date", "pk"):
 
-            if total_downloads >= max_automated_downloads:
+            if admission.is_full:
                 break
 
             if video.download_errors.exists():
@@ -641,16 +828,16 @@ def automated_archiver():
             if celery_helpers.is_object_locked(obj=video):
                 continue
 
+            if not admission.admits(video):
+                continue
+
             download_provider_video.delay(
                 pk=video.pk,
                 task_source="automated_archiver - Channel Full Archive",
                 requested_by=f"Full Archive: {channel!r}",
             )
 
-            total_downloads += 1
-
-            if utils.should_halve_download_limit(duration=video.duration):
-                max_automated_downloads //= 2
+            admission.admit(video)
 
     # defaults are 5 errors a day, lets set it to 14 days worth of attempts.
     maximum_attempts_erroring_downloads = app_settings.VIDEO_DOWNLOAD_ERROR_ATTEMPTS
@@ -662,9 +849,9 @@ def automated_archiver():
         total_download_errors__gte=1,
     )
 
-    for video in videos_with_download_errors.order_by("upload_date"):
+    for video in videos_with_download_errors.order_by("upload_date", "pk"):
 
-        if total_downloads >= max_automated_downloads:
+        if admission.is_full:
             break
 
         if celery_helpers.is_object_locked(obj=video):
@@ -685,12 +872,12 @@ def automated_archiver():
             log.debug(f"{video=} retried too soon, waiting longer.")
             continue
 
-        download_provider_video.delay(pk=video.pk, task_source="automated_archiver - Video Download Errors Attempts")
+        if not admission.admits(video):
+            continue
 
-        total_downloads += 1
+        download_provider_video.delay(pk=video.pk, task_source="automated_archiver - Video Download Errors Attempts")
 
-        if utils.should_halve_download_limit(duration=video.duration):
-            max_automated_downloads //= 2
+        admission.admit(video)
 
     if app_settings.VIDEO_AUTO_DOWNLOAD_LIVE_AMQ_WHEN_DETECTED:
 
@@ -703,10 +890,10 @@ def automated_archiver():
                 system_notes__max_quality_upgraded__isnull=True,
             )
             .exclude(file="")
-            .order_by("upload_date")
+            .order_by("upload_date", "pk")
         ):
 
-            if total_downloads >= max_automated_downloads:
+            if admission.is_full:
                 break
 
             highest_format = ytdlp_services.get_highest_quality_from_video_dlp_formats(video.dlp_formats)
@@ -717,6 +904,9 @@ def automated_archiver():
             if celery_helpers.is_object_locked(obj=video):
                 continue
 
+            if not admission.admits(video):
+                continue
+
             log.info(f"Videos live quality is better than we are expecting. Attempting an upgrade {video=}")
 
             video.system_notes["max_quality_upgraded"] = timezone.now().isoformat()
@@ -726,10 +916,7 @@ def automated_archiver():
                 pk=video.pk, task_source="automated_archiver - Video Quality Changed Afterwards"
             )
 
-            total_downloads += 1
-
-            if utils.should_halve_download_limit(duration=video.duration):
-                max_automated_downloads //= 2
+            admission.admit(video)
 
     hours = app_settings.VIDEO_LIVE_DOWNLOAD_RETRY_HOURS
     hours_ago = timezone.now() - timezone.timedelta(hours=hours)
@@ -764,10 +951,19 @@ def automated_archiver():
 )
 @celery_helpers.prevent_asynchronous_task_execution(lock_key="download-vidar-video-{pk}")
 def download_provider_video(
-    self, pk, quality=None, automated_quality_upgrade=False, task_source="Unknown", requested_by=None
+    self,
+    pk,
+    quality=None,
+    automated_quality_upgrade=False,
+    task_source="Unknown",
+    requested_by=None,
+    proxy_failures=0,
 ):
 
     download_started = timezone.now()
+
+    # Retries caused by a failing proxy are not counted against the video.
+    retries = self.request.retries - proxy_failures
     video = Video.objects.get(pk=pk)
 
     log.info(f"Download requested for video {video=}")
@@ -796,9 +992,26 @@ def download_provider_video(
     dl_kwargs = ytdlp_services.get_video_downloader_args(
         quality=selected_quality,
         cache_folder=cache_folder,
-        retries=self.request.retries,
+        retries=retries,
+        video=video,
+    )
+
+    download_profile = ytdlp_services.get_download_profile_name(video)
+
+    # yt-dlp resumes .part files left by a previous attempt at the same quality, until they age out of MEDIA_CACHE.
+    download_stem = cache_services.download_stem(video=video, quality=selected_quality, cache_folder=cache_folder)
+    cache_services.track(download_stem, stage=CachedFile.Stages.DOWNLOAD, video=video)
+    if resumed_bytes := cache_services.partial_bytes(download_stem):
+        log.info(f"Resuming download of {video=} from {resumed_bytes} bytes already downloaded.")
+
+    bandwidth_lease = bandwidth_services.lease_for(
         video=video,
+        quality=selected_quality,
+        rate_limit=dl_kwargs.get("ratelimit"),
+        connections=ytdlp_services.get_download_connections(dl_kwargs),
     )
+    if bandwidth_lease:
+        dl_kwargs["ratelimit"] = bandwidth_lease.acquire()
 
     video.save_download_kwargs(dl_kwargs)
 
@@ -806,7 +1019,11 @@ def download_provider_video(
 
     try:
         info, used_dl_kwargs = interactor.video_download(
-            url=video.url, local_url=video.get_absolute_url(), instance=video, **dl_kwargs
+            url=video.url,
+            local_url=video.get_absolute_url(),
+            instance=video,
+            bandwidth_lease=bandwidth_lease,
+            **dl_kwargs,
         )
     except yt_dlp.DownloadError as exc:
 
@@ -819,15 +1036,27 @@ def download_provider_video(
             quality=quality,
             selected_quality=selected_quality,
             cache_folder=cache_folder,
-            retries=self.request.retries,
+            retries=retries,
         ):
             signals.video_download_failed.send(sender=Video, instance=video, dl_kwargs=dl_kwargs, exc=exc)
             return
 
         signals.video_download_retry.send(sender=Video, instance=video, dl_kwargs=dl_kwargs, exc=exc)
 
+        if (
+            "proxy" in dl_kwargs
+            and proxy_failures < app_settings.PROXY_FAILOVER_RETRIES
+            and proxy_services.is_proxy_exception(exc)
+        ):
+            log.info(f"Download of {video=} failed through its proxy, retrying with another proxy.")
+            raise self.retry(
+                countdown=1 * 60,
+                kwargs={**self.request.kwargs, "proxy_failures": proxy_failures + 1},
+                max_retries=self.max_retries + proxy_failures + 1,
+            )
+
         # Retry in 1 minutes.
-        raise self.retry(countdown=1 * 60)
+        raise self.retry(countdown=1 * 60, max_retries=self.max_retries + proxy_failures)
 
     except Exception as exc:  # noqa: E722
         # All other exceptions needs to unlock the video.
@@ -835,7 +1064,12 @@ def download_provider_video(
         signals.video_download_failed.send(sender=Video, instance=video, dl_kwargs=dl_kwargs, exc=exc)
         raise
 
+    finally:
+        if bandwidth_lease:
+            bandwidth_lease.release()
+
     video.set_details_from_yt_dlp_response(info)
+    extraction_services.store(info)
 
     try:
         video.quality = ytdlp_services.get_video_downloaded_quality_from_dlp_response(info)
@@ -870,6 +1104,13 @@ def download_provider_video(
         overwrite_formats=False,
     )
 
+    download_finished = timezone.now()
+    download_seconds = (download_finished - download_started).total_seconds()
+    try:
+        downloaded_bytes = filepath.stat().st_size
+    except OSError:
+        downloaded_bytes = downloaded_file_data.get("filesize") or downloaded_file_data.get("filesize_approx") or 0
+
     video.set_latest_download_stats(
         status="success",
         quality=video.quality,
@@ -879,8 +1120,19 @@ def download_provider_video(
         used_dl_kwargs=used_dl_kwargs,
         raw_file_path=str(filepath),
         download_started=download_started,
-        download_finished=timezone.now(),
+        download_finished=download_finished,
         task_source=task_source,
+        download_profile=download_profile,
+        downloaded_bytes=downloaded_bytes,
+        resumed_bytes=resumed_bytes,
+        throughput=int(downloaded_bytes / download_seconds) if download_seconds else None,
+    )
+
+    admission_services.DailyUsage().record(
+        video=video,
+        downloads=int(not automated_quality_upgrade),
+        downloaded_bytes=downloaded_bytes,
+        download_seconds=download_seconds,
     )
 
     signals.video_download_finished.send(sender=Video, instance=video, dl_kwargs=dl_kwargs)
@@ -994,6 +1246,8 @@ def write_file_to_storage(filepath, pk, field_name):
                     video.audio.save(final_filename, fo, save=False)
 
         if field_name == "file" and video.file:
+            # The content changed, dedupe_services hashes it again.
+            video.file_hash = ""
             try:
                 video.file_size = filepath.stat().st_size
             except FileNotFoundError:  # pragma: no cover
@@ -1017,9 +1271,16 @@ def delete_cached_file(filepath):
         os.unlink(filepath)
     except OSError:  # pragma: no cover
         log.exception("Failure to delete cached file.")
+    cache_services.forget(filepath)
     return True
 
 
+@shared_task(bind=True, queue="queue-vidar")
+@celery_helpers.prevent_asynchronous_task_execution(lock_key="clean-media-cache", lock_expiry=60 * 60)
+def clean_media_cache(self):
+    return cache_services.collect_garbage()
+
+
 @shared_task(
     autoretry_for=(requests.exceptions.ConnectionError,),
     retry_kwargs={"max_retries": 3},
@@ -1075,6 +1336,9 @@ def video_downloaded_successfully(self, pk):
     if app_settings.LOAD_SPONSORBLOCK_DATA_ON_DOWNLOAD:
         load_sponsorblock_data.delay(pk=pk)
 
+    # Before the lock is released, collect_garbage leaves the files of locked videos alone.
+    cache_services.release(video=video)
+
     celery_helpers.object_lock_release(obj=video)
 
 
@@ -1204,10 +1468,15 @@ def convert_video_to_audio(self, pk, filepath=None, return_filepath=False):
     if not local_filepath:
         local_filepath, was_remote = app_settings.ENSURE_FILE_IS_LOCAL(file_field=video.file)
 
+    if was_remote:
+        cache_services.track(local_filepath, stage=CachedFile.Stages.LOCAL_COPY, video=video)
+
     output_filepath = app_settings.CONVERT_FILE_TO_AUDIO_FORMAT(filepath=local_filepath)
+    cache_services.track(output_filepath, stage=CachedFile.Stages.CONVERSION, video=video)
 
     if was_remote:
         os.unlink(local_filepath)
+        cache_services.forget(local_filepath)
 
     with transaction.atomic():
         video = Video.objects.select_for_update().get(id=pk)
@@ -1429,11 +1698,9 @@ def monthly_maintenances(self):
     signals.pre_monthly_maintenance.send(sender=self.__class__, instance=self)
 
     if app_settings.MONTHLY_CHANNEL_UPDATE_BANNERS:
-        yt_ratelimit = app_settings.CHANNEL_BANNER_RATE_LIMIT
-        countdown = 0
+        countdowns = pacing_services.channel_banners_pacer().countdowns()
         for channel in Channel.objects.indexing_enabled():
-            update_channel_banners.apply_async(args=[channel.pk], countdown=countdown)
-            countdown += yt_ratelimit
+            update_channel_banners.apply_async(args=[channel.pk], countdown=next(countdowns))
 
     if app_settings.MONTHLY_CHANNEL_CRONTAB_BALANCING:
         log.info("Balancing long-term channel scans based on upload schedule seen")
@@ -1590,6 +1857,10 @@ def update_video_details(self, pk, download_file=False, dlp_output=None, mode="m
 
     log.info(f"Checking status and details of {video=}")
 
+    # Counted when it runs rather than when queued, so manual and fallback calls use up the daily budget too.
+    if not self.request.retries:
+        pacing_services.video_details_pacer().consume()
+
     dl_kwargs = ytdlp_services.get_ytdlp_args(video=video)
     if app_settings.SAVE_INFO_JSON_FILE and video.file:
         dl_kwargs["writeinfojson"] = True
@@ -1598,7 +1869,10 @@ def update_video_details(self, pk, download_file=False, dlp_output=None, mode="m
 
     if not dlp_output:
         try:
-            dlp_output = interactor.video_details(video.url, quiet=True, instance=video, **dl_kwargs)
+            # Manual updates are requested to see the video as it is now.
+            dlp_output = extraction_services.video_details(
+                video=video, cached=mode != "manual", quiet=True, **dl_kwargs
+            )
         except yt_dlp.DownloadError as exc:
             # TODO: If video is blocked in country and we have other proxies, try those somehow?
             if video.apply_privacy_status_based_on_dlp_exception_message(exc):
@@ -1615,6 +1889,9 @@ def update_video_details(self, pk, download_file=False, dlp_output=None, mode="m
                 )
                 self.update_state(state=states.FAILURE, meta="Sign-In Required")
                 raise Ignore()
+            pacing_services.video_details_pacer().record_failure(
+                throttled=pacing_services.is_throttled_exception(exc)
+            )
             if self.request.retries == 3:
                 log.info("retrying update_video_details in one hour")
                 video_services.log_update_video_details_called(
@@ -1627,6 +1904,7 @@ def update_video_details(self, pk, download_file=False, dlp_output=None, mode="m
         raise ValueError("No output from yt-dlp")
 
     video_services.log_update_video_details_called(video=video, mode=mode, commit=True, result="Success")
+    pacing_services.video_details_pacer().record_success()
 
     title = dlp_output["title"].lower()
     if title in ["[private video]", "[deleted video]"]:
@@ -1679,13 +1957,20 @@ def update_video_details(self, pk, download_file=False, dlp_output=None, mode="m
 
         if writeinfojson:
 
-            downloaded_file_data = dlp_output["requested_downloads"][0]
-
-            video_services.save_infojson_file(
-                video=video,
-                downloaded_file_data=downloaded_file_data,
-                overwrite_formats=False,
-            )
+            if requested_downloads := dlp_output.get("requested_downloads"):
+                video_services.save_infojson_file(
+                    video=video,
+                    downloaded_file_data=requested_downloads[0],
+                    overwrite_formats=False,
+                )
+            else:
+                # A reused extraction wrote no .info.json, it is the info dict itself.
+                video_services.save_infojson_file(
+                    video=video,
+                    downloaded_file_data=None,
+                    overwrite_formats=False,
+                    infojson_data=dlp_output,
+                )
 
     if not video.thumbnail:
         load_video_thumbnail.apply_async(args=[pk, dlp_output.get("thumbnail")], countdown=30)
@@ -1743,129 +2028,188 @@ def load_sponsorblock_data(self, pk):
         raise
 
 
-@shared_task(bind=True, queue="queue-vidar")
-def daily_maintenances(self):
-
-    log.info("Running daily maintenances")
+def _maintenance_thumbnails_queryset():
+    return Video.objects.archived().filter(
+        thumbnail="",
+        privacy_status__in=Video.VideoPrivacyStatuses_Publicly_Visible,
+    )
 
-    signals.pre_daily_maintenance.send(sender=self.__class__, instance=self)
 
+def _maintenance_thumbnails(videos):
     # Sometimes thumbnails can fail to download during the video download process.
-    for video in Video.objects.archived().filter(
-        thumbnail="",
-        privacy_status__in=Video.VideoPrivacyStatuses_Publicly_Visible,
-    ):
+    # Extracted concurrently, failures are logged and the video is tried again the next day.
+    thumbnail_urls = {}
+    for video, data in extraction_services.video_details_many(videos).items():
+        if url := (data or {}).get("thumbnail"):
+            thumbnail_urls[video] = url
+
+    # Downloaded concurrently, a failed download is retried by set_thumbnail itself.
+    images = image_services.fetch_many(thumbnail_urls.values())
+
+    for video, url in thumbnail_urls.items():
         try:
-            data = interactor.video_details(video.url)
-            if url := data.get("thumbnail"):
-                log.info(f"Setting thumbnail on {video=}")
-                video_services.set_thumbnail(video=video, url=url)
+            log.info(f"Setting thumbnail on {video=}")
+            video_services.set_thumbnail(video=video, url=url, image=images.get(url))
         except requests.exceptions.RequestException:
             log.exception("Daily maintenance failure to set thumbnail")
 
+
+def _maintenance_mark_for_deletion_queryset():
+    return Video.objects.filter(mark_for_deletion=True)
+
+
+def _maintenance_mark_for_deletion(videos):
     # When manually adding a video the user has an option to mark the video for deletion.
     # The purpose for this is like downloading music. I download the resulting mp3 to my
     #   phone and then delete it from this system.
-    for video in Video.objects.filter(mark_for_deletion=True):
+    for video in videos:
         try:
             video_services.delete_video(video=video)
             log.info(f"Video marked for deletion has been deleted: {video=} {video.mark_for_deletion=}")
         except:  # noqa: E722
             log.exception(f"Failed to delete mark_for_deletion=True {video=}")
 
+
+def _maintenance_channel_audio_queryset():
+    return Channel.objects.filter(convert_videos_to_mp3=True)
+
+
+def _maintenance_channel_audio(channels):
     # Ensure channels expecting all videos to have audio, has audio.
-    for channel in Channel.objects.filter(convert_videos_to_mp3=True):
+    for channel in channels:
         for video in channel.videos.filter(audio="").exclude(file=""):
             log.info(f"Converting channel video to mp3 {video!r}")
             convert_video_to_audio.delay(video.pk)
 
+
+def _maintenance_playlist_audio_queryset():
+    return Playlist.objects.filter(convert_to_audio=True)
+
+
+def _maintenance_playlist_audio(playlists):
     # Ensure playlists expecting all videos to have audio, has audio.
-    for playlist in Playlist.objects.filter(convert_to_audio=True):
+    for playlist in playlists:
         for video in playlist.videos.filter(audio="").exclude(file=""):
             log.info(f"Converting playlist video to mp3 {video!r}")
             convert_video_to_audio.delay(video.pk)
 
-    qs = Video.objects.filter(convert_to_audio=True, audio="").exclude(file="")
-    for video in qs:
+
+def _maintenance_video_audio_queryset():
+    return Video.objects.filter(convert_to_audio=True, audio="").exclude(file="")
+
+
+def _maintenance_video_audio(videos):
+    for video in videos:
         log.info(f"Converting direct video to mp3 {video!r}")
         convert_video_to_audio.delay(video.pk)
 
+
+def _maintenance_related_videos_queryset():
     age = timezone.now() - timezone.timedelta(days=14)
-    for video in Video.objects.archived().filter(related__isnull=True, date_added_to_system__gte=age):
-        video.search_description_for_related_videos()
+    return Video.objects.archived().filter(related__isnull=True, date_added_to_system__gte=age)
 
-    for channel in Channel.objects.filter(
-        Q(delete_videos_after_days__gt=0) | Q(delete_shorts_after_days__gt=0) | Q(delete_livestreams_after_days__gt=0)
-    ):
-        if channel.delete_videos_after_days:
-            dtr = timezone.now() - timezone.timedelta(days=channel.delete_videos_after_days)
-            deletable_videos = channel.videos.filter(
-                is_video=True, date_downloaded__lt=dtr, starred__isnull=True
-            ).exclude(file="")
-            for video in deletable_videos:
-                try:
-                    video_services.delete_video(video=video, keep_record=True)
-                except ValueError:
-                    log.exception("Failed to delete video")
-
-        if channel.delete_shorts_after_days:
-            dtr = timezone.now() - timezone.timedelta(days=channel.delete_shorts_after_days)
-            deletable_videos = channel.videos.filter(
-                is_short=True, date_downloaded__lt=dtr, starred__isnull=True
-            ).exclude(file="")
-            for video in deletable_videos:
-                try:
-                    video_services.delete_video(video=video, keep_record=True)
-                except ValueError:
-                    log.exception("Failed to delete video")
-
-        if channel.delete_livestreams_after_days:
-            dtr = timezone.now() - timezone.timedelta(days=channel.delete_livestreams_after_days)
-            deletable_videos = channel.videos.filter(
-                is_livestream=True, date_downloaded__lt=dtr, starred__isnull=True
-            ).exclude(file="")
-            for video in deletable_videos:
-                try:
-                    video_services.delete_video(video=video, keep_record=True)
-                except ValueError:
-                    log.exception("Failed to delete video")
-
-    for channel in Channel.objects.all():
-        channel_services.recalculate_video_sort_ordering(channel=channel)
-
-    for channel in Channel.objects.filter(
-        Q(delete_videos_after_watching=True)
-        | Q(delete_shorts_after_watching=True)
-        | Q(delete_livestreams_after_watching=True)
-    ):
-        channel_videos_base_qs = (
-            channel.videos.exclude(file="")
-            .annotate(percentage_of_video=F("duration") * 0.9)
-            .filter(starred__isnull=True, user_playback_history__seconds__gte=F("percentage_of_video"))
-        )
 
-        if channel.delete_videos_after_watching:
-            for video in channel_videos_base_qs.filter(is_video=True):
-                try:
-                    video_services.delete_video(video=video, keep_record=True)
-                except ValueError:
-                    log.exception("Failed to delete video")
+def _maintenance_related_videos(videos):
+    for video in videos:
+        try:
+            video.search_description_for_related_videos()
+        except Exception:
+            log.exception(f"Daily maintenance failure to search related videos of {video=}")
 
-        if channel.delete_shorts_after_watching:
-            for short in channel_videos_base_qs.filter(is_short=True):
-                try:
-                    video_services.delete_video(video=short, keep_record=True)
-                except ValueError:
-                    log.exception("Failed to delete video")
 
-        if channel.delete_livestreams_after_watching:
-            for livestream in channel_videos_base_qs.filter(is_livestream=True):
-                try:
-                    video_services.delete_video(video=livestream, keep_record=True)
-                except ValueError:
-                    log.exception("Failed to delete video")
+def _maintenance_retention(videos):
+    # Channel age and watched based deletions, computed across all channels at once.
+    retention_services.delete_videos_keeping_records(videos)
 
-    signals.post_daily_maintenance.send(sender=self.__class__, instance=self)
+
+def _maintenance_sort_ordering_queryset():
+    return Channel.objects.all()
+
+
+def _maintenance_sort_ordering(channels):
+    for channel in channels:
+        try:
+            channel_services.recalculate_video_sort_ordering(channel=channel)
+        except Exception:
+            log.exception(f"Daily maintenance failure to recalculate sort ordering of {channel=}")
+
+
+# Each section is chunked by primary key independently of the others.
+#   section name: (queryset function, function applied to each chunk)
+DAILY_MAINTENANCE_SECTIONS = {
+    "thumbnails": (_maintenance_thumbnails_queryset, _maintenance_thumbnails),
+    "mark_for_deletion": (_maintenance_mark_for_deletion_queryset, _maintenance_mark_for_deletion),
+    "channel_audio": (_maintenance_channel_audio_queryset, _maintenance_channel_audio),
+    "playlist_audio": (_maintenance_playlist_audio_queryset, _maintenance_playlist_audio),
+    "video_audio": (_maintenance_video_audio_queryset, _maintenance_video_audio),
+    "related_videos": (_maintenance_related_videos_queryset, _maintenance_related_videos),
+    "retention": (retention_services.get_deletable_videos, _maintenance_retention),
+    "sort_ordering": (_maintenance_sort_ordering_queryset, _maintenance_sort_ordering),
+}
+
+
+@shared_task(bind=True, queue="queue-vidar")
+def daily_maintenances(self):
+
+    log.info("Running daily maintenances")
+
+    signals.pre_daily_maintenance.send(sender=self.__class__, instance=self)
+
+    header = [daily_maintenance_section.si(section=section) for section in DAILY_MAINTENANCE_SECTIONS]
+    chord(header)(daily_maintenances_finished.si())
+
+
+@shared_task(bind=True, queue="queue-vidar")
+@celery_helpers.prevent_asynchronous_task_execution(
+    lock_key="daily-maintenance-{section}", lock_expiry=4 * 60 * 60, mark_result_failed_on_lock_failure=False
+)
+def daily_maintenance_section(self, section, chunk_size=None):
+    """Processes one section of the daily maintenances in chunks of primary keys.
+
+    The last processed primary key is persisted after each chunk, a section that was interrupted
+        resumes from there the next time it runs.
+
+    Sections never fail, a failing chunk is logged and skipped and a section already running returns,
+        otherwise the chord would never call daily_maintenances_finished."""
+
+    queryset_func, func = DAILY_MAINTENANCE_SECTIONS[section]
+    chunk_size = chunk_size or app_settings.DAILY_MAINTENANCE_CHUNK_SIZE
+
+    cursor_key = f"daily-maintenance-cursor-{section}"
+    cursor = celery_helpers.get_task_cursor(cursor_key) or 0
+    if cursor:
+        log.debug(f"Resuming daily maintenance {section=} after pk={cursor}")
+
+    processed = 0
+    while True:
+        chunk = list(queryset_func().filter(pk__gt=cursor).order_by("pk")[:chunk_size])
+        if not chunk:
+            break
+
+        try:
+            func(chunk)
+        except Exception:
+            log.exception(f"Daily maintenance {section=} failed on chunk {chunk[0].pk}-{chunk[-1].pk}, skipping it.")
+
+        cursor = chunk[-1].pk
+        processed += len(chunk)
+        celery_helpers.set_task_cursor(cursor_key, cursor)
+
+        self.update_state(state="PROGRESS", meta={"section": section, "processed": processed, "cursor": cursor})
+
+        if len(chunk) < chunk_size:
+            break
+
+    celery_helpers.clear_task_cursor(cursor_key)
+
+    log.debug(f"Daily maintenance {section=} finished, {processed=}")
+
+    return processed
+
+
+@shared_task(queue="queue-vidar")
+def daily_maintenances_finished():
+    signals.post_daily_maintenance.send(sender=daily_maintenances.__class__, instance=daily_maintenances)
 
 
 @shared_task(queue="queue-vidar")
@@ -1895,66 +2239,122 @@ def update_video_statuses_and_details():
         .order_by("-zero_quality_first", "-last_checked_null_first", "last_privacy_status_check", "upload_date")
     )
 
-    videos_to_check_per_day = math.ceil(videos_that_are_checkable.count() / checks_video_age_days)
-
-    tasks_completed_today = TaskResult.objects.filter(
-        task_name="vidar.tasks.update_video_details",
-        date_done__date=timezone.localdate(),
-    ).count()
+    pacer = pacing_services.video_details_pacer()
 
-    tasks_to_complete_today = videos_to_check_per_day - tasks_completed_today
+    # The checkable total only moves slowly, it is counted once per day and kept with the pacing state.
+    videos_to_check_per_day = pacer.get_daily_budget(
+        lambda: math.ceil(videos_that_are_checkable.count() / checks_video_age_days)
+    )
 
     # Lowered to 16 hours and set task to run 5am to 9pm
     videos_to_check_per_hour = math.ceil(videos_to_check_per_day / app_settings.PRIVACY_STATUS_CHECK_HOURS_PER_DAY)
     videos_to_check_per_ten_minutes = math.ceil(videos_to_check_per_hour / 6)
 
-    log.info(f"{videos_that_are_checkable.count()=}")
+    if videos_to_check_per_ten_minutes < 5:
+        pacer.interval = 46
+        pacer.interval_max = 143
+
+    # Budget and spacing stretch while the provider is failing or throttling update_video_details.
+    videos_to_check_today = pacer.effective_budget(videos_to_check_per_day)
+    if pacer.penalty > 1:
+        videos_to_check_per_ten_minutes = math.ceil(videos_to_check_per_ten_minutes / pacer.penalty)
+
+    tasks_completed_today = pacer.consumed_today()
+    tasks_to_complete_today = videos_to_check_today - tasks_completed_today
+
     log.info(
         f"Videos to check settings period:{checks_video_age_days} {videos_to_check_per_day}/day "
-        f"{videos_to_check_per_hour}/hr {videos_to_check_per_ten_minutes}/10min"
+        f"{videos_to_check_per_hour}/hr {videos_to_check_per_ten_minutes}/10min {pacer.penalty=}"
     )
-    log.info(f"Videos to check today {videos_to_check_per_day} - {tasks_completed_today} = {tasks_to_complete_today}")
+    log.info(f"Videos to check today {videos_to_check_today} - {tasks_completed_today} = {tasks_to_complete_today}")
 
     qs = Q(last_privacy_status_check__date__lt=thirty_days_ago) | Q(last_privacy_status_check__isnull=True)
     if app_settings.SAVE_INFO_JSON_FILE:
         qs |= Q(info_json="")
 
     videos_needing_an_update = videos_that_are_checkable.filter(qs)
-    log.info(
-        f"last_privacy_status_check__date__lt={thirty_days_ago} ({checks_video_age_days=}) "
-        f"OR isnull=True = {videos_needing_an_update.count()=}"
-    )
 
     force_check_per_call = app_settings.PRIVACY_STATUS_CHECK_FORCE_CHECK_PER_CALL
     if force_check_per_call:
         log.info(f"Video status updater task forced to check {force_check_per_call} videos on this execution.")
         videos_to_check_per_ten_minutes = force_check_per_call
+    else:
+        videos_to_check_per_ten_minutes = min(videos_to_check_per_ten_minutes, tasks_to_complete_today)
 
-    if tasks_completed_today >= videos_to_check_per_day and not force_check_per_call:
+    if videos_to_check_per_ten_minutes <= 0:
         log.info("Video status updater ended, max number of videos checked today")
         return
 
     index = 0
-    countdown = 0
-    countdown_random_min = 10
-    countdown_random_max = 20
+    countdowns = pacer.countdowns()
 
-    if videos_to_check_per_ten_minutes < 5:
-        countdown_random_min = 46
-        countdown_random_max = 143
+    channel_video_pks = {}
 
     for video in videos_needing_an_update[:videos_to_check_per_ten_minutes]:
         index += 1
 
         log.debug(f"{index=} {video.last_privacy_status_check=} {video.privacy_status=} {video.upload_date=} {video=}")
 
-        update_video_details.apply_async(kwargs=dict(pk=video.pk, mode="auto"), countdown=countdown)
+        if app_settings.PRIVACY_STATUS_CHECK_USE_CHANNEL_LISTINGS and video.channel_id:
+            channel_video_pks.setdefault(video.channel_id, []).append(video.pk)
+            continue
 
-        countdown += random.randint(countdown_random_min, countdown_random_max)
+        update_video_details.apply_async(kwargs=dict(pk=video.pk, mode="auto"), countdown=next(countdowns))
+
+    for channel_id, video_pks in channel_video_pks.items():
+        update_channel_video_statuses.apply_async(
+            kwargs=dict(pk=channel_id, video_pks=video_pks, mode="auto"), countdown=next(countdowns)
+        )
 
     log.info(f"Finished Video Status Updater task, updating {index} videos")
 
 
+@shared_task(queue="queue-vidar")
+def update_channel_video_statuses(pk, video_pks=None, mode="auto"):
+    """Refresh every known video of a channel from a single flat listing of its uploads.
+
+    Videos in video_pks that are missing from the listing fall back to update_video_details."""
+
+    channel = Channel.objects.get(pk=pk)
+
+    dl_kwargs = ytdlp_services.get_ytdlp_args()
+
+    try:
+        output = interactor.channel_listing(channel.uploads_url, instance=channel, **dl_kwargs)
+    except yt_dlp.DownloadError:
+        log.exception(f"Failed to obtain channel listing for {channel=}")
+        output = None
+
+    entries = []
+    if output:
+        entries = [entry for entry in output.get("entries") or [] if entry]
+
+    missing_videos = []
+    if entries:
+        listed_ids = [entry["id"] for entry in entries if entry.get("id")]
+        listed_videos = channel.videos.filter(provider_object_id__in=listed_ids)
+        video_services.bulk_update_details_from_listing(
+            videos=listed_videos, entries=entries, mode=mode, due_pks=video_pks
+        )
+        if video_pks:
+            missing_videos = channel.videos.filter(pk__in=video_pks).exclude(provider_object_id__in=listed_ids)
+    elif video_pks:
+        log.info(f"No listing entries for {channel=}, checking {len(video_pks)} videos individually.")
+        missing_videos = channel.videos.filter(pk__in=video_pks)
+
+    pacer = pacing_services.video_details_pacer()
+
+    # Videos refreshed by the listing count against the daily budget, update_video_details counts the others.
+    if video_pks:
+        pacer.consume(len(video_pks) - len(missing_videos))
+
+    countdowns = pacer.countdowns()
+    for video in missing_videos:
+        update_video_details.apply_async(kwargs=dict(pk=video.pk, mode=mode), countdown=next(countdowns))
+
+    return f"{len(entries)} listed, {len(missing_videos)} checked individually"
+
+
 @shared_task(bind=True, queue="queue-vidar")
 @celery_helpers.prevent_asynchronous_task_execution(
     lock_key="channel-rename-files-{channel_id}", lock_expiry=2 * 60 * 60
@@ -1971,25 +2371,67 @@ def channel_rename_files(self, channel_id, commit=True, remove_empty=True, renam
 
 
 @shared_task(bind=True, queue="queue-vidar")
-@celery_helpers.prevent_asynchronous_task_execution(lock_key="rename-archived-files", lock_expiry=2 * 60 * 60)
+@celery_helpers.prevent_asynchronous_task_execution(lock_key="rename-archived-files", lock_expiry=60 * 60)
 def rename_all_archived_video_files(self, remove_empty=True):
 
     if not file_helpers.can_file_be_moved(Video.file.field):
         raise FileStorageBackendHasNoMoveError("videos_rename_files called but files cannot be renamed")
 
-    Video.objects.all().update(file_not_found=False)
+    Video.objects.filter(file_not_found=True).update(file_not_found=False)
 
-    for video in Video.objects.archived():
+    # Plan and rename in chunks instead of one task per video, moves within a chunk run in parallel.
+    videos_qs = schema_services.prefetch_schema_playlists(
+        Video.objects.archived().select_related("channel").prefetch_related("extra_files").order_by("pk")
+    )
+    cursor = 0
+    while chunk := list(videos_qs.filter(pk__gt=cursor)[:500]):
+        cursor = chunk[-1].pk
 
-        if video_services.does_file_need_fixing(video=video):
-            rename_video_files.delay(
-                pk=video.pk,
-                remove_empty=remove_empty,
-            )
+        videos = [video for video in chunk if video_services.does_file_need_fixing(video=video)]
+        if videos:
+            renamers.rename_videos(videos=videos, remove_empty=remove_empty)
+
+        # Large libraries take longer than the lock lasts, it is kept for an hour past each chunk.
+        celery_helpers.refresh_task_lock("rename-archived-files", 60 * 60)
 
     return True
 
 
+@shared_task(bind=True, queue="queue-vidar")
+@celery_helpers.prevent_asynchronous_task_execution(lock_key="trigger-file-hashing", lock_expiry=60 * 60)
+def trigger_file_hashing(self):
+    # Capped per run, the rest is picked up by the next run.
+    max_per_run = app_settings.DEDUPE_HASH_MAX_PER_RUN
+    pks = list(dedupe_services.get_unhashed_videos().values_list("pk", flat=True)[:max_per_run])
+
+    batch_size = app_settings.DEDUPE_HASH_BATCH_SIZE
+    batches = []
+    for pk in pks:
+        if not batches or len(batches[-1]) >= batch_size:
+            batches.append([])
+        batches[-1].append(pk)
+
+    if batches:
+        group(hash_video_files.si(pks=batch) for batch in batches)()
+
+    log.info(f"Hashing the files of {len(pks)} videos in {len(batches)} tasks.")
+
+    return len(pks)
+
+
+@shared_task(bind=True, queue="queue-vidar-processor")
+def hash_video_files(self, pks):
+    return dedupe_services.hash_videos(pks=pks)
+
+
+@shared_task(bind=True, queue="queue-vidar")
+@celery_helpers.prevent_asynchronous_task_execution(lock_key="reconcile-media-files", lock_expiry=2 * 60 * 60)
+def reconcile_media_files(self, commit=True):
+    output = reconciliation_services.reconcile(commit=commit)
+    # Only counts, the full lists of a large library would bloat the task result.
+    return {k: len(v) for k, v in output.items()}
+
+
 @shared_task(bind=True, queue="queue-vidar")
 def rename_video_files(self, pk, remove_empty=True):
 
@@ -2047,8 +2489,11 @@ def convert_video_to_mp4(self, pk, filepath=None):
         local_filepath = filepath
         if not local_filepath:
             local_filepath, was_remote = app_settings.ENSURE_FILE_IS_LOCAL(file_field=video.file)
+            if was_remote:
+                cache_services.track(local_filepath, stage=CachedFile.Stages.LOCAL_COPY, video=video)
 
         output_filepath = app_settings.CONVERT_FILE_TO_HTML_PLAYABLE_FORMAT(filepath=local_filepath)
+        cache_services.track(output_filepath, stage=CachedFile.Stages.CONVERSION, video=video)
 
         notification_services.convert_to_mp4_complete(
             video=video,
@@ -2067,11 +2512,9 @@ def convert_video_to_mp4(self, pk, filepath=None):
 
 @shared_task(queue="queue-vidar")
 def trigger_mirror_live_playlists():
-    countdown = 0
+    countdowns = pacing_services.mirror_playlists_pacer().countdowns()
     for channel in Channel.objects.active().filter(mirror_playlists=True):
-        mirror_live_playlist.apply_async(args=[channel.pk], countdown=countdown)
-
-        countdown += 120
+        mirror_live_playlist.apply_async(args=[channel.pk], countdown=next(countdowns))
 
 
 @shared_task(bind=True, queue="queue-vidar")
@@ -2083,6 +2526,7 @@ def mirror_live_playlist(self, channel_id):
     try:
         live_playlists = output["entries"]
     except (KeyError, TypeError) as exc:
+        pacing_services.mirror_playlists_pacer().record_failure()
         if self.request.retries < 2:
             raise self.retry(countdown=68, exc=exc)
 
@@ -2090,6 +2534,8 @@ def mirror_live_playlist(self, channel_id):
         # ignore the task so no other state is recorded
         raise Ignore()
 
+    pacing_services.mirror_playlists_pacer().record_success()
+
     log.info(f"{channel=} has {len(live_playlists)} live playlists and {channel.playlists.count()} local playlists")
     countdown = 0
 
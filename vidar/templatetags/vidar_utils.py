@@ -3,6 +3,8 @@ import os
 
 from django import template
 
+from vidar.services import image_services
+
 
 register = template.Library()
 
@@ -30,6 +32,12 @@ def filename(value):
     return os.path.basename(value)
 
 
+@register.simple_tag
+def image_variant(field_file, variant):
+    """{% image_variant video.thumbnail "small" %} renders the url of a reduced copy of the image."""
+    return image_services.get_variant_url(field_file, variant)
+
+
 @register.filter
 def smooth_timedelta(
     timedeltaobj,
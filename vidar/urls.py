@@ -64,6 +64,7 @@ urlpatterns = [
     path("utilities/", views.GeneralUtilitiesView.as_view(), name="utilities"),
     path("notes/", views.VideoNoteListView.as_view(), name="notes"),
     path("statistics/", views.AllVideoStatistics.as_view(), name="statistics"),
+    path("proxies/", views.ProxyHealthView.as_view(), name="proxy-health"),
     path("schedule/", views.ScheduleView.as_view(), name="schedule"),
     path("schedule/calendar/", views.ScheduleCalendarView.as_view(), name="schedule-calendar"),
     path("schedule/history/", views.ScheduleHistoryView.as_view(), name="schedule-history"),
@@ -1,7 +1,9 @@
 import copy
 import datetime
+import functools
 import logging
 import random
+import re
 import requests
 import urllib.parse
 import warnings
@@ -200,6 +202,12 @@ def get_proxy(previous_proxies: list = None, instance=None, attempt: int = None)
     else:
         user_defined_proxies = copy.copy(user_defined_proxies)
 
+    if app_settings.PROXY_HEALTH_ENABLED:
+        from vidar.services import proxy_services
+
+        candidates = [x for x in user_defined_proxies if x not in previous_proxies]
+        return proxy_services.choose(candidates) or app_settings.PROXIES_DEFAULT
+
     while user_defined_proxies:
         selected_proxy = random.choice(user_defined_proxies)
         if selected_proxy not in previous_proxies:
@@ -354,3 +362,33 @@ class OutputCapturer:
 #             break
 #
 #     return f"{assigned_minute} {base_cron_with_lowest_counter}"
+
+
+@functools.lru_cache(maxsize=100000)
+def system_safe_name(value):
+    replaceables = {
+        "&": "and",
+        "–": "-",
+    }
+    keepers = "&– -"
+    safe_name = "".join([c for c in value if c.isalnum() or c in keepers]).rstrip()
+    for k, v in replaceables.items():
+        safe_name = safe_name.replace(k, v)
+    safe_string = re.sub(" +", " ", safe_name)
+    safe_string_without_multiple_spaces = " ".join(safe_string.split())
+    return safe_string_without_multiple_spaces
+
+
+@functools.lru_cache(maxsize=100000)
+def system_safe_title(value):
+    safe_string = "".join([c for c in value if c.isalnum() or c == " "]).rstrip()
+    safe_string_without_multiple_spaces = " ".join(safe_string.split())
+    return safe_string_without_multiple_spaces
+
+
+def move_leading_the_to_end(value):
+    if value.lower().startswith("the "):
+        cased_the = value[:4].strip()
+        value_without_the = value[4:]
+        value = f"{value_without_the}, {cased_the}"
+    return value
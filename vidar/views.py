@@ -44,7 +44,7 @@ from vidar.models import (
     VideoNote,
 )
 from vidar.pagination import paginator_helper
-from vidar.services import crontab_services, playlist_services, video_services
+from vidar.services import crontab_services, playlist_services, proxy_services, video_services
 
 
 log = logging.getLogger(__name__)
@@ -244,7 +244,7 @@ class ChannelDetailView(
         )
         kwargs["has_at_max_quality_videos"] = self.object.videos.filter(at_max_quality=True).exists()
 
-        qs = self.object.videos.all()
+        qs = self.object.videos.listing()
         if q := self.request.GET.get("q"):
             q = q.strip()
 
@@ -820,7 +820,7 @@ class ChannelVideosManagerView(PermissionRequiredMixin, UseProviderObjectIdMatch
     def get_context_data(self, **kwargs):
         kwargs = super().get_context_data(**kwargs)
 
-        qs = self.object.videos.all()
+        qs = self.object.videos.listing()
 
         if show := self.request.GET.get("show"):
             if show == "all":
@@ -863,6 +863,7 @@ class VideoListView(
     ListView,
 ):
     model = Video
+    queryset = Video.objects.listing()
     permission_required = ["vidar.access_vidar"]
     paginate_by = 10
     ordering = ["-upload_date", "-inserted"]
@@ -1480,7 +1481,7 @@ class VideoRelatedVideosView(PermissionRequiredMixin, RequestBasedCustomQueryset
 
         kwargs["related_video_pks"] = self.object.related.all().values_list("pk", flat=True)
 
-        qs = Video.objects.exclude(pk=self.kwargs["pk"])
+        qs = Video.objects.listing().exclude(pk=self.kwargs["pk"])
         qs = self.apply_queryset_filtering(qs, ["title", "description", "provider_object_id"])
 
         # if 'show-all' not in self.request.GET:
@@ -2334,6 +2335,29 @@ def update_playlists_bulk(request):
     )
 
 
+class ProxyHealthView(PermissionRequiredMixin, TemplateView):
+    permission_required = ["vidar.view_index_download_stats"]
+    template_name = "vidar/proxy_health.html"
+
+    def get_context_data(self, **kwargs):
+        kwargs["proxies"] = list(proxy_services.get_health(proxy_services.configured_proxies()).values())
+        kwargs["proxy_health_enabled"] = app_settings.PROXY_HEALTH_ENABLED
+        return super().get_context_data(**kwargs)
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.has_perm("vidar.change_proxy_health"):
+            return self.handle_no_permission()
+        proxies = proxy_services.configured_proxies()
+        try:
+            proxy = proxies[int(request.POST.get("reset", ""))]
+        except (IndexError, ValueError):
+            messages.error(request, "Unknown proxy.")
+        else:
+            proxy_services.ProxyHealth(proxy).reset()
+            messages.success(request, f"Health of {proxy_services.display_name(proxy)} reset.")
+        return redirect("vidar:proxy-health")
+
+
 class ScheduleView(PermissionRequiredMixin, TemplateView):
     permission_required = ["vidar.view_channel"]
     template_name = "vidar/schedule.html"